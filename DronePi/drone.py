@@ -14,29 +14,67 @@ Run:
     python3 drone.py --host http://127.0.0.1:8000 --ws ws://127.0.0.1:8000/ws/pi
     or
     python3 drone.py --host http://droneguard.local:8000 --ws ws://droneguard.local:8000/ws/pi
+
+Load test (N simulated drones, optional processes, scripted attacks):
+    python3 drone.py --fleet 200 --procs 4 --rate 4 --duration 60 --key private.pem \
+        --attacks-per-min 2 --attack-mix jump=3,speed=1,heading=1
+    Prints achieved packets/s and end-to-end latency (send -> echoed on /ws/frontend).
 """
 
 import argparse
 import asyncio
+import base64
+import bisect
+import heapq
 import json
+import logging
+import logging.handlers
 import math
+import os
+import queue
 import random
+import struct
+import sys
 import time
-from typing import List, Tuple, Optional
+from typing import Callable, Dict, List, Tuple, Optional
 
 import aiohttp
 import websockets
 
+try:  # optional: only needed when signing telemetry (--key)
+    from Crypto.Hash import SHA256
+    from Crypto.PublicKey import RSA
+    from Crypto.Signature import pkcs1_15
+except ImportError:  # pragma: no cover - signing disabled
+    RSA = None
+
 # ---------------------------
 # Configuration / constants
 # ---------------------------
 DEFAULT_BACKEND_HOST = "http://127.0.0.1:8000"
 DEFAULT_WS_URL = "ws://127.0.0.1:8000/ws/pi"
+DEFAULT_DRONE_ID = "drone_pi"  # backend keeps separate state per drone id
+
+# signed raw envelope: "DGS1:<b64 signature>:<signed JSON>" (backend verifies the exact bytes)
+RAW_FRAME_PREFIX = "DGS1:"
+
+# binary telemetry (negotiated with --encoding binary; layout mirrors backend app/wire.py):
+#   b"DGB1" | sig_len u16 | signature | record
+#   record = time, lat, lon f64; alt, vx, vy, speed, yaw, roll, pitch, battery f32; source u8
+BINARY_MAGIC = b"DGB1"
+BINARY_RECORD = struct.Struct("<dddffffffffB")
+BINARY_FIELDS = ("time", "gps_lat", "gps_lon", "alt", "vx", "vy", "speed", "yaw", "roll", "pitch", "battery")
+BINARY_SOURCES = {"normal": 0, "injected": 1, "failsafe": 2}
 
 # polling intervals
 ATTACK_POLL_INTERVAL = 1.0     # seconds
 FAILSAFE_POLL_INTERVAL = 0.8   # seconds
+# once the backend pushes state over /ws/pi (hello "push": true), HTTP
+# polling only runs as a fallback at this interval
+PUSH_FALLBACK_POLL_INTERVAL = 10.0  # seconds
 TELEMETRY_INTERVAL = 0.25      # seconds (send rate)
+PHYSICS_INTERVAL = 0.05        # seconds (fixed physics step, independent of send rate)
+MAX_PHYSICS_CATCHUP = 10       # physics steps replayed at most after a stall
 
 # flight params
 CRUISE_SPEED_MPS = 3.0         # base speed (m/s)
@@ -65,13 +103,71 @@ WAYPOINTS = [
     (12.9710, 77.6396)
 ]
 
+# ---------------------------
+# Logging
+# ---------------------------
+# log.info("injection.start", extra={...}): records go through a queue to a
+# background writer thread, so the send loop never blocks on stderr.
+log = logging.getLogger("droneguard.drone")
+
+_LOG_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+class _TextFormatter(logging.Formatter):
+    """12:00:00.123 INFO injection.start mode=gps_drift mag=1.0"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        ts = time.strftime("%H:%M:%S", time.localtime(record.created)) + f".{int(record.msecs):03d}"
+        fields = " ".join(f"{k}={v}" for k, v in vars(record).items() if k not in _LOG_RESERVED)
+        # QueueHandler has already appended any traceback to the message
+        msg, _, tb = record.getMessage().partition("\n")
+        line = f"{ts} {record.levelname} {msg} {fields}".rstrip()
+        return line + "\n" + tb if tb else line
+
+
+_log_setup: Optional[Tuple[int, logging.handlers.QueueListener]] = None
+
+
+def setup_logging(level: str = "INFO"):
+    """Queue drone log records to a writer thread on stderr (once per process)."""
+    global _log_setup
+    if _log_setup is not None and _log_setup[0] == os.getpid():
+        log.setLevel(level)
+        return
+    q: queue.SimpleQueue = queue.SimpleQueue()
+    out = logging.StreamHandler(sys.stderr)
+    out.setFormatter(_TextFormatter())
+    listener = logging.handlers.QueueListener(q, out)
+    listener.start()
+    log.handlers[:] = [logging.handlers.QueueHandler(q)]
+    log.setLevel(level)
+    log.propagate = False
+    _log_setup = (os.getpid(), listener)
+
+
+def shutdown_logging():
+    global _log_setup
+    if _log_setup is not None and _log_setup[0] == os.getpid():
+        _log_setup[1].stop()
+        _log_setup = None
+
+
 # ---------------------------
 # Utilities
 # ---------------------------
 
 
+_clock: Callable[[], float] = time.time
+
+
 def now_s() -> float:
-    return time.time()
+    return _clock()
+
+
+def set_clock(fn: Callable[[], float]):
+    """Replace the wall clock (offline generators run the drone on virtual time)."""
+    global _clock
+    _clock = fn
 
 
 def haversine_m(p1: Tuple[float, float], p2: Tuple[float, float]) -> float:
@@ -114,10 +210,109 @@ def dest_point(p: Tuple[float, float], bearing_deg_: float, distance_m: float) -
 # ---------------------------
 
 
+M_PER_DEG = 111_000.0  # flat-earth metres per degree, same approximation as the backend detectors
+
+
+class CompiledRoute:
+    """
+    A waypoint route compiled once into straight segments in a local
+    flat-earth frame (metres east/north of the first point).  Segment unit
+    vectors, bearings, lengths and cumulative distance are precomputed, so
+    finding the position ``s`` metres along the route is a bisect plus a
+    linear interpolation - no spherical trigonometry per step.
+
+    points[0] is where the route starts; after the last point it closes back
+    to points[loop_to] and cycles from there.  loop_to=None: the route ends
+    at the last point and the drone holds there.
+    """
+
+    def __init__(self, points: List[Tuple[float, float]], loop_to: Optional[int] = 0):
+        if not points:
+            raise ValueError("empty route")
+        self.points = list(points)
+        self.lat0, self.lon0 = self.points[0]
+        self.kx = M_PER_DEG * math.cos(math.radians(self.lat0))  # metres per degree of longitude
+        xy = [self.to_xy(p) for p in self.points]
+        if loop_to is not None and len(xy) - loop_to > 1:
+            xy.append(xy[loop_to])
+        else:
+            loop_to = None
+        self.xs: List[float] = []
+        self.ys: List[float] = []
+        self.ux: List[float] = []
+        self.uy: List[float] = []
+        self.bearings: List[float] = []
+        self.lengths: List[float] = []
+        self.cum: List[float] = [0.0]
+        for (x0, y0), (x1, y1) in zip(xy, xy[1:]):
+            dx, dy = x1 - x0, y1 - y0
+            length = math.hypot(dx, dy)
+            self.xs.append(x0)
+            self.ys.append(y0)
+            self.ux.append(dx / length if length else 0.0)
+            self.uy.append(dy / length if length else 0.0)
+            self.bearings.append((math.degrees(math.atan2(dx, dy)) + 360.0) % 360.0)
+            self.lengths.append(length)
+            self.cum.append(self.cum[-1] + length)
+        self.end_xy = xy[-1]
+        self.total = self.cum[-1]
+        self.cycle_start = self.cum[loop_to] if loop_to is not None else self.total
+        self.cycle_len = self.total - self.cycle_start
+
+    def to_xy(self, p: Tuple[float, float]) -> Tuple[float, float]:
+        return ((p[1] - self.lon0) * self.kx, (p[0] - self.lat0) * M_PER_DEG)
+
+    def to_latlon(self, x: float, y: float) -> Tuple[float, float]:
+        return (self.lat0 + y / M_PER_DEG, self.lon0 + x / self.kx)
+
+    def wrap(self, s: float) -> float:
+        """Fold a distance travelled into [0, total]."""
+        if s <= self.total:
+            return s
+        if self.cycle_len > 0:
+            return self.cycle_start + (s - self.cycle_start) % self.cycle_len
+        return self.total
+
+    def segment_at(self, s: float) -> int:
+        if not self.lengths:
+            return -1
+        return min(bisect.bisect_right(self.cum, s) - 1, len(self.lengths) - 1)
+
+    def position(self, s: float) -> Tuple[float, float]:
+        """(lat, lon) at distance s (already wrapped) along the route."""
+        i = self.segment_at(s)
+        if i < 0:
+            return self.points[0]
+        t = s - self.cum[i]
+        return self.to_latlon(self.xs[i] + self.ux[i] * t, self.ys[i] + self.uy[i] * t)
+
+    def track(self, s0: float, distances):
+        """Vectorized positions for distances travelled beyond s0 (NumPy array) -> (lat, lon, s)."""
+        import numpy as np
+
+        s = s0 + np.asarray(distances, dtype=float)
+        if self.cycle_len > 0:
+            over = s > self.total
+            s = np.where(over, self.cycle_start + np.mod(s - self.cycle_start, self.cycle_len), s)
+        else:
+            s = np.minimum(s, self.total)
+        if not self.lengths:
+            lat = np.full(s.shape, self.points[0][0])
+            return lat, np.full(s.shape, self.points[0][1]), s
+        i = np.clip(np.searchsorted(self.cum, s, side="right") - 1, 0, len(self.lengths) - 1)
+        t = s - np.asarray(self.cum)[i]
+        x = np.asarray(self.xs)[i] + np.asarray(self.ux)[i] * t
+        y = np.asarray(self.ys)[i] + np.asarray(self.uy)[i] * t
+        return self.lat0 + y / M_PER_DEG, self.lon0 + x / self.kx, s
+
+
 class FlightGenerator:
     """
     Smoothly walks through waypoints and produces telemetry samples.
     Responsible for interpolation, velocity, yaw, roll, pitch.
+
+    The route (and any override) is a CompiledRoute; the drone's progress is
+    the distance ``s`` travelled along it.
     """
 
     def __init__(self, waypoints: List[Tuple[float, float]], cruise_speed=CRUISE_SPEED_MPS):
@@ -125,7 +320,8 @@ class FlightGenerator:
         if len(self.waypoints) < 2:
             raise ValueError("Need >=2 waypoints")
         self.cruise_speed = cruise_speed
-        self.index = 0  # current target waypoint idx
+        self.route = CompiledRoute(self.waypoints, loop_to=0)
+        self.s = 0.0  # metres travelled along self.route
         self.pos = self.waypoints[0]
         self.prev_time = now_s()
         self.vx = 0.0
@@ -139,36 +335,26 @@ class FlightGenerator:
 
         # route override state
         self.override_waypoints: Optional[List[Tuple[float, float]]] = None
-        self.override_index = 0
+        self._main_target = 1  # main-route waypoint to resume towards after an override
+        self._route_offset = 0  # self.route.points[i] == self.waypoints[(i + offset) % n] on the main route
 
     def step(self, dt: float, override_speed: Optional[float] = None) -> dict:
         """
-        Advance position by dt seconds.
+        Advance position by dt seconds and return the resulting sample.
         If override_speed provided (m/s) use it (e.g. for speed injection).
         """
-        active_waypoints = self.override_waypoints if self.override_waypoints else self.waypoints
-        idx = self.override_index if self.override_waypoints else self.index
-        target = active_waypoints[(idx + 1) % len(active_waypoints)]
-        dist = haversine_m(self.pos, target)
-        speed = override_speed if override_speed is not None else self.cruise_speed
-        travel = speed * dt
+        self.advance(dt, override_speed)
+        return self.sample()
 
-        # if we can reach (or pass) target in this step, snap and advance
-        if travel >= dist and dist > 0:
-            new_pos = target
-            if self.override_waypoints:
-                self.override_index = (self.override_index + 1) % len(self.override_waypoints)
-            else:
-                self.index = (self.index + 1) % len(self.waypoints)
-        elif dist == 0:
-            new_pos = self.pos
-        else:
-            br = bearing_deg(self.pos, target)
-            new_pos = dest_point(self.pos, br, travel)
+    def advance(self, dt: float, override_speed: Optional[float] = None):
+        """Integrate the flight by dt seconds without building a packet."""
+        speed = override_speed if override_speed is not None else self.cruise_speed
+        self.s = self.route.wrap(self.s + speed * dt)
+        new_pos = self.route.position(self.s)
 
         # compute velocities approximate (vx east, vy north in m/s)
-        dy = (new_pos[0] - self.pos[0]) * 111_000.0  # lat degrees to meters approx
-        dx = (new_pos[1] - self.pos[1]) * (111_000.0 * math.cos(math.radians(self.pos[0])))
+        dy = (new_pos[0] - self.pos[0]) * M_PER_DEG  # lat degrees to meters approx
+        dx = (new_pos[1] - self.pos[1]) * (M_PER_DEG * math.cos(math.radians(self.pos[0])))
         vx = dx / dt if dt > 0 else 0.0
         vy = dy / dt if dt > 0 else 0.0
         speed_now = math.hypot(vx, vy)
@@ -180,8 +366,9 @@ class FlightGenerator:
             yaw = self.yaw
 
         # small pseudo-random roll/pitch fluctuations
-        roll = math.sin(now_s() * 0.5 + random.random()) * 5.0
-        pitch = math.cos(now_s() * 0.4 + random.random()) * 3.0
+        t = now_s()
+        roll = math.sin(t * 0.5 + random.random()) * 5.0
+        pitch = math.cos(t * 0.4 + random.random()) * 3.0
 
         # battery drain
         self.battery = max(0.0, self.battery - BATTERY_DRAIN_PER_SEC * dt)
@@ -195,6 +382,8 @@ class FlightGenerator:
         self.roll = roll
         self.pitch = pitch
 
+    def sample(self) -> dict:
+        """Telemetry packet for the current state."""
         pkt = {
             "time": now_s(),
             "gps_lat": float(self.pos[0]),
@@ -211,20 +400,84 @@ class FlightGenerator:
         }
         return pkt
 
+    def generate_track(self, seconds: float, dt: float = PHYSICS_INTERVAL, t0: Optional[float] = None,
+                       rng=None) -> dict:
+        """
+        Vectorized bulk simulation: advance ``seconds`` at fixed step ``dt``
+        along the current route in one NumPy pass and return columns
+        (time, gps_lat, gps_lon, alt, vx, vy, speed, yaw, roll, pitch,
+        battery), one row per step.  The generator ends in the final state,
+        as if step() had been called for every row.
+        """
+        import numpy as np
+
+        n = max(0, int(round(seconds / dt)))
+        rng = rng if rng is not None else np.random.default_rng()
+        t0 = now_s() if t0 is None else t0
+        k = np.arange(1, n + 1)
+        lat, lon, s = self.route.track(self.s, self.cruise_speed * dt * k)
+        prev_lat = np.concatenate(([self.pos[0]], lat[:-1]))
+        prev_lon = np.concatenate(([self.pos[1]], lon[:-1]))
+        vy = (lat - prev_lat) * M_PER_DEG / dt
+        vx = (lon - prev_lon) * (M_PER_DEG * np.cos(np.radians(prev_lat))) / dt
+        speed = np.hypot(vx, vy)
+        moving = speed > 0.01
+        yaw = np.where(moving, np.mod(np.degrees(np.arctan2(vx, vy)) + 360.0, 360.0), np.nan)
+        # hold the last heading while stationary (forward fill)
+        idx = np.where(moving, np.arange(n), -1)
+        np.maximum.accumulate(idx, out=idx)
+        yaw = np.where(idx >= 0, yaw[np.maximum(idx, 0)], self.yaw)
+        t = t0 + dt * k
+        cols = {
+            "time": t,
+            "gps_lat": lat,
+            "gps_lon": lon,
+            "alt": np.full(n, ALTITUDE_M),
+            "vx": vx,
+            "vy": vy,
+            "speed": speed,
+            "yaw": yaw,
+            "roll": np.sin(t * 0.5 + rng.random(n)) * 5.0,
+            "pitch": np.cos(t * 0.4 + rng.random(n)) * 3.0,
+            "battery": np.maximum(0.0, self.battery - BATTERY_DRAIN_PER_SEC * dt * k),
+        }
+        if n:
+            self.s = float(s[-1])
+            self.pos = (float(lat[-1]), float(lon[-1]))
+            self.vx, self.vy, self.speed = float(vx[-1]), float(vy[-1]), float(speed[-1])
+            self.yaw = float(yaw[-1])
+            self.roll, self.pitch = float(cols["roll"][-1]), float(cols["pitch"][-1])
+            self.battery = float(cols["battery"][-1])
+        return cols
+
     def set_route_override(self, waypoints: List[Tuple[float, float]]):
         if not waypoints:
             self.override_waypoints = None
-            self.override_index = 0
             return
+        if self.override_waypoints is None:
+            self._main_target = self._heading_to()
         self.override_waypoints = waypoints[:]
-        self.override_index = 0
-        print("[FLIGHT] route override set:", self.override_waypoints)
+        # fly from here to the first override point, then cycle the override
+        # points (a single point: hold there)
+        self.route = CompiledRoute([self.pos] + self.override_waypoints,
+                                   loop_to=1 if len(self.override_waypoints) > 1 else None)
+        self.s = 0.0
+        log.info("flight.route_override", extra={"waypoints": self.override_waypoints})
 
     def clear_route_override(self):
         if self.override_waypoints:
-            print("[FLIGHT] clearing route override")
+            log.info("flight.route_override_cleared")
+        if self.override_waypoints is not None:
+            # resume the main loop from here, heading for where we left it
+            k = self._main_target
+            self.route = CompiledRoute([self.pos] + self.waypoints[k:] + self.waypoints[:k], loop_to=1)
+            self._route_offset = k - 1
+            self.s = 0.0
         self.override_waypoints = None
-        self.override_index = 0
+
+    def _heading_to(self) -> int:
+        """Index into self.waypoints of the main-route waypoint currently being flown to."""
+        return (self.route.segment_at(self.s) + 1 + self._route_offset) % len(self.waypoints)
 
 
 # ---------------------------
@@ -235,7 +488,9 @@ class FlightGenerator:
 class Injection:
     """Manages currently active injection (if any)."""
 
-    def __init__(self):
+    def __init__(self, send_interval: float = TELEMETRY_INTERVAL):
+        # seconds between packets: a sudden jump lands on the first one, drift is per packet
+        self.send_interval = send_interval
         self.active = False
         self.mode = None
         self.mag = None
@@ -276,7 +531,8 @@ class Injection:
                     pts.append((float(w["lat"]), float(w["lon"])))
             if pts:
                 self.route_waypoints = pts
-        print(f"[INJECTION] start: mode={self.mode} mag={self.mag} style={self.style} dur={self.dur} raw_id={self.raw.get('id') if isinstance(self.raw, dict) else None}")
+        log.info("injection.start", extra={"mode": self.mode, "mag": self.mag, "style": self.style, "dur": self.dur,
+                                           "raw_id": self.raw.get("id") if isinstance(self.raw, dict) else None})
 
     def is_expired(self):
         if not self.active:
@@ -285,7 +541,7 @@ class Injection:
 
     def stop(self):
         if self.active:
-            print("[INJECTION] stopped")
+            log.info("injection.stop", extra={"mode": self.mode})
         self.active = False
         self.mode = None
         self.mag = None
@@ -326,7 +582,7 @@ async def apply_injection_to_pkt(pkt: dict, fg: FlightGenerator, inj: Injection)
     if inj.mode == "jump":
         if inj.style == "sudden":
             # jump immediately (only once)
-            if elapsed < TELEMETRY_INTERVAL * 1.5:
+            if elapsed < inj.send_interval * 1.5:
                 # choose random bearing
                 b = random.uniform(0, 360)
                 newpos = dest_point((pkt["gps_lat"], pkt["gps_lon"]), b, inj.mag)
@@ -358,7 +614,7 @@ async def apply_injection_to_pkt(pkt: dict, fg: FlightGenerator, inj: Injection)
 
     elif inj.mode == "gps_drift":
         b = random.uniform(0, 360)
-        drift = inj.mag * TELEMETRY_INTERVAL
+        drift = inj.mag * inj.send_interval
         newpos = dest_point((pkt["gps_lat"], pkt["gps_lon"]), b, drift)
         pkt["gps_lat"], pkt["gps_lon"] = newpos
         pkt["source"] = "injected"
@@ -404,28 +660,50 @@ async def apply_injection_to_pkt(pkt: dict, fg: FlightGenerator, inj: Injection)
 
 
 class BackendClient:
-    def __init__(self, backend_host: str, ws_url: str):
+    def __init__(self, backend_host: str, ws_url: str, drone_id: str = DEFAULT_DRONE_ID,
+                 session: Optional[aiohttp.ClientSession] = None):
         # Accept backend_host like http://droneguard.local:8000 (mDNS friendly),
         # or http://127.0.0.1:8000
         self.backend_host = backend_host.rstrip("/")
         self.ws_url = ws_url
-        self.session = aiohttp.ClientSession()
+        self.drone_id = drone_id
+        # scopes every HTTP call to this drone's backend session
+        self.params = {"drone_id": drone_id}
+        # fleet mode shares one HTTP session between all simulated drones
+        self._owns_session = session is None
+        self.session = session if session is not None else aiohttp.ClientSession()
         self.attack_state = False
         self.failsafe_state = {"active": False}
         self.latest_attacks = []
         self.attempted_attack_fetch = False
+        # ETags of the last polled state; the backend answers 304 while unchanged
+        self.etags: Dict[str, str] = {}
 
     async def close(self):
-        await self.session.close()
+        if self._owns_session:
+            await self.session.close()
 
     # -------------------
     # Attack state APIs
     # -------------------
+    def _conditional(self, path: str) -> dict:
+        tag = self.etags.get(path)
+        return {"If-None-Match": tag} if tag else {}
+
+    def _remember_etag(self, path: str, r):
+        tag = r.headers.get("ETag")
+        if tag:
+            self.etags[path] = tag
+
     async def get_attack_state(self) -> bool:
-        url = f"{self.backend_host}/pi/attack-state"
+        path = "/pi/attack-state"
+        url = f"{self.backend_host}{path}"
         try:
-            async with self.session.get(url, timeout=2.0) as r:
+            async with self.session.get(url, params=self.params, headers=self._conditional(path), timeout=2.0) as r:
+                if r.status == 304:
+                    return self.attack_state
                 if r.status == 200:
+                    self._remember_etag(path, r)
                     jd = await r.json()
                     val = bool(jd.get("active", False))
                     self.attack_state = val
@@ -437,7 +715,7 @@ class BackendClient:
     async def fetch_latest_attack(self) -> Optional[dict]:
         url = f"{self.backend_host}/attack/list"
         try:
-            async with self.session.get(url, timeout=2.0) as r:
+            async with self.session.get(url, params=self.params, timeout=2.0) as r:
                 if r.status == 200:
                     jd = await r.json()
                     if isinstance(jd, list) and jd:
@@ -473,10 +751,14 @@ class BackendClient:
     # Failsafe APIs
     # -------------------
     async def get_failsafe_state(self) -> dict:
-        url = f"{self.backend_host}/failsafe/state"
+        path = "/failsafe/state"
+        url = f"{self.backend_host}{path}"
         try:
-            async with self.session.get(url, timeout=2.0) as r:
+            async with self.session.get(url, params=self.params, headers=self._conditional(path), timeout=2.0) as r:
+                if r.status == 304:
+                    return self.failsafe_state
                 if r.status == 200:
+                    self._remember_etag(path, r)
                     jd = await r.json()
                     self.failsafe_state = jd
                     return jd
@@ -488,7 +770,7 @@ class BackendClient:
         url = f"{self.backend_host}/failsafe/activate"
         payload = {"reason": reason}
         try:
-            async with self.session.post(url, json=payload, timeout=2.0) as r:
+            async with self.session.post(url, params=self.params, json=payload, timeout=2.0) as r:
                 if r.status in (200, 201):
                     jd = await r.json()
                     # common routers return {"status":"ok","failsafe":fs}
@@ -531,6 +813,121 @@ class BackendClient:
             return {"status": "error", "error": str(e)}
 
 
+# ---------------------------
+# Telemetry signing
+# ---------------------------
+
+
+class PacketSigner:
+    """
+    Signs outgoing telemetry with the drone's RSA private key.
+      - raw    : sign the exact JSON text of the whole envelope and send it
+                 as a DGS1 frame (backend hashes the received bytes as-is)
+      - legacy : put "signature" inside the payload, signed over
+                 json.dumps(payload, sort_keys=True) (older backends)
+    """
+
+    def __init__(self, key_path: str, mode: str = "raw"):
+        if RSA is None:
+            raise RuntimeError("pycryptodome is required for --key")
+        with open(key_path, "r") as f:
+            self.signer = pkcs1_15.new(RSA.import_key(f.read()))
+        self.mode = mode
+
+    def _sign(self, data: bytes) -> str:
+        return base64.b64encode(self.signer.sign(SHA256.new(data))).decode()
+
+    def sign_bytes(self, data: bytes) -> bytes:
+        return self.signer.sign(SHA256.new(data))
+
+    def frame(self, ws_msg: dict) -> str:
+        if self.mode == "legacy":
+            pkt = ws_msg["payload"]
+            pkt.pop("signature", None)
+            pkt["signature"] = self._sign(json.dumps(pkt, sort_keys=True).encode())
+            return json.dumps(ws_msg)
+        body = json.dumps(ws_msg)
+        return f"{RAW_FRAME_PREFIX}{self._sign(body.encode())}:{body}"
+
+
+def encode_binary(pkt: dict, signer: Optional[PacketSigner]) -> bytes:
+    values = [pkt.get(k) for k in BINARY_FIELDS]
+    record = BINARY_RECORD.pack(*[math.nan if v is None else float(v) for v in values],
+                                BINARY_SOURCES.get(pkt.get("source"), 255))
+    sig = signer.sign_bytes(record) if signer else b""
+    return BINARY_MAGIC + struct.pack("<H", len(sig)) + sig + record
+
+
+def encode_frame(ws_msg: dict, signer: Optional[PacketSigner], encoding: str = "json"):
+    """Binary frames carry only the telemetry record (no injection_detail)."""
+    if encoding == "binary":
+        return encode_binary(ws_msg["payload"], signer)
+    return signer.frame(ws_msg) if signer else json.dumps(ws_msg)
+
+
+class PushedState:
+    """Attack / failsafe state as last pushed (or fallback-polled) from the backend."""
+
+    def __init__(self):
+        self.received = False     # a push arrived on this connection
+        self.pending = False      # changed since the drone loop last looked
+        self.attack_active = False
+        self.attack: Optional[dict] = None
+        self.failsafe: dict = {}
+        # wakes the drone loop's scheduler as soon as a push arrives
+        self.changed = asyncio.Event()
+
+    def update(self, msg: dict):
+        attack = msg.get("attack") or {}
+        self.attack_active = bool(attack.get("active", False))
+        self.attack = attack.get("latest")
+        self.failsafe = msg.get("failsafe") or {}
+        self.received = True
+        self.pending = True
+        self.changed.set()
+
+    def take_pending(self) -> bool:
+        pending, self.pending = self.pending, False
+        self.changed.clear()
+        return pending
+
+
+async def read_backend_messages(ws, pushed: PushedState):
+    """Drain messages from the backend; {"type": "state"} updates ``pushed``."""
+    try:
+        async for raw in ws:
+            try:
+                msg = json.loads(raw)
+            except Exception:
+                continue
+            if isinstance(msg, dict) and msg.get("type") == "state":
+                pushed.update(msg)
+    except websockets.exceptions.ConnectionClosed:
+        pass
+
+
+def hello_message(drone_id: str, encoding: str = "json", push: bool = True) -> str:
+    hello = {"hello": "drone_pi", "drone_id": drone_id, "time": now_s()}
+    if encoding != "json":
+        hello["encoding"] = encoding
+    if push:
+        hello["push"] = True
+    return json.dumps({"payload": hello})
+
+
+async def negotiate_encoding(ws, wanted: str) -> str:
+    """Wait briefly for the backend's hello_ack; older backends never answer -> JSON."""
+    if wanted == "json":
+        return "json"
+    try:
+        reply = json.loads(await asyncio.wait_for(ws.recv(), timeout=2.0))
+        if isinstance(reply, dict) and reply.get("type") == "hello_ack":
+            return reply.get("encoding", "json")
+    except Exception:
+        pass
+    return "json"
+
+
 # ---------------------------
 # Drone intelligence: auto-failsafe decision
 # ---------------------------
@@ -587,153 +984,256 @@ def should_auto_failsafe_on_injection(inj: Injection, pkt_before: dict, pkt_afte
     return None
 
 
+def apply_attack_state(active: bool, details: Optional[dict], inj: Injection, fgen: FlightGenerator):
+    """Start or stop the local injection to match the backend's attack state."""
+    if active and not inj.active:
+        # attack details if we have them, else the default injection
+        if details:
+            inj.start(details)
+            # if injection contained route override, apply to flight generator immediately
+            if inj.route_waypoints:
+                fgen.set_route_override(inj.route_waypoints)
+        else:
+            inj.start(DEFAULT_INJECTION)
+    elif not active and inj.active:
+        # clear injection and any route override if present
+        inj.stop()
+        fgen.clear_route_override()
+
+
+def apply_failsafe_state(fs: dict, inj: Injection, fgen: FlightGenerator):
+    if fs.get("active", False):
+        # backend says failsafe active -> freeze
+        if inj.active:
+            inj.stop()
+        fgen.source = "failsafe"
+    else:
+        if fgen.source == "failsafe":
+            fgen.source = "normal"
+
+
+async def next_packet(fgen: FlightGenerator, inj: Injection, client: BackendClient,
+                      dt: Optional[float]) -> Tuple[dict, Optional[dict]]:
+    """
+    Advance the flight by dt (None: physics already stepped elsewhere) and
+    build the next telemetry packet, applying any active injection (and the
+    local auto-failsafe decision). Returns (pkt, injection_report).
+    """
+    # generate telemetry sample
+    if fgen.source == "failsafe":
+        # freeze packet from current state
+        pkt = {
+            "time": now_s(),
+            "gps_lat": float(fgen.pos[0]),
+            "gps_lon": float(fgen.pos[1]),
+            "alt": ALTITUDE_M,
+            "vx": 0.0,
+            "vy": 0.0,
+            "speed": 0.0,
+            "yaw": float(fgen.yaw),
+            "roll": float(fgen.roll),
+            "pitch": float(fgen.pitch),
+            "battery": float(fgen.battery),
+            "source": "failsafe",
+        }
+        injection_report = None
+    else:
+        # normal flight step
+        pkt_before = {
+            "gps_lat": float(fgen.pos[0]),
+            "gps_lon": float(fgen.pos[1]),
+            "speed": float(fgen.speed),
+            "yaw": float(fgen.yaw)
+        }
+        pkt = fgen.step(dt) if dt is not None else fgen.sample()
+
+        injection_report = None
+        if inj.active:
+            # inject and build injection_detail for reporting
+            pkt_after = await apply_injection_to_pkt(pkt.copy(), fgen, inj)
+            # create short human-friendly report
+            inj_report = {
+                "mode": inj.mode,
+                "mag": inj.mag,
+                "style": inj.style,
+                "dur": inj.dur,
+                "raw": inj.raw
+            }
+            injection_report = inj_report
+
+            # decide if injection should auto-failsafe
+            reason = should_auto_failsafe_on_injection(inj, pkt_before, pkt_after)
+            if reason:
+                pkt = pkt_after
+                pkt["source"] = "injected"
+                fgen.source = "injected"
+                log.warning("failsafe.local_decision", extra={"reason": reason})
+                # call backend to activate failsafe
+                resp = await client.post_activate_failsafe(reason=reason)
+                # post diagnostic event to backend
+                diag = {
+                    "event": "auto_failsafe",
+                    "reason": reason,
+                    "attack": inj.raw,
+                    "timestamp": now_s()
+                }
+                try:
+                    await client.post_pi_event(diag)
+                except Exception:
+                    pass
+                # immediately set local freeze (optimistic)
+                fgen.source = "failsafe"
+                inj.stop()
+                # clear route override if present (because now frozen)
+                fgen.clear_route_override()
+            else:
+                # apply injection normally
+                pkt = pkt_after
+                pkt["source"] = "injected"
+                fgen.source = "injected"
+
+                if inj.is_expired():
+                    inj.stop()
+                    if fgen.source != "failsafe":
+                        pkt["source"] = "normal"
+                        fgen.source = "normal"
+                        # clear any route override set by injection
+                        fgen.clear_route_override()
+        else:
+            pkt["source"] = "normal"
+
+    # ensure numeric types consistent
+    pkt["time"] = float(pkt.get("time", now_s()))
+    pkt["gps_lat"] = float(pkt.get("gps_lat", 0.0))
+    pkt["gps_lon"] = float(pkt.get("gps_lon", 0.0))
+    pkt["vx"] = float(pkt.get("vx", 0.0))
+    pkt["vy"] = float(pkt.get("vy", 0.0))
+    pkt["speed"] = float(pkt.get("speed", 0.0))
+    pkt["yaw"] = float(pkt.get("yaw", 0.0))
+    pkt["roll"] = float(pkt.get("roll", 0.0))
+    pkt["pitch"] = float(pkt.get("pitch", 0.0))
+    pkt["battery"] = float(pkt.get("battery", 0.0))
+    pkt["source"] = pkt.get("source", fgen.source)
+    return pkt, injection_report
+
+
 # ---------------------------
 # Main drone loop + websocket client
 # ---------------------------
 
 
-async def drone_loop(ws, fgen: FlightGenerator, client: BackendClient):
-    inj = Injection()
-    last_attack_check = 0.0
-    last_failsafe_check = 0.0
-    last_send = 0.0
-    send_interval = TELEMETRY_INTERVAL
-    prev_time = now_s()
+class DeadlineScheduler:
+    """
+    Fixed-rate periodic jobs on a min-heap of deadlines.
+
+    wait() sleeps until the earliest deadline (or until ``wake`` is set)
+    and returns {job: periods_elapsed} for every job that came due; each job
+    is re-armed at its previous deadline + interval, so rates don't drift.
+    A job that fell more than one period behind reports how many periods
+    it missed and is re-armed from now instead of bursting.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self._heap: List[Tuple[float, int, str, float]] = []
+        self._seq = 0
+
+    def every(self, name: str, interval: float, first: Optional[float] = None):
+        due = self.clock() + interval if first is None else first
+        self._seq += 1
+        heapq.heappush(self._heap, (due, self._seq, name, interval))
+
+    def next_due(self) -> float:
+        return self._heap[0][0] if self._heap else float("inf")
+
+    async def wait(self, wake: Optional[asyncio.Event] = None) -> Dict[str, int]:
+        delay = self.next_due() - self.clock()
+        if delay > 0:
+            if wake is None:
+                await asyncio.sleep(delay)
+            elif not wake.is_set():
+                try:
+                    await asyncio.wait_for(wake.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+        now = self.clock()
+        due: Dict[str, int] = {}
+        while self._heap and self._heap[0][0] <= now:
+            at, seq, name, interval = heapq.heappop(self._heap)
+            periods = 1 + int((now - at) // interval)
+            nxt = at + interval if periods == 1 else now + interval
+            heapq.heappush(self._heap, (nxt, seq, name, interval))
+            due[name] = due.get(name, 0) + periods
+        return due
+
+
+async def drone_loop(ws, fgen: FlightGenerator, client: BackendClient, signer: Optional[PacketSigner] = None,
+                     encoding: str = "json", pushed: Optional[PushedState] = None,
+                     send_interval: float = TELEMETRY_INTERVAL, physics_interval: float = PHYSICS_INTERVAL):
+    """
+    Event-driven drone main loop: sleeps until the next physics step,
+    telemetry send or state poll is due, or until the backend pushes state.
+    """
+    inj = Injection(send_interval)
+    last_attack_http = 0.0
+    last_failsafe_http = 0.0
+
+    sched = DeadlineScheduler()
+    sched.every("physics", physics_interval)
+    sched.every("send", send_interval)
+    sched.every("attack", ATTACK_POLL_INTERVAL, first=sched.clock())
+    sched.every("failsafe", FAILSAFE_POLL_INTERVAL, first=sched.clock())
 
     while True:
         try:
-            # time step
+            due = await sched.wait(pushed.changed if pushed is not None else None)
             t0 = now_s()
-            dt = max(1e-6, t0 - prev_time)
-            prev_time = t0
 
-            # poll attack state periodically
-            if t0 - last_attack_check >= ATTACK_POLL_INTERVAL:
-                active = await client.get_attack_state()
-                last_attack_check = t0
+            # pushed state changes are applied at once; otherwise state is
+            # re-checked every poll interval, over HTTP only while nothing is
+            # being pushed (or as the slow fallback)
+            fresh = pushed is not None and pushed.take_pending()
+            push_live = pushed is not None and pushed.received
+            if fresh:
+                last_attack_http = last_failsafe_http = t0
+
+            # attack state
+            if fresh or "attack" in due:
+                if not push_live or t0 - last_attack_http >= PUSH_FALLBACK_POLL_INTERVAL:
+                    last_attack_http = t0
+                    active = await client.get_attack_state()
+                    if push_live:
+                        pushed.attack_active = active
+                else:
+                    active = pushed.attack_active
+                details = None
                 if active and not inj.active:
-                    # try to fetch attack details; if none, use default
-                    details = await client.try_fetch_attack_details()
-                    if details:
-                        inj.start(details)
-                        # if injection contained route override, apply to flight generator immediately
-                        if inj.route_waypoints:
-                            fgen.set_route_override(inj.route_waypoints)
-                    else:
-                        inj.start(DEFAULT_INJECTION)
-                elif not active and inj.active:
-                    # clear injection and any route override if present
-                    inj.stop()
-                    fgen.clear_route_override()
-
-            # poll failsafe state
-            if t0 - last_failsafe_check >= FAILSAFE_POLL_INTERVAL:
-                fs = await client.get_failsafe_state()
-                last_failsafe_check = t0
-                if fs.get("active", False):
-                    # backend says failsafe active -> freeze
-                    if inj.active:
-                        inj.stop()
-                    fgen.source = "failsafe"
+                    # pushed state carries the attack; otherwise fetch details, or use default
+                    details = pushed.attack if push_live and pushed.attack else await client.try_fetch_attack_details()
+                apply_attack_state(active, details, inj, fgen)
+
+            # failsafe state
+            if fresh or "failsafe" in due:
+                if not push_live or t0 - last_failsafe_http >= PUSH_FALLBACK_POLL_INTERVAL:
+                    last_failsafe_http = t0
+                    fs = await client.get_failsafe_state()
+                    if push_live:
+                        pushed.failsafe = fs
                 else:
-                    if fgen.source == "failsafe":
-                        fgen.source = "normal"
+                    fs = pushed.failsafe
+                apply_failsafe_state(fs, inj, fgen)
 
-            # generate telemetry sample
-            if fgen.source == "failsafe":
-                # freeze packet from current state
-                pkt = {
-                    "time": now_s(),
-                    "gps_lat": float(fgen.pos[0]),
-                    "gps_lon": float(fgen.pos[1]),
-                    "alt": ALTITUDE_M,
-                    "vx": 0.0,
-                    "vy": 0.0,
-                    "speed": 0.0,
-                    "yaw": float(fgen.yaw),
-                    "roll": float(fgen.roll),
-                    "pitch": float(fgen.pitch),
-                    "battery": float(fgen.battery),
-                    "source": "failsafe",
-                }
-                injection_report = None
-            else:
-                # normal flight step
-                pkt_before = {
-                    "gps_lat": float(fgen.pos[0]),
-                    "gps_lon": float(fgen.pos[1]),
-                    "speed": float(fgen.speed),
-                    "yaw": float(fgen.yaw)
-                }
-                pkt = fgen.step(dt)
-
-                injection_report = None
-                if inj.active:
-                    # inject and build injection_detail for reporting
-                    pkt_after = await apply_injection_to_pkt(pkt.copy(), fgen, inj)
-                    # create short human-friendly report
-                    inj_report = {
-                        "mode": inj.mode,
-                        "mag": inj.mag,
-                        "style": inj.style,
-                        "dur": inj.dur,
-                        "raw": inj.raw
-                    }
-                    injection_report = inj_report
-
-                    # decide if injection should auto-failsafe
-                    reason = should_auto_failsafe_on_injection(inj, pkt_before, pkt_after)
-                    if reason:
-                        pkt = pkt_after
-                        pkt["source"] = "injected"
-                        fgen.source = "injected"
-                        print(f"[AUTO FAILSAFE] local decision: {reason} -> requesting backend activate")
-                        # call backend to activate failsafe
-                        resp = await client.post_activate_failsafe(reason=reason)
-                        # post diagnostic event to backend
-                        diag = {
-                            "event": "auto_failsafe",
-                            "reason": reason,
-                            "attack": inj.raw,
-                            "timestamp": now_s()
-                        }
-                        try:
-                            await client.post_pi_event(diag)
-                        except Exception:
-                            pass
-                        # immediately set local freeze (optimistic)
-                        fgen.source = "failsafe"
-                        inj.stop()
-                        # clear route override if present (because now frozen)
-                        fgen.clear_route_override()
-                    else:
-                        # apply injection normally
-                        pkt = pkt_after
-                        pkt["source"] = "injected"
-                        fgen.source = "injected"
-
-                        if inj.is_expired():
-                            inj.stop()
-                            if fgen.source != "failsafe":
-                                pkt["source"] = "normal"
-                                fgen.source = "normal"
-                                # clear any route override set by injection
-                                fgen.clear_route_override()
-                else:
-                    pkt["source"] = "normal"
-
-            # ensure numeric types consistent
-            pkt["time"] = float(pkt.get("time", now_s()))
-            pkt["gps_lat"] = float(pkt.get("gps_lat", 0.0))
-            pkt["gps_lon"] = float(pkt.get("gps_lon", 0.0))
-            pkt["vx"] = float(pkt.get("vx", 0.0))
-            pkt["vy"] = float(pkt.get("vy", 0.0))
-            pkt["speed"] = float(pkt.get("speed", 0.0))
-            pkt["yaw"] = float(pkt.get("yaw", 0.0))
-            pkt["roll"] = float(pkt.get("roll", 0.0))
-            pkt["pitch"] = float(pkt.get("pitch", 0.0))
-            pkt["battery"] = float(pkt.get("battery", 0.0))
-            pkt["source"] = pkt.get("source", fgen.source)
+            # fixed-rate physics (frozen while failsafe is active); catch up
+            # a bounded number of missed steps after a stall
+            steps = due.get("physics", 0)
+            if steps and fgen.source != "failsafe":
+                for _ in range(min(steps, MAX_PHYSICS_CATCHUP)):
+                    fgen.advance(physics_interval)
+
+            if "send" not in due:
+                continue
+
+            pkt, injection_report = await next_packet(fgen, inj, client, None)
 
             # Build WS envelope including injection_detail so frontend can show it
             ws_msg = {
@@ -742,54 +1242,285 @@ async def drone_loop(ws, fgen: FlightGenerator, client: BackendClient):
                 "injection_detail": injection_report  # can be None or dict
             }
 
-            # send telemetry over WS (backend expects {"payload": pkt} previously) - keep compatibility: still send payload-only too
-            now_send = now_s()
-            if now_send - last_send >= send_interval:
-                last_send = now_send
-                try:
-                    # send modern envelope
-                    await ws.send(json.dumps(ws_msg))
-                except (websockets.exceptions.ConnectionClosed, ConnectionResetError) as e:
-                    print("[WS] connection closed while sending:", e)
-                    raise
-
-            await asyncio.sleep(0.001)
+            try:
+                await ws.send(encode_frame(ws_msg, signer, encoding))
+            except (websockets.exceptions.ConnectionClosed, ConnectionResetError) as e:
+                log.warning("ws.closed_while_sending", extra={"error": repr(e)})
+                raise
 
         except Exception as e:
-            print("[drone_loop] exception:", e)
+            log.error("drone_loop.error", extra={"error": repr(e)})
             raise
 
 
-async def ws_main_loop(backend_host: str, ws_url: str):
-    client = BackendClient(backend_host, ws_url)
+async def ws_main_loop(backend_host: str, ws_url: str, drone_id: str = DEFAULT_DRONE_ID,
+                       signer: Optional[PacketSigner] = None, encoding: str = "json", push: bool = True,
+                       send_interval: float = TELEMETRY_INTERVAL, physics_interval: float = PHYSICS_INTERVAL):
+    client = BackendClient(backend_host, ws_url, drone_id=drone_id)
     fgen = FlightGenerator(WAYPOINTS, cruise_speed=CRUISE_SPEED_MPS)
 
     try:
         while True:
             try:
-                print(f"[WS] Connecting to backend WS: {ws_url}")
+                log.info("ws.connecting", extra={"url": ws_url})
                 async with websockets.connect(ws_url, ping_interval=10, ping_timeout=5) as ws:
-                    print("[WS] Connected to backend!")
+                    log.info("ws.connected", extra={"url": ws_url})
                     try:
-                        await ws.send(json.dumps({"payload": {"hello": "drone_pi", "time": now_s()}}))
+                        await ws.send(hello_message(drone_id, encoding, push))
                     except Exception:
                         pass
+                    agreed = await negotiate_encoding(ws, encoding)
+                    log.info("ws.encoding", extra={"encoding": agreed})
 
-                    await drone_loop(ws, fgen, client)
+                    # backends that push state need the socket drained; older
+                    # ones never send anything and polling carries on as before
+                    pushed = PushedState() if push else None
+                    reader = asyncio.create_task(read_backend_messages(ws, pushed)) if push else None
+                    try:
+                        await drone_loop(ws, fgen, client, signer, agreed, pushed, send_interval, physics_interval)
+                    finally:
+                        if reader is not None:
+                            reader.cancel()
 
             except (websockets.exceptions.InvalidURI, websockets.exceptions.InvalidHandshake) as e:
-                print("[WS] WebSocket error:", e)
+                log.warning("ws.error", extra={"error": repr(e)})
                 await asyncio.sleep(2.0)
             except (ConnectionRefusedError, OSError) as e:
-                print("[WS] Connection refused / OS error:", e)
+                log.warning("ws.connect_failed", extra={"error": repr(e)})
                 await asyncio.sleep(2.0)
             except Exception as e:
-                print("[WS] Unexpected error, will reconnect in 1s:", e)
+                log.exception("ws.unexpected_error", extra={"retry_s": 1.0})
                 await asyncio.sleep(1.0)
     finally:
         await client.close()
 
 
+# ---------------------------
+# Fleet mode (load generator)
+# ---------------------------
+
+# default magnitudes for scripted attacks, per mode
+FLEET_ATTACK_MAGS = {"jump": 30.0, "speed": 3.0, "heading": 90.0, "gps_drift": 5.0,
+                     "route_override": 200.0, "teleport_dest": 500.0}
+FLEET_ATTACK_DUR = 8  # seconds
+
+
+def random_waypoints(rng: random.Random, center: Tuple[float, float] = WAYPOINTS[0],
+                     n: int = 5, radius_m: float = 150.0) -> List[Tuple[float, float]]:
+    """A random closed loop of n waypoints around a point near ``center``."""
+    origin = dest_point(center, rng.uniform(0, 360), rng.uniform(0, 2 * radius_m))
+    bearings = sorted(rng.uniform(0, 360) for _ in range(n))
+    return [dest_point(origin, b, rng.uniform(0.3, 1.0) * radius_m) for b in bearings]
+
+
+def parse_attack_mix(spec: str) -> List[Tuple[str, float]]:
+    """'jump=3,speed=1' -> [("jump", 0.75), ("speed", 0.25)]"""
+    mix = []
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        mode, _, weight = part.partition("=")
+        if mode not in FLEET_ATTACK_MAGS:
+            raise ValueError(f"unknown attack mode {mode!r}")
+        mix.append((mode, float(weight or 1.0)))
+    total = sum(w for _, w in mix) or 1.0
+    return [(m, w / total) for m, w in mix]
+
+
+class FleetStats:
+    """Per-process counters; end-to-end latency is matched on (drone_id, pkt time)."""
+
+    def __init__(self):
+        self.sent = 0
+        self.errors = 0
+        self.attacks = 0
+        self.inflight: Dict[Tuple[str, float], float] = {}
+        self.latencies: List[float] = []
+
+    def on_send(self, drone_id: str, pkt_time: float):
+        self.sent += 1
+        self.inflight[(drone_id, pkt_time)] = time.perf_counter()
+
+    def on_echo(self, drone_id: str, pkt_time: float):
+        t = self.inflight.pop((drone_id, pkt_time), None)
+        if t is not None:
+            self.latencies.append(time.perf_counter() - t)
+
+    def prune(self, older_than: float = 10.0):
+        # frames the backend coalesced or dropped are never echoed
+        cutoff = time.perf_counter() - older_than
+        self.inflight = {k: t for k, t in self.inflight.items() if t >= cutoff}
+
+
+async def fleet_drone(drone_id: str, rng: random.Random, backend_host: str, ws_url: str,
+                      session: aiohttp.ClientSession, stats: FleetStats, signer: Optional[PacketSigner],
+                      encoding: str, send_interval: float, stop_at: float):
+    """
+    One simulated drone: fixed-rate physics + send, state via push only
+    (no HTTP polling; a fleet would otherwise poll N x 2 times a second).
+    """
+    client = BackendClient(backend_host, ws_url, drone_id=drone_id, session=session)
+    fgen = FlightGenerator(random_waypoints(rng))
+    loop = asyncio.get_running_loop()
+    recheck_every = max(1, int(round(ATTACK_POLL_INTERVAL / send_interval)))
+    while loop.time() < stop_at:
+        try:
+            async with websockets.connect(ws_url, ping_interval=10, ping_timeout=5) as ws:
+                await ws.send(hello_message(drone_id, encoding, push=True))
+                agreed = await negotiate_encoding(ws, encoding)
+                pushed = PushedState()
+                reader = asyncio.create_task(read_backend_messages(ws, pushed))
+                inj = Injection(send_interval)
+                tick = 0
+                # stagger drones across the send interval
+                next_t = loop.time() + rng.uniform(0, send_interval)
+                try:
+                    while next_t < stop_at:
+                        await asyncio.sleep(max(0.0, next_t - loop.time()))
+                        next_t += send_interval
+                        tick += 1
+                        # re-apply pushed state on change, and periodically so an
+                        # expired injection restarts while the attack is still active
+                        if pushed.take_pending() or tick % recheck_every == 0:
+                            apply_attack_state(pushed.attack_active, pushed.attack, inj, fgen)
+                            apply_failsafe_state(pushed.failsafe, inj, fgen)
+                        pkt, injection_report = await next_packet(fgen, inj, client, send_interval)
+                        ws_msg = {"type": "telemetry", "payload": pkt, "injection_detail": injection_report}
+                        await ws.send(encode_frame(ws_msg, signer, agreed))
+                        stats.on_send(drone_id, pkt["time"])
+                finally:
+                    reader.cancel()
+            return  # ran until stop_at; only an error reconnects
+        except Exception:
+            stats.errors += 1
+            await asyncio.sleep(1.0)
+
+
+async def fleet_observer(frontend_url: str, drone_ids: List[str], stats: FleetStats, stop_at: float):
+    """Watch /ws/frontend and match echoed telemetry to what we sent."""
+    loop = asyncio.get_running_loop()
+    while loop.time() < stop_at:
+        try:
+            async with websockets.connect(frontend_url, max_size=None) as ws:
+                await ws.send(json.dumps({"type": "subscribe", "drones": drone_ids, "types": ["telemetry"]}))
+                while loop.time() < stop_at:
+                    raw = await asyncio.wait_for(ws.recv(), timeout=max(0.1, stop_at - loop.time()))
+                    msg = json.loads(raw)
+                    if msg.get("type") == "telemetry":
+                        payload = msg.get("payload") or {}
+                        stats.on_echo(msg.get("drone_id"), payload.get("time"))
+        except asyncio.TimeoutError:
+            return
+        except Exception:
+            await asyncio.sleep(0.5)
+
+
+async def fleet_attacker(backend_host: str, session: aiohttp.ClientSession, drone_ids: List[str],
+                         rng: random.Random, mix: List[Tuple[str, float]], per_min: float,
+                         stats: FleetStats, stop_at: float):
+    """Scripted attacks: each drone is attacked ~per_min times a minute with a mode drawn from mix."""
+    loop = asyncio.get_running_loop()
+    modes = [m for m, _ in mix]
+    weights = [w for _, w in mix]
+    clears: List[Tuple[float, str]] = []
+
+    async def post(path, params):
+        try:
+            async with session.post(f"{backend_host}{path}", params=params, timeout=2.0) as r:
+                await r.read()
+        except Exception:
+            stats.errors += 1
+
+    while loop.time() < stop_at:
+        now = loop.time()
+        for at, drone_id in [c for c in clears if c[0] <= now]:
+            clears.remove((at, drone_id))
+            await post("/attack/clear", {"drone_id": drone_id})
+        for drone_id in drone_ids:
+            if rng.random() < per_min / 60.0 and not any(d == drone_id for _, d in clears):
+                mode = rng.choices(modes, weights)[0]
+                params = {"drone_id": drone_id, "mode": mode, "mag": FLEET_ATTACK_MAGS[mode],
+                          "dur": FLEET_ATTACK_DUR}
+                await post("/attack", params)
+                clears.append((now + FLEET_ATTACK_DUR, drone_id))
+                stats.attacks += 1
+        await asyncio.sleep(1.0)
+    for _, drone_id in clears:
+        await post("/attack/clear", {"drone_id": drone_id})
+
+
+async def run_fleet_shard(drone_ids: List[str], backend_host: str, ws_url: str, frontend_url: str,
+                          duration: float, send_interval: float, encoding: str, key_path: Optional[str],
+                          sign_mode: str, attack_mix: str, attacks_per_min: float, seed: int) -> dict:
+    stats = FleetStats()
+    rng = random.Random(seed)
+    signer = PacketSigner(key_path, sign_mode) if key_path else None
+    loop = asyncio.get_running_loop()
+    stop_at = loop.time() + duration
+    connector = aiohttp.TCPConnector(limit=64)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        tasks = [asyncio.create_task(fleet_drone(d, random.Random(rng.random()), backend_host, ws_url, session,
+                                                 stats, signer, encoding, send_interval, stop_at))
+                 for d in drone_ids]
+        tasks.append(asyncio.create_task(fleet_observer(frontend_url, drone_ids, stats, stop_at + 1.0)))
+        if attacks_per_min > 0:
+            tasks.append(asyncio.create_task(fleet_attacker(backend_host, session, drone_ids, rng,
+                                                            parse_attack_mix(attack_mix), attacks_per_min,
+                                                            stats, stop_at)))
+        t0 = time.perf_counter()
+        while loop.time() < stop_at:
+            await asyncio.sleep(min(1.0, max(0.0, stop_at - loop.time())))
+            stats.prune()
+        elapsed = time.perf_counter() - t0
+        await asyncio.gather(*tasks, return_exceptions=True)
+    return {"drones": len(drone_ids), "sent": stats.sent, "errors": stats.errors, "attacks": stats.attacks,
+            "elapsed": elapsed, "latencies": stats.latencies}
+
+
+def _fleet_process(kwargs: dict) -> dict:
+    setup_logging(log.level or logging.INFO)  # pool workers need their own writer thread
+    try:
+        return asyncio.run(run_fleet_shard(**kwargs))
+    finally:
+        shutdown_logging()
+
+
+def percentile(sorted_xs: List[float], p: float) -> float:
+    if not sorted_xs:
+        return float("nan")
+    return sorted_xs[min(len(sorted_xs) - 1, int(p / 100.0 * len(sorted_xs)))]
+
+
+def run_fleet(args):
+    import multiprocessing
+
+    ids = [f"{args.drone_id}-{i:04d}" for i in range(args.fleet)]
+    procs = max(1, min(args.procs, len(ids)))
+    frontend_url = args.ws.rsplit("/ws/", 1)[0] + "/ws/frontend"
+    shards = [dict(drone_ids=ids[i::procs], backend_host=args.host.rstrip("/"), ws_url=args.ws,
+                   frontend_url=frontend_url, duration=args.duration, send_interval=1.0 / args.rate,
+                   encoding=args.encoding, key_path=args.key, sign_mode=args.sign_mode,
+                   attack_mix=args.attack_mix, attacks_per_min=args.attacks_per_min, seed=args.seed + i)
+              for i in range(procs)]
+    print(f"[FLEET] {len(ids)} drones in {procs} process(es), {args.rate:g} Hz each, {args.duration:g} s")
+    if procs == 1:
+        results = [_fleet_process(shards[0])]
+    else:
+        with multiprocessing.Pool(procs) as pool:
+            results = pool.map(_fleet_process, shards)
+
+    sent = sum(r["sent"] for r in results)
+    elapsed = max(r["elapsed"] for r in results)
+    lat = sorted(x for r in results for x in r["latencies"])
+    print(f"[FLEET] sent {sent} packets in {elapsed:.1f} s -> {sent / elapsed:.0f} packets/s "
+          f"(target {len(ids) * args.rate:.0f}/s); attacks {sum(r['attacks'] for r in results)}, "
+          f"errors {sum(r['errors'] for r in results)}")
+    if lat:
+        print(f"[FLEET] end-to-end latency over {len(lat)} echoed packets (ms): "
+              f"p50 {percentile(lat, 50) * 1e3:.1f}  p90 {percentile(lat, 90) * 1e3:.1f}  "
+              f"p99 {percentile(lat, 99) * 1e3:.1f}  max {lat[-1] * 1e3:.1f}")
+    else:
+        print("[FLEET] no telemetry echoed on /ws/frontend (rejected signatures?)")
+
+
 # ---------------------------
 # CLI / entrypoint
 # ---------------------------
@@ -798,15 +1529,51 @@ def parse_args():
     p = argparse.ArgumentParser()
     p.add_argument("--host", default=DEFAULT_BACKEND_HOST, help="Backend HTTP host (http://...) - mDNS hostnames allowed (droneguard.local)")
     p.add_argument("--ws", default=DEFAULT_WS_URL, help="Backend websocket url (ws://...) - mDNS hostnames allowed")
+    p.add_argument("--drone-id", default=DEFAULT_DRONE_ID, help="Drone id sent in the handshake; backend keeps per-drone state")
+    p.add_argument("--key", default=None, help="RSA private key (PEM) used to sign telemetry")
+    p.add_argument("--encoding", choices=["json", "binary"], default="json",
+                   help="Telemetry wire encoding; binary is negotiated and falls back to JSON")
+    p.add_argument("--rate", type=float, default=1.0 / TELEMETRY_INTERVAL, help="Telemetry send rate (Hz)")
+    p.add_argument("--physics-hz", type=float, default=1.0 / PHYSICS_INTERVAL,
+                   help="Fixed physics integration rate (Hz), independent of --rate")
+    p.add_argument("--fleet", type=int, default=0,
+                   help="Load-generator mode: simulate N drones (ids <drone-id>-0000...) with random routes")
+    p.add_argument("--procs", type=int, default=1, help="Fleet mode: split the fleet across this many processes")
+    p.add_argument("--duration", type=float, default=30.0, help="Fleet mode: run time in seconds")
+    p.add_argument("--attack-mix", default="jump=3,speed=2,heading=2,gps_drift=1",
+                   help="Fleet mode: attack modes and weights, e.g. jump=3,speed=1")
+    p.add_argument("--attacks-per-min", type=float, default=0.0,
+                   help="Fleet mode: scripted attacks per drone per minute (0 = none)")
+    p.add_argument("--seed", type=int, default=0, help="Fleet mode: random seed for routes and attacks")
+    p.add_argument("--no-push", action="store_true",
+                   help="Don't ask the backend to push attack/failsafe state; poll HTTP only")
+    p.add_argument("--sign-mode", choices=["raw", "legacy"], default="raw",
+                   help="raw: signature over the exact bytes sent (default); legacy: signature inside payload")
+    p.add_argument("--log-level", default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+                   help="Log level for drone events (written to stderr)")
     return p.parse_args()
 
 
 def main():
     args = parse_args()
+    setup_logging(args.log_level)
+    try:
+        run(args)
+    finally:
+        shutdown_logging()
+
+
+def run(args):
+    if args.fleet > 0:
+        run_fleet(args)
+        return
     backend_host = args.host
     ws_url = args.ws
+    signer = PacketSigner(args.key, args.sign_mode) if args.key else None
     try:
-        asyncio.run(ws_main_loop(backend_host, ws_url))
+        asyncio.run(ws_main_loop(backend_host, ws_url, drone_id=args.drone_id, signer=signer,
+                                 encoding=args.encoding, push=not args.no_push,
+                                 send_interval=1.0 / args.rate, physics_interval=1.0 / args.physics_hz))
     except KeyboardInterrupt:
         print("Terminated by user")
 
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+make_dataset.py - bulk labeled telemetry for detector tuning
+
+Simulates a fleet of drones offline with drone.py's own FlightGenerator
+and injection code, on virtual time (no network, no sleeping), and writes
+compressed columnar shards:
+
+    out/shard-0000.npz ... one np.savez_compressed file per process
+    out/manifest.json      parameters, columns, label names, row counts
+
+Columns (one row per telemetry packet, drones concatenated, each drone's
+rows in time order): drone, time, gps_lat, gps_lon, alt, vx, vy, speed,
+yaw, roll, pitch, battery, source (drone.BINARY_SOURCES code), label
+(0 = clean, else 1 + index into manifest "modes") and attack (attack id,
+-1 when clean).  ``label`` marks every packet sent while an injection was
+active, including the ones a mode leaves untouched (e.g. after a sudden
+jump), so detection delay can be measured from the window start.
+
+Clean flight between attacks is generated in bulk with
+FlightGenerator.generate_track(); attack windows step the generator packet
+by packet through apply_injection_to_pkt(), exactly as drone.py does
+(minus the local auto-failsafe, which would end every attack after one
+packet).  Each drone's rows depend only on (seed, drone index), so the
+output is the same whatever --procs is.
+
+    python3 make_dataset.py --out data/ds1 --drones 200 --duration 3600 --seed 1
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+import drone
+from drone import (FLEET_ATTACK_MAGS, BINARY_SOURCES, FlightGenerator, Injection, apply_injection_to_pkt,
+                   dest_point, parse_attack_mix, random_waypoints)
+
+EPOCH = 1_700_000_000.0  # virtual start time of every track
+FLOAT64 = ("time", "gps_lat", "gps_lon")
+FLOAT32 = ("alt", "vx", "vy", "speed", "yaw", "roll", "pitch", "battery")
+MODES = tuple(FLEET_ATTACK_MAGS)  # label i + 1 == MODES[i]
+
+
+class VirtualClock:
+    def __init__(self, t: float = EPOCH):
+        self.t = t
+
+    def __call__(self) -> float:
+        return self.t
+
+
+def attack_params(mode: str, pos, rng: random.Random) -> dict:
+    """Attack payload like POST /attack would carry, with jittered magnitude and duration."""
+    params = {"mode": mode, "mag": FLEET_ATTACK_MAGS[mode] * rng.uniform(0.5, 1.5),
+              "style": rng.choice(("sudden", "smooth")), "dur": rng.randint(3, 12)}
+    if mode in ("route_override", "teleport_dest"):
+        params["target_lat"], params["target_lon"] = dest_point(pos, rng.uniform(0, 360), params["mag"])
+    return params
+
+
+class TrackBuilder:
+    """Collects one drone's rows: bulk column blocks from generate_track() and single packets."""
+
+    def __init__(self):
+        self.blocks: List[Dict[str, np.ndarray]] = []
+        self.rows: List[dict] = []
+
+    def add_block(self, cols: Dict[str, np.ndarray], label: int = 0, attack: int = -1):
+        self._flush_rows()
+        n = len(cols["time"])
+        cols["source"] = np.full(n, BINARY_SOURCES["normal"], dtype=np.uint8)
+        cols["label"] = np.full(n, label, dtype=np.uint8)
+        cols["attack"] = np.full(n, attack, dtype=np.int32)
+        self.blocks.append(cols)
+
+    def add_row(self, pkt: dict, label: int, attack: int):
+        self.rows.append({**pkt, "source": BINARY_SOURCES.get(pkt.get("source"), 0),
+                          "label": label, "attack": attack})
+
+    def _flush_rows(self):
+        if self.rows:
+            self.blocks.append({k: np.array([r[k] for r in self.rows]) for k in self.rows[0]})
+            self.rows = []
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        self._flush_rows()
+        names = FLOAT64 + FLOAT32 + ("source", "label", "attack")
+        return {k: np.concatenate([b[k] for b in self.blocks]) if self.blocks else np.empty(0) for k in names}
+
+
+async def simulate_drone(index: int, seed: int, duration: float, dt: float,
+                         mix, attacks_per_min: float, clock: VirtualClock) -> Dict[str, np.ndarray]:
+    # the injection code draws from the global `random`; seed it per drone
+    random.seed(seed * 1_000_003 + index)
+    rng = random.Random(seed * 1_000_003 + index)
+    nprng = np.random.default_rng([seed, index])
+    fgen = FlightGenerator(random_waypoints(rng), cruise_speed=rng.uniform(2.0, 8.0))
+    fgen.battery = rng.uniform(0.5, 1.0)
+    modes = [m for m, _ in mix]
+    weights = [w for _, w in mix]
+    mean_gap = 60.0 / attacks_per_min if attacks_per_min > 0 else float("inf")
+
+    track = TrackBuilder()
+    clock.t = EPOCH
+    end = EPOCH + duration
+    attack_no = 0
+    while clock.t < end - dt / 2:
+        gap = min(rng.expovariate(1.0 / mean_gap) if mix else float("inf"), end - clock.t)
+        if gap >= dt:
+            cols = fgen.generate_track(gap, dt, t0=clock.t, rng=nprng)
+            if len(cols["time"]):
+                track.add_block(cols)
+                clock.t = float(cols["time"][-1])
+        if clock.t >= end - dt / 2 or not mix:
+            break
+
+        mode = rng.choices(modes, weights)[0]
+        label = MODES.index(mode) + 1
+        attack_id = index * 100_000 + attack_no
+        attack_no += 1
+        inj = Injection(dt)
+        inj.start(attack_params(mode, fgen.pos, rng))
+        if mode == "teleport_dest":
+            # Injection.start() turns any target into a route override; keep the
+            # target only in the payload so the teleport branch is exercised
+            inj.route_waypoints = None
+        elif inj.route_waypoints:
+            fgen.set_route_override(inj.route_waypoints)
+        while inj.active and clock.t < end - dt / 2:
+            clock.t += dt
+            pkt = await apply_injection_to_pkt(fgen.step(dt), fgen, inj)
+            pkt["source"] = "injected"
+            track.add_row(pkt, label, attack_id)
+            if inj.is_expired():
+                inj.stop()
+                fgen.clear_route_override()
+        fgen.source = "normal"
+    return track.columns()
+
+
+async def run_shard_async(drones: List[int], seed: int, duration: float, dt: float,
+                          attack_mix: str, attacks_per_min: float) -> Dict[str, np.ndarray]:
+    mix = parse_attack_mix(attack_mix) if attack_mix else []
+    clock = VirtualClock()
+    drone.set_clock(clock)
+    parts = []
+    for i in drones:
+        cols = await simulate_drone(i, seed, duration, dt, mix, attacks_per_min, clock)
+        cols["drone"] = np.full(len(cols["time"]), i, dtype=np.uint32)
+        parts.append(cols)
+    out = {}
+    for k in ("drone",) + FLOAT64 + FLOAT32 + ("source", "label", "attack"):
+        col = np.concatenate([p[k] for p in parts]) if parts else np.empty(0)
+        if k in FLOAT64:
+            col = col.astype(np.float64)
+        elif k in FLOAT32:
+            col = col.astype(np.float32)
+        elif k in ("source", "label"):
+            col = col.astype(np.uint8)
+        elif k == "attack":
+            col = col.astype(np.int32)
+        out[k] = col
+    return out
+
+
+def run_shard(kwargs: dict) -> dict:
+    """Pool worker: simulate a shard and write it; returns row counts."""
+    path = kwargs.pop("path")
+    t0 = time.perf_counter()
+    drone.log.setLevel(logging.WARNING)  # drone.py logs every injection start/stop at INFO
+    cols = asyncio.run(run_shard_async(**kwargs))
+    sim = time.perf_counter() - t0
+    np.savez_compressed(path, **cols)
+    labels = np.bincount(cols["label"], minlength=len(MODES) + 1)
+    return {"path": os.path.basename(path), "rows": int(len(cols["time"])),
+            "labels": labels.tolist(), "simulate_s": sim, "total_s": time.perf_counter() - t0}
+
+
+def load(directory: str) -> Dict[str, np.ndarray]:
+    """Concatenate every shard of a dataset written by this script."""
+    with open(os.path.join(directory, "manifest.json")) as f:
+        manifest = json.load(f)
+    shards = [np.load(os.path.join(directory, s["path"])) for s in manifest["shards"]]
+    return {k: np.concatenate([s[k] for s in shards]) for k in manifest["columns"]}
+
+
+def main(argv: Optional[List[str]] = None):
+    ap = argparse.ArgumentParser(description="Generate a labeled telemetry dataset offline")
+    ap.add_argument("--out", required=True, help="Output directory")
+    ap.add_argument("--drones", type=int, default=100)
+    ap.add_argument("--duration", type=float, default=3600.0, help="Seconds of flight per drone")
+    ap.add_argument("--rate", type=float, default=1.0 / drone.TELEMETRY_INTERVAL, help="Packets per second")
+    ap.add_argument("--procs", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--attack-mix", default=",".join(MODES),
+                    help="Weighted modes, e.g. 'jump=3,speed=1' ('' for clean flight only)")
+    ap.add_argument("--attacks-per-min", type=float, default=1.0, help="Mean attacks per drone per minute")
+    args = ap.parse_args(argv)
+
+    os.makedirs(args.out, exist_ok=True)
+    procs = max(1, min(args.procs, args.drones))
+    ids = list(range(args.drones))
+    shards = [dict(path=os.path.join(args.out, f"shard-{i:04d}.npz"), drones=ids[i::procs], seed=args.seed,
+                   duration=args.duration, dt=1.0 / args.rate, attack_mix=args.attack_mix,
+                   attacks_per_min=args.attacks_per_min)
+              for i in range(procs)]
+    t0 = time.perf_counter()
+    if procs == 1:
+        results = [run_shard(shards[0])]
+    else:
+        import multiprocessing
+        with multiprocessing.Pool(procs) as pool:
+            results = pool.map(run_shard, shards)
+    elapsed = time.perf_counter() - t0
+
+    rows = sum(r["rows"] for r in results)
+    labels = np.sum([r["labels"] for r in results], axis=0).tolist()
+    manifest = {
+        "seed": args.seed, "drones": args.drones, "duration": args.duration, "rate": args.rate,
+        "attack_mix": args.attack_mix, "attacks_per_min": args.attacks_per_min,
+        "modes": list(MODES), "columns": ["drone"] + list(FLOAT64 + FLOAT32) + ["source", "label", "attack"],
+        "sources": BINARY_SOURCES, "rows": rows,
+        "label_counts": dict(zip(["clean"] + list(MODES), labels)),
+        "shards": [{"path": r["path"], "rows": r["rows"]} for r in results],
+    }
+    with open(os.path.join(args.out, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    print(f"{rows} rows ({rows - labels[0]} attacked) from {args.drones} drones in {elapsed:.1f} s "
+          f"with {procs} process(es) -> {rows / elapsed * 60 / 1e6:.1f}M rows/min")
+
+
+if __name__ == "__main__":
+    main()
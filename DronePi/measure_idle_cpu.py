@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+measure_idle_cpu.py - CPU cost of drone.py's main loop with nothing to do
+
+Runs drone_loop() against an in-memory websocket and backend stub (no
+attacks, no failsafe, no network) and reports the CPU time the process
+used per wall-clock second, plus how many frames it sent.
+
+    python3 measure_idle_cpu.py --seconds 20
+    python3 measure_idle_cpu.py --module /path/to/old/drone.py   # compare versions
+"""
+import argparse
+import asyncio
+import importlib.util
+import time
+
+
+class NullWebSocket:
+    def __init__(self):
+        self.sent = 0
+
+    async def send(self, data):
+        self.sent += 1
+
+
+class IdleBackend:
+    """Answers every poll instantly: no attack, failsafe off."""
+
+    attack_state = False
+    failsafe_state = {"active": False}
+
+    async def get_attack_state(self):
+        return False
+
+    async def try_fetch_attack_details(self):
+        return None
+
+    async def get_failsafe_state(self):
+        return {"active": False}
+
+    async def post_activate_failsafe(self, reason="drone_auto"):
+        return {}
+
+    async def post_pi_event(self, event):
+        return None
+
+
+def load(path: str):
+    spec = importlib.util.spec_from_file_location("drone_under_test", path)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+async def measure(drone, seconds: float):
+    ws = NullWebSocket()
+    fgen = drone.FlightGenerator(drone.WAYPOINTS)
+    task = asyncio.create_task(drone.drone_loop(ws, fgen, IdleBackend()))
+    await asyncio.sleep(0.5)  # warm-up
+    sent0, cpu0, wall0 = ws.sent, time.process_time(), time.perf_counter()
+    await asyncio.sleep(seconds)
+    cpu, wall = time.process_time() - cpu0, time.perf_counter() - wall0
+    task.cancel()
+    try:
+        await task
+    except BaseException:
+        pass
+    return cpu, wall, ws.sent - sent0
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--module", default="drone.py", help="drone.py to measure")
+    ap.add_argument("--seconds", type=float, default=10.0)
+    args = ap.parse_args()
+    cpu, wall, sent = asyncio.run(measure(load(args.module), args.seconds))
+    print(f"{args.module}: {cpu / wall * 100:.2f}% CPU ({cpu:.3f} s CPU in {wall:.1f} s), "
+          f"{sent / wall:.2f} frames/s sent")
+
+
+if __name__ == "__main__":
+    main()
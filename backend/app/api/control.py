@@ -1,46 +1,143 @@
 # app/api/control.py
-from fastapi import APIRouter, Body
-from ..state.attack_state import add_attack, clear_attacks, list_attacks, active as attack_active, latest_attack
-from ..state.failsafe_state import get_state, activate, deactivate
+import asyncio
+from typing import Callable, Dict, List, Optional
+from fastapi import APIRouter, Body, HTTPException, Request
+from ..state.drone_sessions import (DroneSession, get_session, find_session, list_sessions, DEFAULT_DRONE_ID,
+                                    on_session_created, on_session_removed)
+from ..state.attack_state import AttackState
+from ..state.failsafe_state import FailsafeState
+from .versioned import versioned_response, wait_for_change, poll_timeout
 
 router = APIRouter()
 
+# Every endpoint takes an optional ?drone_id=...; without it the default
+# drone session (the original single-drone state) is used.
+#
+# The polled GETs (/pi/attack-state, /attack/list, /failsafe/state) carry a
+# state version and ETag: If-None-Match gives 304 when nothing changed, and
+# ?since=<version>&timeout=<s> holds the request until a change (see
+# versioned.py).
+#
+# Only the POSTs (and a /ws/pi hello) create a session. The GETs answer an
+# unknown drone with an empty state that is not kept, so made-up drone_ids
+# cannot make the server allocate sessions. A long-poll on such a drone is
+# parked until its session is created (a POST or a /ws/pi hello), and one
+# held on a session that gets evicted moves on to the replacement.
+
+def _existing(drone_id: str = None):
+    # the default session wraps the module-level state, so it always exists
+    return get_session() if drone_id in (None, DEFAULT_DRONE_ID) else find_session(drone_id)
+
+def _attacks(session: Optional[DroneSession]) -> AttackState:
+    return session.attacks if session is not None else AttackState()
+
+def _failsafe(session: Optional[DroneSession]) -> FailsafeState:
+    return session.failsafe if session is not None else FailsafeState()
+
+# long-polls waiting for a drone's session to be created or removed, per drone_id
+_session_waiters: Dict[str, List[Callable[[], None]]] = {}
+
+def _wake(session: DroneSession):
+    # may run in a threadpool handler (the POSTs)
+    for wake in list(_session_waiters.pop(session.drone_id, ())):
+        wake()
+
+on_session_created(_wake)
+on_session_removed(_wake)
+
+def _session_moved(drone_id: str) -> asyncio.Future:
+    """A future set when ``drone_id``'s session is next created or removed; cancel it when done."""
+    loop = asyncio.get_running_loop()
+    fut = loop.create_future()
+
+    def wake():
+        loop.call_soon_threadsafe(lambda: fut.done() or fut.set_result(True))
+
+    def unpark(_fut):
+        waiters = _session_waiters.get(drone_id)
+        if waiters is not None and wake in waiters:
+            waiters.remove(wake)
+            if not waiters:
+                del _session_waiters[drone_id]
+
+    _session_waiters.setdefault(drone_id, []).append(wake)
+    fut.add_done_callback(unpark)
+    return fut
+
+async def _respond(request: Request, drone_id: Optional[str], pick: Callable, body: Callable,
+                   since: Optional[int], timeout: Optional[float]):
+    """versioned_response for one of a drone's states, following the session as it comes and goes."""
+    key = drone_id or DEFAULT_DRONE_ID
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + (poll_timeout(timeout) if since is not None else 0.0)
+    while True:
+        session = _existing(key)
+        state = pick(session)
+        remaining = deadline - loop.time()
+        if since is None or state.version != since or remaining <= 0:
+            break
+        moved = _session_moved(key)
+        try:
+            if session is None:
+                await asyncio.wait({moved}, timeout=remaining)
+            else:
+                await wait_for_change(state, since, remaining, also=moved)
+        finally:
+            moved.cancel()
+    return await versioned_response(request, state, lambda: body(state))
+
 @router.get("/pi/attack-state")
-def pi_attack_state():
+async def pi_attack_state(request: Request, drone_id: str = None, since: int = None, timeout: float = None):
     """
     Polled by PI. Returns whether any attack is active.
     """
-    return {"status": "ok", "time": __import__("time").time(), "active": bool(attack_active())}
+    return await _respond(
+        request, drone_id, _attacks,
+        lambda attacks: {"status": "ok", "time": __import__("time").time(), "active": bool(attacks.active())},
+        since, timeout)
 
 @router.post("/attack")
-def post_attack(mode: str = None, mag: float = 1.0, style: str = "sudden", dur: int = 10):
+def post_attack(mode: str = None, mag: float = 1.0, style: str = "sudden", dur: int = 10, drone_id: str = None):
     entry = {"mode": mode, "mag": float(mag), "style": style, "dur": int(dur)}
-    added = add_attack(entry)
+    added = get_session(drone_id).attacks.add_attack(entry)
     return {"status": "ok", "received": added}
 
 @router.post("/attack/clear")
-def post_attack_clear():
-    clear_attacks()
+def post_attack_clear(drone_id: str = None):
+    get_session(drone_id).attacks.clear_attacks()
     return {"status": "ok", "cleared": True}
 
 @router.get("/attack/list")
-def get_attack_list():
-    return {"status": "ok", "attacks": list_attacks()}
+async def get_attack_list(request: Request, drone_id: str = None, since: int = None, timeout: float = None):
+    return await _respond(
+        request, drone_id, _attacks, lambda attacks: {"status": "ok", "attacks": attacks.list_attacks()},
+        since, timeout)
 
 @router.get("/attack/latest")
-def get_attack_latest():
-    return {"status": "ok", "latest": latest_attack()}
+def get_attack_latest(drone_id: str = None):
+    return {"status": "ok", "latest": _attacks(_existing(drone_id)).latest_attack()}
 
 @router.get("/failsafe/state")
-def get_failsafe():
-    return get_state()
+async def get_failsafe(request: Request, drone_id: str = None, since: int = None, timeout: float = None):
+    return await _respond(request, drone_id, _failsafe, lambda failsafe: failsafe.get_state(), since, timeout)
 
 @router.post("/failsafe/activate")
-def post_failsafe_activate(reason: str = None):
-    s = activate(reason=reason)
+def post_failsafe_activate(reason: str = None, drone_id: str = None):
+    s = get_session(drone_id).failsafe.activate(reason=reason)
     return {"status": "ok", "failsafe": s}
 
 @router.post("/failsafe/deactivate")
-def post_failsafe_deactivate():
-    s = deactivate()
+def post_failsafe_deactivate(drone_id: str = None):
+    s = get_session(drone_id).failsafe.deactivate()
     return {"status": "ok", "failsafe": s}
+
+@router.get("/drones")
+def get_drones():
+    return {"status": "ok", "drones": [s.summary() for s in list_sessions()]}
+
+@router.get("/drones/{drone_id}")
+def get_drone(drone_id: str):
+    session = find_session(drone_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="unknown drone")
+    return {"status": "ok", "drone": session.summary()}
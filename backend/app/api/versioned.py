@@ -0,0 +1,70 @@
+# app/api/versioned.py
+"""
+Conditional GET and long-poll for versioned state (FailsafeState /
+AttackState carry a ``version`` bumped on every change).
+
+    ETag: "<boot>-<version>"
+    If-None-Match: "<boot>-<version>"  -> 304 while the version is unchanged
+    ?since=<version>[&timeout=<s>]     -> held until version != since or timeout
+
+The boot id keeps ETags from a previous process from matching after a
+restart resets the counters. A held request only registers a state
+listener and awaits a future, so idle watchers cost no CPU; on timeout the
+client gets 304 if it sent a matching ETag, else the (unchanged) state.
+"""
+import asyncio
+import time
+from typing import Callable, Dict, Optional
+
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response
+
+from ..config import LONG_POLL_TIMEOUT, LONG_POLL_MAX_TIMEOUT
+
+_BOOT = format(int(time.time() * 1000), "x")
+
+
+def etag(version: int) -> str:
+    return f'"{_BOOT}-{version}"'
+
+
+def poll_timeout(timeout: Optional[float] = None) -> float:
+    """Seconds to hold a long-poll: the default, or the requested time capped at the maximum."""
+    return LONG_POLL_TIMEOUT if timeout is None else max(0.0, min(timeout, LONG_POLL_MAX_TIMEOUT))
+
+
+async def wait_for_change(state, since: int, timeout: float, also: Optional[asyncio.Future] = None) -> bool:
+    """True once state.version != since, False on timeout (or when ``also`` completes first)."""
+    if state.version != since:
+        return True
+    loop = asyncio.get_running_loop()
+    fut = loop.create_future()
+
+    def changed(_state):
+        # may run in a threadpool handler
+        loop.call_soon_threadsafe(lambda: fut.done() or fut.set_result(True))
+
+    state.add_listener(changed)
+    try:
+        if state.version != since:
+            return True
+        await asyncio.wait({fut} if also is None else {fut, also}, timeout=timeout,
+                           return_when=asyncio.FIRST_COMPLETED)
+        return fut.done()
+    finally:
+        fut.cancel()
+        state.remove_listener(changed)
+
+
+async def versioned_response(request: Request, state, body: Callable[[], Dict],
+                             since: Optional[int] = None, timeout: Optional[float] = None) -> Response:
+    """Answer a GET for ``state``: long-poll if asked, 304 if the client is current, else body()."""
+    if since is not None:
+        await wait_for_change(state, since, poll_timeout(timeout))
+    tag = etag(state.version)
+    headers = {"ETag": tag, "Cache-Control": "no-cache"}
+    if tag in (t.strip() for t in request.headers.get("if-none-match", "").split(",")):
+        return Response(status_code=304, headers=headers)
+    content = body()
+    content["version"] = state.version
+    return JSONResponse(content, headers=headers)
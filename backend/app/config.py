@@ -1,6 +1,72 @@
 # app/config.py
+import os
+
 WS_FRONTEND_PATH = "/ws/frontend"
 WS_PI_PATH = "/ws/pi"
 
 MAX_TELEMETRY_BUFFER = 1000
 ALERT_BROADCAST_LIMIT = 500
+
+# /ws/pi signature verification (off the event loop)
+VERIFY_WORKERS = os.cpu_count() or 2
+VERIFY_MAX_BATCH = 32
+PI_INGEST_QUEUE = 64   # packets per drone awaiting verification before backpressure
+
+# /ws/frontend fan-out: per-client outbound queue (telemetry is coalesced per drone)
+FRONTEND_QUEUE_SIZE = 64
+
+# Flight recorder: set DRONEGUARD_RECORDER_DIR to enable
+RECORDER_DIR = os.environ.get("DRONEGUARD_RECORDER_DIR") or None
+RECORDER_SEGMENT_BYTES = 64 * 1024 * 1024
+RECORDER_INDEX_EVERY = 256        # records between sparse index entries
+RECORDER_FLUSH_INTERVAL = 0.5     # seconds
+RECORDER_BATCH = 4096             # wake the writer early once this many are pending
+RECORDER_MAX_PENDING = 256 * 1024 # records waiting for the writer before new ones are dropped
+
+# Long-poll (?since=<version>) on the state endpoints
+LONG_POLL_TIMEOUT = 25.0          # seconds, default hold time
+LONG_POLL_MAX_TIMEOUT = 60.0
+
+# Per-drone telemetry history for /telemetry/query (older ranges come from the flight recorder)
+TELEMETRY_HISTORY_SAMPLES = 4 * 3600 * 2   # two hours at 4 Hz
+TELEMETRY_HISTORY_CHUNK = 1024             # rows allocated at a time
+QUERY_MAX_ROWS = 10000                     # limit / points ceiling per request
+
+# Long-term telemetry history (SQLite, WAL mode): set DRONEGUARD_HISTORY_DB to a file path to enable
+HISTORY_DB = os.environ.get("DRONEGUARD_HISTORY_DB") or None
+HISTORY_FLUSH_INTERVAL = 1.0       # seconds between batched writes
+HISTORY_BATCH = 4096               # wake the writer early once this many are pending
+HISTORY_MAX_PENDING = 256 * 1024   # samples waiting for the writer before new ones are dropped
+HISTORY_RAW_RETENTION_DAYS = float(os.environ.get("DRONEGUARD_HISTORY_RAW_DAYS", 14))
+HISTORY_ROLLUP_RETENTION_DAYS = float(os.environ.get("DRONEGUARD_HISTORY_ROLLUP_DAYS", 365))
+HISTORY_PRUNE_INTERVAL = 600.0     # seconds between retention passes
+HISTORY_ROLLUP_AFTER = 6 * 3600    # /telemetry/query ranges longer than this read minute rollups
+
+# Incidents: consecutive alerts of one type and drone are merged into one incident
+INCIDENT_OPEN_AFTER = int(os.environ.get("DRONEGUARD_INCIDENT_OPEN_AFTER", 1))        # anomalous packets
+INCIDENT_CLOSE_AFTER = float(os.environ.get("DRONEGUARD_INCIDENT_CLOSE_AFTER", 3.0))  # quiet seconds
+INCIDENT_UPDATE_INTERVAL = 1.0     # seconds between update events per incident
+
+# Failsafe engine (auto mode)
+FAILSAFE_DEBOUNCE = 0.0            # seconds an incident must last before it triggers an action
+FAILSAFE_MIN_DWELL = 5.0           # seconds before an active action is replaced by an equal-priority one
+
+# Logging (app/log.py): queued, written by a background thread, rate limited per event key
+LOG_LEVEL = os.environ.get("DRONEGUARD_LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.environ.get("DRONEGUARD_LOG_FORMAT", "text")     # text | json
+LOG_QUEUE_SIZE = 10000             # records waiting for the writer before new ones are dropped
+LOG_RATE = 5.0                     # records per second per event key ...
+LOG_BURST = 20                     # ... after a burst of this many
+# keep 1 in N records of an event key, e.g. DRONEGUARD_LOG_SAMPLE="pi.signature_rejected=10"
+LOG_SAMPLE = {k: int(n) for k, _, n in (item.partition("=") for item in
+              os.environ.get("DRONEGUARD_LOG_SAMPLE", "").split(",")) if k and n}
+
+# Shared state for multiple workers (uvicorn --workers N): set DRONEGUARD_STATE_URL to
+# redis://host:port (Redis, or python -m app.shared.resp_server); unset keeps it in-process
+STATE_URL = os.environ.get("DRONEGUARD_STATE_URL") or None
+RESP_RECONNECT_INTERVAL = 1.0      # seconds between attempts while the state server is unreachable
+RESP_SERVER_MAX_PENDING = 8 * 1024 * 1024   # resp_server: bytes buffered per subscriber before it is skipped
+
+# Drone sessions without a /ws/pi connection are dropped after this many idle seconds
+SESSION_IDLE_TTL = float(os.environ.get("DRONEGUARD_SESSION_IDLE_TTL", 600))
+SESSION_EVICT_INTERVAL = 60.0      # seconds between eviction passes
@@ -0,0 +1,15 @@
+# app/detectors/__init__.py
+from typing import List
+
+from .base import Detector
+from .physics_check import PhysicsDetector
+from .gps_spoof import GpsSpoofDetector
+from .imu_consistency import ImuDetector
+from .heading_mismatch import HeadingDetector
+
+# order matters: alerts are reported in this order
+DETECTORS = [PhysicsDetector, GpsSpoofDetector, ImuDetector, HeadingDetector]
+
+def make_detectors() -> List[Detector]:
+    """Fresh detector instances for one drone session."""
+    return [cls() for cls in DETECTORS]
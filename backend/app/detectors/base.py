@@ -0,0 +1,23 @@
+# app/detectors/base.py
+"""
+Stateful detector interface.
+
+A detector instance belongs to one drone session. ``update`` receives only
+the new packet, compares it against whatever small state the detector keeps
+(previous fix, previous yaw, ...) and then advances that state, so each call
+is O(1) and never touches the telemetry buffer.
+"""
+from abc import ABC, abstractmethod
+from typing import Dict
+
+
+class Detector(ABC):
+    type = "UNKNOWN"
+
+    @abstractmethod
+    def update(self, pkt: Dict) -> Dict:
+        ...
+
+    def reset(self):
+        """Forget history, e.g. after a reconnect."""
+        self.__init__()
@@ -0,0 +1,148 @@
+# app/detectors/batch.py
+"""
+Vectorized batch versions of the four per-packet detectors.
+
+Runs physics, GPS-jump, IMU-heading and yaw-jump checks over N packets in
+one NumPy pass.  Input is the columnar layout used by TelemetryRing
+(rows = samples oldest -> newest, columns = telemetry_buffer.FIELDS, NaN
+for missing or non-numeric values).  Each row is compared against the row
+before it; ``prev`` supplies the sample preceding row 0 when a batch
+continues a stream.
+
+Results mirror the scalar detectors: the same rows are flagged with the same
+alert types, and detail values agree to within a few ulp (NumPy's
+vectorized atan2/cos are not bit-identical to libm).  Score arrays (jump distance, implied speed,
+heading differences) are filled for every row where the check applies,
+not only where it fires, so thresholds can be swept without re-running.
+"""
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+
+from ..state.telemetry_buffer import FIELDS, FIELD_INDEX, TelemetryRing, _as_float
+from .physics_check import MAX_REASONABLE_SPEED
+from .gps_spoof import GPS_JUMP_THRESHOLD_M
+from .imu_consistency import HEADING_MISMATCH_THRESHOLD_DEG
+from .heading_mismatch import YAW_JUMP_THRESHOLD
+
+IMU_MIN_SPEED = 0.5  # same low-speed cut-off as detect_imu
+
+
+def columns_from_packets(pkts: Sequence[Dict]) -> np.ndarray:
+    """Pack telemetry dicts into a (N, len(FIELDS)) float64 array."""
+    out = np.empty((len(pkts), len(FIELDS)))
+    for i, pkt in enumerate(pkts):
+        out[i] = [_as_float(pkt.get(name)) for name in FIELDS]
+    return out
+
+
+def _shift(col: np.ndarray, first: float) -> np.ndarray:
+    prev = np.empty_like(col)
+    prev[0] = first
+    prev[1:] = col[:-1]
+    return prev
+
+
+def detect_batch(data: np.ndarray, prev: Optional[np.ndarray] = None,
+                 max_speed: float = MAX_REASONABLE_SPEED,
+                 gps_jump_m: float = GPS_JUMP_THRESHOLD_M,
+                 heading_mismatch_deg: float = HEADING_MISMATCH_THRESHOLD_DEG,
+                 yaw_jump_deg: float = YAW_JUMP_THRESHOLD) -> Dict:
+    """
+    Run all detectors over ``data``. Returns
+    {"anomaly": mask, "physics": {...}, "gps_spoof": {...}, "imu": {...}, "heading": {...}}
+    where each detector entry holds an "anomaly" mask and its detail arrays.
+    """
+    data = np.asarray(data, dtype=np.float64)
+    n = len(data)
+    if prev is None:
+        prev = np.full(len(FIELDS), np.nan)
+
+    def col(name):
+        return data[:, FIELD_INDEX[name]]
+
+    def prev_col(name):
+        return _shift(col(name), prev[FIELD_INDEX[name]]) if n else col(name)
+
+    t, lat, lon = col("time"), col("gps_lat"), col("gps_lon")
+    vx, vy, yaw, speed_field = col("vx"), col("vy"), col("yaw"), col("speed")
+    p_t, p_lat, p_lon, p_yaw = prev_col("time"), prev_col("gps_lat"), prev_col("gps_lon"), prev_col("yaw")
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        # shared flat-earth displacement from the previous fix
+        dy = (lat - p_lat) * 111000.0
+        dx = (lon - p_lon) * (111000.0 * np.abs(np.cos(np.radians(p_lat))))
+        dist = np.sqrt(dx * dx + dy * dy)
+
+        # ---- physics: implied speed between fixes, then reported speed ----
+        dt = t - p_t
+        have_fix = ~np.isnan(lat) & ~np.isnan(p_lat)
+        jump_branch = have_fix & (dt > 0) & ~np.isnan(p_lon)
+        # detect_physics bails out when the current longitude is unusable
+        usable = have_fix & ~(jump_branch & np.isnan(lon))
+        implied_speed = np.where(jump_branch, dist / dt, np.nan)
+        implied_hit = usable & (implied_speed > max_speed)
+
+        v = np.sqrt(vx ** 2 + vy ** 2)
+        speed = np.where(np.isnan(v) | (v == 0), speed_field, v)
+        speed_hit = usable & ~implied_hit & (speed > max_speed)
+        physics_mask = implied_hit | speed_hit
+
+        # ---- GPS jump ----
+        jump_m = np.where(~np.isnan(p_lat) & ~np.isnan(p_lon), np.hypot(dx, dy), np.nan)
+        gps_mask = jump_m >= gps_jump_m
+
+        # ---- IMU heading vs velocity heading ----
+        imu_speed = np.hypot(vx, vy)
+        heading = np.mod(np.degrees(np.arctan2(vx, vy)) + 360.0, 360.0)
+        imu_diff = np.abs(np.mod(heading - yaw + 180, 360) - 180)
+        imu_diff = np.where(imu_speed >= IMU_MIN_SPEED, imu_diff, np.nan)
+        imu_mask = imu_diff >= heading_mismatch_deg
+
+        # ---- yaw jump ----
+        yaw_diff = np.abs(np.mod(yaw - p_yaw + 180.0, 360.0) - 180.0)
+        heading_mask = yaw_diff >= yaw_jump_deg
+
+    return {
+        "anomaly": physics_mask | gps_mask | imu_mask | heading_mask,
+        "physics": {"anomaly": physics_mask, "implied": implied_hit, "implied_speed": implied_speed,
+                    "jump_meters": np.where(jump_branch, dist, np.nan), "dt": dt, "speed": speed},
+        "gps_spoof": {"anomaly": gps_mask, "jump_m": jump_m},
+        "imu": {"anomaly": imu_mask, "heading": heading, "yaw": yaw, "diff": imu_diff},
+        "heading": {"anomaly": heading_mask, "prev_yaw": p_yaw, "yaw": yaw, "diff": yaw_diff},
+    }
+
+
+def detect_ring(ring: TelemetryRing, n: int) -> Dict:
+    """Micro-batch over the newest ``n`` samples of a ring, using the sample before them as ``prev``."""
+    window = ring.last(n + 1)
+    if len(window) <= n:
+        return detect_batch(window)
+    return detect_batch(window[1:], prev=window[0])
+
+
+def alerts_at(result: Dict, i: int) -> List[Dict]:
+    """Rebuild the scalar-style alert dicts for row ``i`` (anomalies only, DETECTORS order)."""
+    alerts = []
+    phys = result["physics"]
+    if phys["anomaly"][i]:
+        if phys["implied"][i]:
+            detail = {"implied_speed": float(phys["implied_speed"][i]), "threshold": MAX_REASONABLE_SPEED,
+                      "dt": float(phys["dt"][i]), "jump_meters": float(phys["jump_meters"][i])}
+        else:
+            detail = {"speed": float(phys["speed"][i]), "threshold": MAX_REASONABLE_SPEED}
+        alerts.append({"type": "IMPOSSIBLE_MOVEMENT", "anomaly": True, "detail": detail})
+    gps = result["gps_spoof"]
+    if gps["anomaly"][i]:
+        alerts.append({"type": "GPS_SPOOF", "anomaly": True,
+                       "detail": {"jump_m": float(gps["jump_m"][i]), "threshold_m": GPS_JUMP_THRESHOLD_M}})
+    imu = result["imu"]
+    if imu["anomaly"][i]:
+        alerts.append({"type": "IMU_HEADING_MISMATCH", "anomaly": True,
+                       "detail": {"heading": float(imu["heading"][i]), "yaw": float(imu["yaw"][i]),
+                                  "diff": float(imu["diff"][i]), "threshold": HEADING_MISMATCH_THRESHOLD_DEG}})
+    hdg = result["heading"]
+    if hdg["anomaly"][i]:
+        alerts.append({"type": "YAW_JUMP", "anomaly": True,
+                       "detail": {"prev_yaw": float(hdg["prev_yaw"][i]), "yaw": float(hdg["yaw"][i]),
+                                  "diff": float(hdg["diff"][i])}})
+    return alerts
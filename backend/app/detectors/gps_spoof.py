@@ -7,20 +7,18 @@ Simple algorithm:
 """
 from typing import Dict, List
 import math
+from .base import Detector
 
 GPS_JUMP_THRESHOLD_M = 30.0  # meters for sudden jump
 
-def detect_gps_spoof(pkt: Dict, buf: List[Dict]) -> Dict:
+def _check(pkt: Dict, prev_lat, prev_lon) -> Dict:
     alert = {"type": "GPS_SPOOF", "anomaly": False, "detail": {}}
     try:
-        if not buf:
-            return alert
-        prev = buf[-1]
-        if prev.get("gps_lat") is None or prev.get("gps_lon") is None:
+        if prev_lat is None or prev_lon is None:
             return alert
         if pkt.get("gps_lat") is None or pkt.get("gps_lon") is None:
             return alert
-        lat1, lon1 = float(prev["gps_lat"]), float(prev["gps_lon"])
+        lat1, lon1 = float(prev_lat), float(prev_lon)
         lat2, lon2 = float(pkt["gps_lat"]), float(pkt["gps_lon"])
         dy = (lat2 - lat1) * 111000.0
         dx = (lon2 - lon1) * (111000.0 * abs(math.cos(math.radians(lat1))))
@@ -32,3 +30,22 @@ def detect_gps_spoof(pkt: Dict, buf: List[Dict]) -> Dict:
     except Exception:
         return alert
     return alert
+
+def detect_gps_spoof(pkt: Dict, buf: List[Dict]) -> Dict:
+    """Stateless form: ``buf[-1]`` is taken as the previous sample."""
+    prev = buf[-1] if buf else {}
+    return _check(pkt, prev.get("gps_lat"), prev.get("gps_lon"))
+
+
+class GpsSpoofDetector(Detector):
+    type = "GPS_SPOOF"
+
+    def __init__(self):
+        self.prev_lat = None
+        self.prev_lon = None
+
+    def update(self, pkt: Dict) -> Dict:
+        alert = _check(pkt, self.prev_lat, self.prev_lon)
+        self.prev_lat = pkt.get("gps_lat")
+        self.prev_lon = pkt.get("gps_lon")
+        return alert
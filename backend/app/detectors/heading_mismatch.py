@@ -5,19 +5,17 @@ If yaw changes abruptly without corresponding rotation, flag.
 """
 from typing import Dict, List
 import math
+from .base import Detector
 
 YAW_JUMP_THRESHOLD = 60.0  # degrees
 
-def detect_heading(pkt: Dict, buf: List[Dict]) -> Dict:
+def _check(pkt: Dict, prev_yaw) -> Dict:
     alert = {"type": "YAW_JUMP", "anomaly": False, "detail": {}}
     try:
-        if not buf:
-            return alert
-        prev = buf[-1]
-        if prev.get("yaw") is None or pkt.get("yaw") is None:
+        if prev_yaw is None or pkt.get("yaw") is None:
             return alert
         try:
-            prev_yaw = float(prev["yaw"]); cur_yaw = float(pkt["yaw"])
+            prev_yaw = float(prev_yaw); cur_yaw = float(pkt["yaw"])
         except Exception:
             return alert
         diff = abs((cur_yaw - prev_yaw + 180.0) % 360.0 - 180.0)
@@ -28,3 +26,20 @@ def detect_heading(pkt: Dict, buf: List[Dict]) -> Dict:
     except Exception:
         return alert
     return alert
+
+def detect_heading(pkt: Dict, buf: List[Dict]) -> Dict:
+    """Stateless form: ``buf[-1]`` is taken as the previous sample."""
+    prev = buf[-1] if buf else {}
+    return _check(pkt, prev.get("yaw"))
+
+
+class HeadingDetector(Detector):
+    type = "YAW_JUMP"
+
+    def __init__(self):
+        self.prev_yaw = None
+
+    def update(self, pkt: Dict) -> Dict:
+        alert = _check(pkt, self.prev_yaw)
+        self.prev_yaw = pkt.get("yaw")
+        return alert
@@ -5,6 +5,7 @@ Flag if mismatch greater than threshold.
 """
 from typing import Dict, List
 import math
+from .base import Detector
 
 HEADING_MISMATCH_THRESHOLD_DEG = 40.0  # degrees
 
@@ -34,3 +35,11 @@ def detect_imu(pkt: Dict, buf: List[Dict]) -> Dict:
     except Exception:
         return alert
     return alert
+
+
+class ImuDetector(Detector):
+    """Needs no history: compares each packet's own velocity heading and yaw."""
+    type = "IMU_HEADING_MISMATCH"
+
+    def update(self, pkt: Dict) -> Dict:
+        return detect_imu(pkt, None)
@@ -4,19 +4,18 @@ Detect impossible movement between consecutive GPS points.
 Produces alert dict or None.
 """
 from typing import Dict, List, Optional
-from ..state.telemetry_buffer import get_buffer
-from math import isfinite
+import math
+from .base import Detector
 
 # conservative threshold: speed > 50 m/s (~180 km/h) flagged as impossible for small drones
 MAX_REASONABLE_SPEED = 50.0
 
-def detect_physics(pkt: Dict, buf: List[Dict]) -> Dict:
+def _check(pkt: Dict, prev: Optional[Dict]) -> Dict:
     alert = {"type": "PHYSICS_CHECK", "anomaly": False, "detail": {}}
     try:
         # need previous sample (most recent before current)
-        if not buf:
+        if not prev:
             return alert
-        prev = buf[-1]
         # require gps fields
         if pkt.get("gps_lat") is None or prev.get("gps_lat") is None:
             return alert
@@ -75,3 +74,20 @@ def detect_physics(pkt: Dict, buf: List[Dict]) -> Dict:
         return alert
 
     return alert
+
+def detect_physics(pkt: Dict, buf: List[Dict]) -> Dict:
+    """Stateless form: ``buf[-1]`` is taken as the previous sample."""
+    return _check(pkt, buf[-1] if buf else None)
+
+
+class PhysicsDetector(Detector):
+    type = "IMPOSSIBLE_MOVEMENT"
+
+    def __init__(self):
+        # previous fix only: time and position
+        self.prev: Optional[Dict] = None
+
+    def update(self, pkt: Dict) -> Dict:
+        alert = _check(pkt, self.prev)
+        self.prev = {"time": pkt.get("time"), "gps_lat": pkt.get("gps_lat"), "gps_lon": pkt.get("gps_lon")}
+        return alert
@@ -1,112 +1,186 @@
 # utils/failsafe/failsafe_engine.py
 
+import time
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple
+
+from app.config import FAILSAFE_DEBOUNCE, FAILSAFE_MIN_DWELL
+from app.log import get_logger
 from app.state import failsafe_state
 
+log = get_logger("failsafe")
+
+
+class Action(NamedTuple):
+    reason: str      # written to the failsafe state
+    priority: int    # higher wins; an active failsafe is only ever escalated
+
+
+HOLD, RTH, LAND = 1, 2, 3
+
+# ---------------------------------------------
+# FAILSAFE RULES PER ATTACK TYPE
+# ---------------------------------------------
+# attack type -> {severity: action}; None covers every other severity
+RULES: Dict[str, Dict[Optional[str], Action]] = {
+    "GPS_SPOOF": {
+        "high": Action("GPS_SPOOF_RTH", RTH),                   # auto Return-To-Home
+        None: Action("GPS_SPOOF_HOLD", HOLD),                   # auto position hold
+    },
+    "HEADING_MISMATCH": {
+        "high": Action("HEADING_EMERGENCY_LAND", LAND),
+        None: Action("HEADING_HOLD", HOLD),
+    },
+    # IMU errors are dangerous → force immediate land
+    "IMU_INCONSISTENT": {None: Action("IMU_EMERGENCY_LAND", LAND)},
+    "PHYSICS_FAIL": {None: Action("PHYSICS_HOLD", HOLD)},
+}
+
+# detector alert types -> rule names
+ALIASES = {
+    "IMPOSSIBLE_MOVEMENT": "PHYSICS_FAIL",
+    "YAW_JUMP": "HEADING_MISMATCH",
+    "IMU_HEADING_MISMATCH": "IMU_INCONSISTENT",
+}
+
+SEVERITIES = ("low", "medium", "high")
+
+RuleTable = Tuple[Dict[Tuple[str, str], Action], Dict[str, Action]]
+
+
+def compile_rules(rules: Dict[str, Dict[Optional[str], Action]] = RULES,
+                  aliases: Dict[str, str] = ALIASES) -> RuleTable:
+    """
+    Flatten the rules into ({(type, severity): action}, {type: fallback action})
+    with every alias and known severity spelled out, so a decision is one or
+    two dict lookups.
+    """
+    exact: Dict[Tuple[str, str], Action] = {}
+    fallback: Dict[str, Action] = {}
+    names = {name: name for name in rules}
+    names.update((alias, target) for alias, target in aliases.items() if target in rules)
+    for kind, target in names.items():
+        by_severity = rules[target]
+        default = by_severity.get(None)
+        if default is not None:
+            fallback[kind] = default
+        for severity in SEVERITIES:
+            action = by_severity.get(severity, default)
+            if action is not None:
+                exact[(kind, severity)] = action
+    return exact, fallback
+
+
+_COMPILED = compile_rules()
+
+
 class FailsafeEngine:
     """
-    Central engine that decides when to activate or deactivate failsafe modes.
-    Highly modular, easy to extend with new detection rules.
+    Decides when to activate failsafe modes for one drone, from a compiled
+    rule table.
+
+    process_detections() looks at every detection it is given and acts on
+    the highest-priority action among them, subject to:
+      - debounce: a detection carrying "since" (when the anomaly started)
+        and "time" only counts once it has lasted ``debounce`` seconds
+      - dwell: an active failsafe is escalated to a higher-priority action
+        at once, replaced by an equal one only after ``dwell`` seconds, and
+        never downgraded (clearing it is up to the operator)
+    Nothing happens unless the drone's failsafe state is in auto mode.
     """
 
-    def __init__(self):
-        pass
+    def __init__(self, state=None, rules: Optional[RuleTable] = None,
+                 debounce: float = FAILSAFE_DEBOUNCE, dwell: float = FAILSAFE_MIN_DWELL,
+                 drone_id: Optional[str] = None):
+        # any object exposing get_state/activate/deactivate; defaults to the
+        # process-wide failsafe_state module (single-drone behaviour)
+        self.state = state if state is not None else failsafe_state
+        self.drone_id = drone_id
+        self._exact, self._fallback = rules if rules is not None else _COMPILED
+        self._priority = {a.reason: a.priority for a in (*self._exact.values(), *self._fallback.values())}
+        self.debounce = debounce
+        self.dwell = dwell
+        self._activated_at = -float("inf")   # in detection time, for the dwell check
+        self.decisions = 0
+        self.activations = 0
+        self.unknown = 0
+        self.last_action: Optional[Action] = None
 
     # ---------------------------------------------
     # PUBLIC API
     # ---------------------------------------------
-    def process_detection(self, detection: dict):
+    def lookup(self, attack_type: str, severity: str = "low") -> Optional[Action]:
+        action = self._exact.get((attack_type, severity))
+        return action if action is not None else self._fallback.get(attack_type)
+
+    def process_detection(self, detection: dict) -> Optional[Action]:
         """
-        Called by detectors every time new detection results arrive.
-        Example detection payload:
+        One detection, e.g.
         {
             "attack_detected": True,
             "attack_type": "GPS_SPOOF",
             "severity": "high"
         }
         """
+        return self.process_detections((detection,))
 
-        if not detection.get("attack_detected", False):
-            return  # No attack → ignore safely
-
-        attack_type = detection.get("attack_type")
-        severity = detection.get("severity", "low")
-
-        # ----- AUTO FAILSAFE HANDLING -----
-        state = failsafe_state.get_state()
-        auto_mode = state.get("auto_mode", False)
-
-        if auto_mode:
-            self._auto_failsafe_logic(attack_type, severity)
-        else:
-            # Manual mode → only report attack, NO intervention
-            print(f"[Failsafe] Attack detected ({attack_type}) but AUTO FAILSAFE is OFF.")
-            return
-
-    def clear_failsafe(self):
-        """
-        Called when drone recovers or operator manually clears failsafe.
-        """
-        failsafe_state.deactivate()
-        print("[Failsafe] Cleared.")
-
-    # ---------------------------------------------
-    # INTERNAL LOGIC (Private Methods)
-    # ---------------------------------------------
-    def _auto_failsafe_logic(self, attack_type: str, severity: str):
+    def process_detections(self, detections: Iterable[dict], now: Optional[float] = None) -> Optional[Action]:
         """
-        Automatic failsafe decision tree.
+        Act on a batch of detections (all alerts of a packet, or incident
+        transitions); returns the action taken, if any.  ``now`` defaults to
+        the newest detection "time", else the wall clock.
         """
+        self.decisions += 1
+        best = None
+        latest = None
+        for d in detections:
+            if not d.get("attack_detected", False):
+                continue
+            action = self.lookup(d.get("attack_type"), d.get("severity") or "low")
+            if action is None:
+                self.unknown += 1
+                log.debug("failsafe.unknown_type", drone_id=self.drone_id, attack_type=d.get("attack_type"))
+                continue
+            t = d.get("time")
+            if t is not None:
+                latest = t if latest is None or t > latest else latest
+                since = d.get("since")
+                if since is not None and t - since < self.debounce:
+                    continue
+            if best is None or action.priority > best.priority:
+                best = action
+        if best is None:
+            return None
+
+        state = self.state.get_state()
+        if not state.get("auto_mode", False):
+            # manual mode → only report attack, NO intervention
+            log.info("failsafe.report_only", drone_id=self.drone_id, action=best.reason)
+            return None
+        if now is None:
+            now = latest if latest is not None else time.time()
+        if state.get("active"):
+            # operator or unknown reasons outrank every rule
+            current = self._priority.get(state.get("reason"), float("inf"))
+            if best.priority < current or best.reason == state.get("reason"):
+                return None
+            if best.priority == current and now - self._activated_at < self.dwell:
+                return None
+        log.warning("failsafe.activate", drone_id=self.drone_id, action=best.reason,
+                    previous=state.get("reason") if state.get("active") else None)
+        self.state.activate(best.reason)
+        self._activated_at = now
+        self.activations += 1
+        self.last_action = best
+        return best
 
-        if attack_type == "GPS_SPOOF":
-            self._handle_gps_spoof(severity)
-
-        elif attack_type == "HEADING_MISMATCH":
-            self._handle_heading_attack(severity)
-
-        elif attack_type == "IMU_INCONSISTENT":
-            self._handle_imu_failure(severity)
-
-        elif attack_type == "PHYSICS_FAIL":
-            self._handle_physics_violation(severity)
-
-        else:
-            print(f"[Failsafe] Unknown attack type: {attack_type}")
-
-    # ---------------------------------------------
-    # FAILSAFE RULES PER ATTACK TYPE
-    # ---------------------------------------------
-    def _handle_gps_spoof(self, severity: str):
+    def clear_failsafe(self):
         """
-        GPS Spoof handling logic.
+        Called when drone recovers or operator manually clears failsafe.
         """
-        print(f"[Failsafe] GPS Spoof detected (severity={severity})")
-
-        if severity == "high":
-            failsafe_state.activate("GPS_SPOOF_RTH")
-            print("[Failsafe] → Auto Return-To-Home triggered.")
-        else:
-            failsafe_state.activate("GPS_SPOOF_HOLD")
-            print("[Failsafe] → Auto Position Hold triggered.")
-
-    def _handle_heading_attack(self, severity: str):
-        print(f"[Failsafe] Heading mismatch detected (severity={severity})")
-
-        if severity == "high":
-            failsafe_state.activate("HEADING_EMERGENCY_LAND")
-            print("[Failsafe] → Emergency Land triggered.")
-        else:
-            failsafe_state.activate("HEADING_HOLD")
-            print("[Failsafe] → Holding position.")
-
-    def _handle_imu_failure(self, severity: str):
-        print(f"[Failsafe] IMU inconsistency detected (severity={severity})")
-
-        # IMU errors are dangerous → force immediate land
-        failsafe_state.activate("IMU_EMERGENCY_LAND")
-        print("[Failsafe] → EMERGENCY LAND activated due to IMU failure.")
-
-    def _handle_physics_violation(self, severity: str):
-        print(f"[Failsafe] Physics violation detected (severity={severity})")
+        self.state.deactivate()
+        self._activated_at = -float("inf")
+        log.info("failsafe.cleared", drone_id=self.drone_id)
 
-        failsafe_state.activate("PHYSICS_HOLD")
-        print("[Failsafe] → Holding position due to physics anomaly.")
+    def stats(self) -> Dict:
+        return {"decisions": self.decisions, "activations": self.activations, "unknown": self.unknown,
+                "last_action": self.last_action.reason if self.last_action else None}
@@ -0,0 +1,247 @@
+# app/log.py
+"""
+Structured, non-blocking logging.
+
+    from .log import get_logger
+    log = get_logger("ws_pi")
+    log.info("pi.hello", drone_id=drone_id, push=True)
+
+Every event has a dotted key plus keyword fields.  Records go through a
+QueueHandler into a bounded queue; a QueueListener thread formats them
+(text or JSON lines) and writes them, so the event loop never waits on
+stdout or a file.  A full queue drops the record and counts it.
+
+Before a record is queued, a per-key filter applies sampling (keep 1 in N,
+for keys listed in LOG_SAMPLE) and a token-bucket rate limit (LOG_RATE per
+second with bursts of LOG_BURST), so an attack at 4 Hz per drone cannot
+flood the log.  The next record that gets through reports how many were
+suppressed.
+
+Each Log keeps its logger's effective level in a plain attribute, so a
+disabled debug() in a hot path costs a method call and one integer
+comparison.  Change levels with set_level() (or setup_logging()), which
+refreshes them.
+"""
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import time
+from typing import Any, Dict, Optional
+
+from .config import LOG_LEVEL, LOG_FORMAT, LOG_QUEUE_SIZE, LOG_RATE, LOG_BURST, LOG_SAMPLE
+from . import metrics
+
+ROOT = "droneguard"
+
+DEBUG, INFO, WARNING, ERROR = logging.DEBUG, logging.INFO, logging.WARNING, logging.ERROR
+
+# standard LogRecord attributes; anything else on a record is a structured field
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+class KeyLimiter(logging.Filter):
+    """Per-key sampling and token-bucket rate limiting; runs in the caller, before a record is queued."""
+
+    def __init__(self, rate: float = LOG_RATE, burst: int = LOG_BURST, sample: Optional[Dict[str, int]] = None):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self.sample = dict(sample or {})
+        # key -> [tokens, last refill (monotonic), records seen, suppressed since last pass]
+        self._keys: Dict[str, list] = {}
+
+    def allow(self, key: str) -> int:
+        """-1 to drop this record, else the number suppressed since the last one let through."""
+        state = self._keys.get(key)
+        now = time.monotonic()
+        if state is None:
+            state = self._keys[key] = [float(self.burst), now, 0, 0]
+        state[2] += 1
+        every = self.sample.get(key)
+        if every and every > 1 and (state[2] - 1) % every:
+            state[3] += 1
+            return -1
+        if self.rate > 0:
+            state[0] = min(float(self.burst), state[0] + (now - state[1]) * self.rate)
+            state[1] = now
+            if state[0] < 1.0:
+                state[3] += 1
+                return -1
+            state[0] -= 1.0
+        suppressed, state[3] = state[3], 0
+        return suppressed
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        # Log already asked allow() before building the record; plain
+        # logging calls are keyed by logger name and message template
+        if hasattr(record, "key"):
+            return True
+        suppressed = self.allow(f"{record.name}:{record.msg}")
+        if suppressed > 0:
+            record.suppressed = suppressed
+        return suppressed >= 0
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Enqueues without ever blocking; drops (and counts) when the queue is full."""
+
+    def __init__(self, q: queue.Queue):
+        super().__init__(q)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # merge args and render tracebacks now; formatting proper happens on the listener thread
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def _fields(record: logging.LogRecord) -> Dict[str, Any]:
+    return {k: v for k, v in vars(record).items() if k not in _RESERVED and k != "key"}
+
+
+class TextFormatter(logging.Formatter):
+    """2024-01-01T12:00:00.123 WARNING droneguard.ws_pi pi.signature_rejected drone_id=d1"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        ts = time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(record.created)) + f".{int(record.msecs):03d}"
+        parts = [ts, record.levelname, record.name, getattr(record, "key", None) or record.getMessage()]
+        if getattr(record, "key", None) and record.msg != record.key:
+            parts.append(repr(record.getMessage()))
+        parts.extend(f"{k}={v}" for k, v in _fields(record).items())
+        line = " ".join(parts)
+        if record.exc_text:
+            line += "\n" + record.exc_text
+        return line
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, key, msg and the fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        out = {"ts": record.created, "level": record.levelname, "logger": record.name,
+               "key": getattr(record, "key", None), "msg": record.getMessage()}
+        out.update(_fields(record))
+        if record.exc_text:
+            out["exc"] = record.exc_text
+        return json.dumps(out, default=str)
+
+
+class Log:
+    """Thin wrapper: log.info("key", msg="...", **fields)."""
+
+    __slots__ = ("logger", "level")
+
+    def __init__(self, logger: logging.Logger):
+        self.logger = logger
+        self.level = logger.getEffectiveLevel()
+
+    def enabled(self, level: int) -> bool:
+        return level >= self.level
+
+    def _emit(self, level: int, key: str, msg: Optional[str], exc_info, fields: Dict[str, Any]):
+        # rate limit before paying for a LogRecord
+        if _limiter is not None:
+            suppressed = _limiter.allow(key)
+            if suppressed < 0:
+                return
+            if suppressed:
+                fields["suppressed"] = suppressed
+        # field names must not clash with LogRecord attributes (name, msg, args, ...)
+        fields["key"] = key
+        self.logger._log(level, msg or key, None, exc_info=exc_info, extra=fields)
+
+    def log(self, level: int, key: str, msg: Optional[str] = None, exc_info=None, **fields):
+        if level >= self.level:
+            self._emit(level, key, msg, exc_info, fields)
+
+    def debug(self, key: str, msg: Optional[str] = None, **fields):
+        if DEBUG >= self.level:
+            self._emit(DEBUG, key, msg, None, fields)
+
+    def info(self, key: str, msg: Optional[str] = None, **fields):
+        if INFO >= self.level:
+            self._emit(INFO, key, msg, None, fields)
+
+    def warning(self, key: str, msg: Optional[str] = None, **fields):
+        if WARNING >= self.level:
+            self._emit(WARNING, key, msg, None, fields)
+
+    def error(self, key: str, msg: Optional[str] = None, **fields):
+        if ERROR >= self.level:
+            self._emit(ERROR, key, msg, None, fields)
+
+    def exception(self, key: str, msg: Optional[str] = None, **fields):
+        """error() with the current exception's traceback."""
+        if ERROR >= self.level:
+            self._emit(ERROR, key, msg, True, fields)
+
+
+_logs: Dict[str, Log] = {}
+
+def get_logger(name: str) -> Log:
+    log = _logs.get(name)
+    if log is None:
+        log = _logs[name] = Log(logging.getLogger(f"{ROOT}.{name}"))
+    return log
+
+def set_level(level, name: Optional[str] = None):
+    """Set the level of droneguard (or droneguard.<name>) and refresh the cached levels."""
+    logging.getLogger(f"{ROOT}.{name}" if name else ROOT).setLevel(level)
+    for log in _logs.values():
+        log.level = log.logger.getEffectiveLevel()
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_handler: Optional[_QueueHandler] = None
+_limiter: Optional[KeyLimiter] = None
+
+
+def setup_logging(level=LOG_LEVEL, fmt: str = LOG_FORMAT, stream=None, limiter: Optional[KeyLimiter] = None):
+    """
+    Route the droneguard.* loggers through the queue to ``stream`` (default
+    stderr).  Safe to call again; the previous listener is stopped first.
+    """
+    global _listener, _handler, _limiter
+    shutdown_logging()
+    _limiter = limiter if limiter is not None else KeyLimiter(sample=LOG_SAMPLE)
+    q: queue.Queue = queue.Queue(LOG_QUEUE_SIZE)
+    _handler = _QueueHandler(q)
+    _handler.addFilter(_limiter)
+    out = logging.StreamHandler(stream if stream is not None else sys.stderr)
+    out.setFormatter(JsonFormatter() if fmt == "json" else TextFormatter())
+    _listener = logging.handlers.QueueListener(q, out)
+    _listener.start()
+    root = logging.getLogger(ROOT)
+    root.handlers[:] = [_handler]
+    root.propagate = False
+    set_level(level)
+
+
+def shutdown_logging():
+    """Write out everything queued and stop the listener thread."""
+    global _listener, _handler, _limiter
+    _limiter = None
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    if _handler is not None:
+        logging.getLogger(ROOT).removeHandler(_handler)
+        _handler = None
+
+
+def dropped() -> int:
+    return _handler.dropped if _handler is not None else 0
+
+metrics.registry.gauge("droneguard_log_dropped", "Log records dropped on a full logging queue", dropped)
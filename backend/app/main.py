@@ -1,8 +1,18 @@
 # app/main.py
+import asyncio
+
 from fastapi import FastAPI, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
 from .websocket_handlers import ws_pi, ws_frontend
 from .api import control
+from .routers.telemetry_router import telemetry_router
+from .routers.metrics_router import metrics_router
+from .recorder import recorder
+from .state.history_store import history_store
+from .log import setup_logging, shutdown_logging
+from .shared import backend, sync
+from .state.drone_sessions import evict_idle
+from .config import SESSION_IDLE_TTL, SESSION_EVICT_INTERVAL
 
 app = FastAPI(title="DroneGuard-AI Backend (demo)")
 
@@ -17,7 +27,37 @@ app.add_middleware(
 
 # include HTTP control routes
 app.include_router(control.router)
+app.include_router(telemetry_router)
+app.include_router(metrics_router)
 
 # include websocket routers
 app.include_router(ws_frontend.router) if hasattr(ws_frontend, "router") else None
 app.include_router(ws_pi.router)
+
+
+async def _evict_sessions():
+    # sessions of drones that went away would otherwise be kept forever
+    while True:
+        await asyncio.sleep(SESSION_EVICT_INTERVAL)
+        evict_idle(SESSION_IDLE_TTL)
+
+
+@app.on_event("startup")
+async def _start():
+    setup_logging()
+    # creates the history database and schema (if enabled), so queries work before any telemetry
+    history_store.start()
+    # with DRONEGUARD_STATE_URL set, join the other workers (loads their state on connect)
+    sync.install(backend)
+    await backend.start()
+    app.state.evictor = asyncio.create_task(_evict_sessions())
+
+
+@app.on_event("shutdown")
+async def _flush_recorder():
+    app.state.evictor.cancel()
+    await backend.close()
+    # write out whatever the flight recorder, history store and log queue still hold
+    recorder.close()
+    history_store.close()
+    shutdown_logging()
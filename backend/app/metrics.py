@@ -0,0 +1,236 @@
+# app/metrics.py
+"""
+In-process metrics with Prometheus text exposition (GET /metrics).
+
+Histograms are HDR-style log-linear: values (nanoseconds) are bucketed by
+power of two, each power split into 2**SUB_BITS linear sub-buckets, so the
+relative error is bounded (12.5% with SUB_BITS=3) at any scale and
+recording is a couple of integer ops plus one list increment.  On export
+the fine buckets are folded into a fixed set of `le` bounds in seconds.
+
+Everything is updated from the event loop; VerifyPool reports worker
+timings from its completion callback, which also runs on the loop.
+"""
+import time
+from typing import Callable, Dict, List, Tuple
+
+SUB_BITS = 3
+_SUB = 1 << SUB_BITS
+MAX_EXP = 40                    # ~18 minutes in ns; larger values are clamped
+_NBUCKETS = (MAX_EXP - SUB_BITS + 1) * _SUB + _SUB
+
+# exported `le` bounds (seconds): 1-2.5-5 steps from 1 us to 10 s
+EXPORT_BOUNDS = tuple(m * 10.0 ** e for e in range(-6, 1) for m in (1.0, 2.5, 5.0)) + (10.0,)
+
+now_ns = time.perf_counter_ns
+
+
+def _bucket(v: int) -> int:
+    if v < _SUB:
+        return v if v > 0 else 0
+    e = v.bit_length() - 1
+    if e > MAX_EXP:
+        return _NBUCKETS - 1
+    return (e - SUB_BITS + 1) * _SUB + ((v >> (e - SUB_BITS)) & (_SUB - 1))
+
+
+def _bucket_upper(i: int) -> int:
+    """Largest value (ns) that lands in bucket i."""
+    if i < _SUB:
+        return i
+    e = i // _SUB + SUB_BITS - 1
+    m = i % _SUB
+    return ((_SUB + m + 1) << (e - SUB_BITS)) - 1
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    body = ",".join('%s="%s"' % (k, str(v).replace("\\", "\\\\").replace('"', '\\"')) for k, v in labels.items())
+    return "{" + body + "}"
+
+
+class Histogram:
+    __slots__ = ("labels", "counts", "sum_ns")
+
+    def __init__(self, labels: Dict[str, str]):
+        self.labels = labels
+        self.counts: List[int] = [0] * _NBUCKETS
+        self.sum_ns = 0
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def observe_ns(self, v: int, n: int = 1):
+        self.counts[_bucket(v)] += n
+        self.sum_ns += v * n
+
+    def since(self, t0_ns: int):
+        """Record the time elapsed since a now_ns() reading (hot path: _bucket inlined)."""
+        v = now_ns() - t0_ns
+        if v < _SUB:
+            i = v if v > 0 else 0
+        else:
+            e = v.bit_length() - 1
+            i = (e - SUB_BITS + 1) * _SUB + ((v >> (e - SUB_BITS)) & (_SUB - 1)) if e <= MAX_EXP else _NBUCKETS - 1
+        self.counts[i] += 1
+        self.sum_ns += v
+
+    def quantile(self, q: float) -> float:
+        """Approximate quantile in seconds (upper edge of the bucket)."""
+        total = self.count
+        if not total:
+            return 0.0
+        target = q * total
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if c and seen >= target:
+                return _bucket_upper(i) / 1e9
+        return _bucket_upper(_NBUCKETS - 1) / 1e9
+
+    def reset(self):
+        self.counts = [0] * _NBUCKETS
+        self.sum_ns = 0
+
+    def expose(self, name: str) -> List[str]:
+        lines = []
+        bounds_ns = [b * 1e9 for b in EXPORT_BOUNDS]
+        acc = 0
+        j = 0
+        for i, c in enumerate(self.counts):
+            upper = _bucket_upper(i)
+            while j < len(bounds_ns) and upper > bounds_ns[j]:
+                lines.append(f"{name}_bucket{_labels({**self.labels, 'le': repr(EXPORT_BOUNDS[j])})} {acc}")
+                j += 1
+            acc += c
+        while j < len(bounds_ns):
+            lines.append(f"{name}_bucket{_labels({**self.labels, 'le': repr(EXPORT_BOUNDS[j])})} {acc}")
+            j += 1
+        lines.append(f"{name}_bucket{_labels({**self.labels, 'le': '+Inf'})} {acc}")
+        lines.append(f"{name}_sum{_labels(self.labels)} {self.sum_ns / 1e9}")
+        lines.append(f"{name}_count{_labels(self.labels)} {acc}")
+        return lines
+
+
+class Counter:
+    __slots__ = ("labels", "value")
+
+    def __init__(self, labels: Dict[str, str]):
+        self.labels = labels
+        self.value = 0
+
+    def inc(self, n: int = 1):
+        self.value += n
+
+
+class _Family:
+    def __init__(self, name: str, kind: str, help: str):
+        self.name = name
+        self.kind = kind
+        self.help = help
+        self.children: Dict[Tuple, object] = {}
+
+
+class Registry:
+    def __init__(self):
+        self._families: Dict[str, _Family] = {}
+        self._gauges: List[Tuple[str, str, Callable[[], object]]] = []
+
+    def _child(self, name, kind, help, cls, labels):
+        fam = self._families.get(name)
+        if fam is None:
+            fam = self._families[name] = _Family(name, kind, help)
+        key = tuple(sorted(labels.items()))
+        child = fam.children.get(key)
+        if child is None:
+            child = fam.children[key] = cls(dict(labels))
+        return child
+
+    def histogram(self, name: str, help: str = "", **labels) -> Histogram:
+        return self._child(name, "histogram", help, Histogram, labels)
+
+    def counter(self, name: str, help: str = "", **labels) -> Counter:
+        return self._child(name, "counter", help, Counter, labels)
+
+    def children(self, name: str) -> List[Tuple[Tuple, object]]:
+        """(sorted label items, histogram or counter) for every child of family ``name``."""
+        fam = self._families.get(name)
+        return list(fam.children.items()) if fam is not None else []
+
+    def gauge(self, name: str, help: str, fn: Callable[[], object]):
+        """``fn`` returns a number, or a list of (labels_dict, number), read at scrape time."""
+        self._gauges.append((name, help, fn))
+
+    def reset(self):
+        for fam in self._families.values():
+            for child in fam.children.values():
+                if isinstance(child, Histogram):
+                    child.reset()
+                else:
+                    child.value = 0
+
+    def expose(self) -> str:
+        lines = []
+        for fam in self._families.values():
+            lines.append(f"# HELP {fam.name} {fam.help}")
+            lines.append(f"# TYPE {fam.name} {fam.kind}")
+            for child in fam.children.values():
+                if isinstance(child, Histogram):
+                    lines.extend(child.expose(fam.name))
+                else:
+                    lines.append(f"{fam.name}{_labels(child.labels)} {child.value}")
+        for name, help, fn in self._gauges:
+            try:
+                value = fn()
+            except Exception:
+                continue
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} gauge")
+            if isinstance(value, list):
+                for labels, v in value:
+                    lines.append(f"{name}{_labels(labels)} {v}")
+            else:
+                lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+STAGE = "droneguard_stage_seconds"
+STAGE_HELP = "Time spent in each /ws/pi pipeline stage"
+
+
+def stage(name: str, **labels) -> Histogram:
+    return registry.histogram(STAGE, STAGE_HELP, stage=name, **labels)
+
+
+# /ws/pi stages, resolved once so the hot path is attribute access only
+parse_time = stage("parse")
+verify_time = stage("verify")
+verify_wait_time = stage("verify_wait")   # consumer waiting for a packet's verification
+buffer_add_time = stage("buffer_add")
+incidents_time = stage("incidents")
+failsafe_time = stage("process_detection")
+record_time = stage("record")
+broadcast_time = stage("broadcast")
+
+PACKETS = "droneguard_packets_total"
+PACKETS_HELP = "Frames received on /ws/pi by outcome"
+packets_verified = registry.counter(PACKETS, PACKETS_HELP, result="verified")
+packets_rejected = registry.counter(PACKETS, PACKETS_HELP, result="rejected")
+packets_dropped = registry.counter(PACKETS, PACKETS_HELP, result="dropped")
+
+INCIDENT_EVENTS = "droneguard_incident_events_total"
+INCIDENT_EVENTS_HELP = "Incident transitions sent to frontends and the failsafe engine"
+incident_events = {event: registry.counter(INCIDENT_EVENTS, INCIDENT_EVENTS_HELP, event=event)
+                   for event in ("open", "update", "close")}
+
+
+def detector_time(det_type: str) -> Histogram:
+    return stage("detector", detector=det_type)
+
+
+def alerts_counter(alert_type: str) -> Counter:
+    return registry.counter("droneguard_alerts_total", "Detector alerts by type", type=alert_type)
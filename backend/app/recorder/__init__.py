@@ -0,0 +1,12 @@
+# app/recorder/__init__.py
+from ..config import RECORDER_DIR
+from .. import metrics
+from .format import KIND_TELEMETRY, KIND_ALERT, KIND_FAILSAFE
+from .writer import FlightRecorder
+from .reader import RecorderReader, Record
+
+# disabled (every record_* call is a no-op) unless DRONEGUARD_RECORDER_DIR is set
+recorder = FlightRecorder(RECORDER_DIR)
+
+metrics.registry.gauge("droneguard_recorder_dropped", "Flight recorder records dropped (queue full or failed write)",
+                       lambda: recorder.dropped)
@@ -0,0 +1,34 @@
+# app/recorder/format.py
+"""
+On-disk layout of the flight recorder.
+
+A recording directory holds numbered segments, each with a sparse index:
+    seg-00000001.dgr   append-only records
+    seg-00000001.idx   (ts f64, offset u64) every RECORDER_INDEX_EVERY records
+
+Segment file: b"DGR1" then records, each
+    body_len u32 | kind u8 | ts f64 | id_len u8 | drone_id utf-8 | body
+ts is the backend receive time (time.time()), so records, and the index,
+are in time order.  Telemetry bodies are app.wire records (57 bytes);
+alert and failsafe bodies are JSON.
+"""
+import struct
+
+import numpy as np
+
+SEGMENT_MAGIC = b"DGR1"
+SEGMENT_SUFFIX = ".dgr"
+INDEX_SUFFIX = ".idx"
+
+RECORD_HEAD = struct.Struct("<IBdB")
+INDEX_ENTRY = struct.Struct("<dQ")
+INDEX_DTYPE = np.dtype([("ts", "<f8"), ("offset", "<u8")])
+
+KIND_TELEMETRY = 1
+KIND_ALERT = 2
+KIND_FAILSAFE = 3
+KIND_NAMES = {KIND_TELEMETRY: "telemetry", KIND_ALERT: "alert", KIND_FAILSAFE: "failsafe"}
+
+
+def segment_name(seq: int) -> str:
+    return f"seg-{seq:08d}"
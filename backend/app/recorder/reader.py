@@ -0,0 +1,146 @@
+# app/recorder/reader.py
+"""
+Zero-copy reader for flight-recorder segments.
+
+Segments are mmap'd; record bodies are returned as memoryview slices of
+the mapping, so scanning a flight never copies it into Python objects
+unless the caller decodes a record.  Time-range queries start from the
+sparse index (binary search) instead of the beginning of the segment.
+"""
+import json
+import mmap
+import os
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from .. import wire
+from .format import (SEGMENT_MAGIC, SEGMENT_SUFFIX, INDEX_SUFFIX, RECORD_HEAD, INDEX_DTYPE,
+                     KIND_TELEMETRY, KIND_NAMES)
+
+
+# wire.RECORD as a packed structured dtype, for reading telemetry bodies columnar
+RECORD_DTYPE = np.dtype([(name, "<f8") for name in wire.RECORD_FIELDS[:3]] +
+                        [(name, "<f4") for name in wire.RECORD_FIELDS[3:]] + [("source", "u1")])
+
+
+class Record(NamedTuple):
+    kind: int
+    ts: float
+    drone_id: str
+    body: memoryview
+
+    def decode(self):
+        if self.kind == KIND_TELEMETRY:
+            return wire.decode_record(self.body)
+        return json.loads(bytes(self.body))
+
+    def to_dict(self) -> Dict:
+        return {"kind": KIND_NAMES.get(self.kind, self.kind), "ts": self.ts,
+                "drone_id": self.drone_id, "data": self.decode()}
+
+
+class Segment:
+    def __init__(self, path: str):
+        self.path = path
+        self.index = _load_index(path[:-len(SEGMENT_SUFFIX)] + INDEX_SUFFIX)
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        self.view = memoryview(self._map) if self._map is not None else memoryview(b"")
+
+    @property
+    def first_ts(self) -> Optional[float]:
+        return float(self.index["ts"][0]) if len(self.index) else None
+
+    def iter_records(self, start: Optional[float] = None, end: Optional[float] = None,
+                     kinds: Optional[Sequence[int]] = None, drone_id: Optional[str] = None) -> Iterator[Record]:
+        view = self.view
+        if len(view) < len(SEGMENT_MAGIC) or bytes(view[:4]) != SEGMENT_MAGIC:
+            return
+        pos = len(SEGMENT_MAGIC)
+        if start is not None and len(self.index):
+            # last index entry at or before `start`
+            i = int(np.searchsorted(self.index["ts"], start, side="right")) - 1
+            if i >= 0:
+                pos = int(self.index["offset"][i])
+        head = RECORD_HEAD.size
+        total = len(view)
+        while pos + head <= total:
+            body_len, kind, ts, id_len = RECORD_HEAD.unpack_from(view, pos)
+            body_at = pos + head + id_len
+            nxt = body_at + body_len
+            if nxt > total:
+                break  # record still being written
+            if end is not None and ts > end:
+                break
+            if (start is None or ts >= start) and (kinds is None or kind in kinds):
+                ident = bytes(view[pos + head:body_at]).decode()
+                if drone_id is None or ident == drone_id:
+                    yield Record(kind, ts, ident, view[body_at:nxt])
+            pos = nxt
+
+    def close(self):
+        self.view.release()
+        if self._map is not None:
+            try:
+                self._map.close()
+            except BufferError:
+                pass  # caller still holds record bodies; unmapped when they are collected
+        self._file.close()
+
+
+def _load_index(path: str) -> np.ndarray:
+    if not os.path.exists(path):
+        return np.empty(0, dtype=INDEX_DTYPE)
+    raw = np.fromfile(path, dtype=np.uint8)
+    usable = len(raw) - len(raw) % INDEX_DTYPE.itemsize
+    return raw[:usable].view(INDEX_DTYPE)
+
+
+class RecorderReader:
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._segments: List[Segment] = []
+
+    def segment_paths(self) -> List[str]:
+        if not os.path.isdir(self.directory):
+            return []
+        names = sorted(n for n in os.listdir(self.directory) if n.startswith("seg-") and n.endswith(SEGMENT_SUFFIX))
+        return [os.path.join(self.directory, n) for n in names]
+
+    def iter_records(self, start: Optional[float] = None, end: Optional[float] = None,
+                     kinds: Optional[Sequence[int]] = None, drone_id: Optional[str] = None) -> Iterator[Record]:
+        """Records in time order; bodies stay valid until close()."""
+        segments = [Segment(p) for p in self.segment_paths()]
+        self._segments.extend(segments)
+        for n, seg in enumerate(segments):
+            # skip segments that end before `start` (the next one starts earlier)
+            nxt = segments[n + 1].first_ts if n + 1 < len(segments) else None
+            if start is not None and nxt is not None and nxt <= start:
+                continue
+            if end is not None and seg.first_ts is not None and seg.first_ts > end:
+                break
+            yield from seg.iter_records(start, end, kinds, drone_id)
+
+    def telemetry(self, drone_id: Optional[str] = None, start: Optional[float] = None,
+                  end: Optional[float] = None) -> Iterator[Dict]:
+        for rec in self.iter_records(start, end, (KIND_TELEMETRY,), drone_id):
+            yield rec.decode()
+
+    def telemetry_columns(self, drone_id: Optional[str] = None, start: Optional[float] = None,
+                          end: Optional[float] = None) -> np.ndarray:
+        """Telemetry in [start, end] as a RECORD_DTYPE array (NaN for missing values), no per-record dicts."""
+        bodies = b"".join(rec.body for rec in self.iter_records(start, end, (KIND_TELEMETRY,), drone_id))
+        return np.frombuffer(bodies, dtype=RECORD_DTYPE)
+
+    def close(self):
+        for seg in self._segments:
+            seg.close()
+        self._segments = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,175 @@
+# app/recorder/writer.py
+"""
+Batched, off-loop writer for the flight recorder.
+
+record_*() only appends a tuple to a deque on the event loop; a daemon
+thread wakes every RECORDER_FLUSH_INTERVAL seconds (or when a batch fills
+up), encodes the pending records and writes them with one write() per
+segment, rolling over to a new segment at RECORDER_SEGMENT_BYTES.
+
+An I/O error (disk full, directory gone) is logged, the records of that
+flush are dropped and the segment is closed, so the next flush starts a
+new one; the thread keeps running.  At most RECORDER_MAX_PENDING records
+wait for it.  Both kinds of loss are counted in droneguard_recorder_dropped.
+"""
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+
+from ..config import (RECORDER_SEGMENT_BYTES, RECORDER_INDEX_EVERY, RECORDER_FLUSH_INTERVAL, RECORDER_BATCH,
+                      RECORDER_MAX_PENDING)
+from .. import wire
+from ..log import get_logger
+from .format import (SEGMENT_MAGIC, SEGMENT_SUFFIX, INDEX_SUFFIX, RECORD_HEAD, INDEX_ENTRY,
+                     KIND_TELEMETRY, KIND_ALERT, KIND_FAILSAFE, segment_name)
+
+log = get_logger("recorder")
+
+
+class FlightRecorder:
+    def __init__(self, directory: Optional[str], segment_bytes: int = RECORDER_SEGMENT_BYTES,
+                 index_every: int = RECORDER_INDEX_EVERY, flush_interval: float = RECORDER_FLUSH_INTERVAL):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.index_every = max(1, index_every)
+        self.flush_interval = flush_interval
+        self._pending: Deque[Tuple[int, float, str, object]] = deque()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._seg = None
+        self._idx = None
+        self._seq = 0
+        self._seg_size = 0
+        self._seg_records = 0
+        self.written = 0
+        self.dropped = 0     # records lost to a full queue or a failed write
+        self._unwritten = 0  # taken off the queue by the current flush, not yet written
+
+    @property
+    def enabled(self) -> bool:
+        return self.directory is not None
+
+    # ---- event-loop side: O(1), no I/O ----
+    def record(self, kind: int, drone_id: str, obj, ts: Optional[float] = None):
+        if self.directory is None:
+            return
+        if self._thread is None:
+            self.start()
+        if len(self._pending) >= RECORDER_MAX_PENDING:
+            self.dropped += 1
+            return
+        self._pending.append((kind, ts if ts is not None else time.time(), drone_id, obj))
+        if len(self._pending) >= RECORDER_BATCH:
+            self._wake.set()
+
+    def record_telemetry(self, drone_id: str, pkt: Dict, ts: Optional[float] = None):
+        self.record(KIND_TELEMETRY, drone_id, pkt, ts)
+
+    def record_alerts(self, drone_id: str, alerts, ts: Optional[float] = None):
+        self.record(KIND_ALERT, drone_id, alerts, ts)
+
+    def record_failsafe(self, drone_id: str, state: Dict, ts: Optional[float] = None):
+        self.record(KIND_FAILSAFE, drone_id, state, ts)
+
+    # ---- lifecycle ----
+    def start(self):
+        if self.directory is None or self._thread is not None:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="flight-recorder", daemon=True)
+        self._thread.start()
+
+    def close(self):
+        """Flush everything pending and close the current segment."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._wake.set()
+        self._thread.join()
+        self._thread = None
+
+    # ---- writer thread ----
+    def _run(self):
+        try:
+            while not self._stop.is_set():
+                self._wake.wait(self.flush_interval)
+                self._wake.clear()
+                self._flush()
+            self._flush()
+        finally:
+            self._close_segment()
+
+    def _flush(self):
+        self._unwritten = 0
+        try:
+            self._flush_pending()
+        except Exception as e:
+            # drop the records taken for this flush and start a fresh segment next time
+            self.dropped += self._unwritten
+            log.error("recorder.write_failed", records=self._unwritten, error=repr(e))
+            try:
+                self._close_segment()
+            except OSError:
+                self._seg = self._idx = None
+
+    def _flush_pending(self):
+        chunks = []
+        index = []
+        while self._pending:
+            kind, ts, drone_id, obj = self._pending.popleft()
+            self._unwritten += 1
+            if kind == KIND_TELEMETRY:
+                body = wire.encode_record(obj)
+            else:
+                body = json.dumps(obj).encode()
+            ident = str(drone_id or "").encode()[:255]
+            rec = RECORD_HEAD.pack(len(body), kind, ts, len(ident)) + ident + body
+            if self._seg is None or self._seg_size + len(rec) > self.segment_bytes:
+                self._write(chunks, index)
+                chunks, index = [], []
+                self._open_segment()
+            if self._seg_records % self.index_every == 0:
+                index.append(INDEX_ENTRY.pack(ts, self._seg_size))
+            chunks.append(rec)
+            self._seg_size += len(rec)
+            self._seg_records += 1
+        self._write(chunks, index)
+
+    def _write(self, chunks, index):
+        if self._seg is None or not chunks:
+            return
+        self._seg.write(b"".join(chunks))
+        self._seg.flush()
+        if index:
+            self._idx.write(b"".join(index))
+            self._idx.flush()
+        self.written += len(chunks)
+        self._unwritten -= len(chunks)
+
+    def _open_segment(self):
+        self._close_segment()
+        os.makedirs(self.directory, exist_ok=True)
+        self._seq = max(self._seq, _last_seq(self.directory)) + 1
+        base = os.path.join(self.directory, segment_name(self._seq))
+        self._seg = open(base + SEGMENT_SUFFIX, "ab")
+        self._idx = open(base + INDEX_SUFFIX, "ab")
+        self._seg.write(SEGMENT_MAGIC)
+        self._seg_size = len(SEGMENT_MAGIC)
+        self._seg_records = 0
+
+    def _close_segment(self):
+        if self._seg is not None:
+            self._seg.close()
+            self._idx.close()
+            self._seg = self._idx = None
+
+
+def _last_seq(directory: str) -> int:
+    seqs = [int(n[4:12]) for n in os.listdir(directory)
+            if n.startswith("seg-") and n.endswith(SEGMENT_SUFFIX) and n[4:12].isdigit()]
+    return max(seqs, default=0)
@@ -0,0 +1,290 @@
+# app/replay.py
+"""
+Replay flights through the /ws/pi pipeline in-process.
+
+Frames go through the code path of a live drone connection: the frame is
+parsed with ws_pi.parse_frame and its verification started on a VerifyPool,
+and ws_pi._consume itself awaits verifications in order and runs the rest
+(buffer add -> detectors -> incidents -> failsafe engine -> flight recorder
+-> broadcast_to_frontend), with at most PI_INGEST_QUEUE frames in flight.
+Stage timings and counts are read from the metrics registry, which is
+reset at the start of a replay.
+
+Frames are paced by the packets' own "time" field divided by ``speed``;
+speed <= 0 replays as fast as possible.
+
+Sources:
+  - synthetic   a smooth circuit, optionally with injected GPS jumps
+  - recording   telemetry from a flight-recorder directory (app.recorder)
+  - frames      a file of captured /ws/pi text frames, one per line
+
+Synthetic and recorded packets are re-signed with a throwaway key, which is
+installed as the backend's public key for the duration of the replay.
+Captured frames are verified against the configured key as they are.
+
+Run from backend/:
+    python -m app.replay --packets 20000 --speed 0
+    python -m app.replay --recording recordings --drone-id drone_pi --speed 10
+    python -m app.replay --frames capture.txt --frontends 5 --json
+"""
+import argparse
+import asyncio
+import base64
+import json
+import math
+import random
+import time
+from typing import Dict, Iterable, Iterator, Optional, Union
+
+from .config import PI_INGEST_QUEUE
+from . import metrics, wire
+from .recorder import recorder, RecorderReader
+from .state.history_store import history_store
+from .log import setup_logging, shutdown_logging
+from .security import signature_verify
+from .security.verify_pool import VerifyPool
+from .state.drone_sessions import DroneSession
+from .websocket_handlers import ws_frontend
+from .websocket_handlers.ws_frontend import FrontendClient
+from .websocket_handlers.ws_pi import parse_frame, _consume, _enqueue
+
+Frame = Union[str, bytes]
+
+
+def stage_summary() -> Dict[str, Dict]:
+    """The droneguard_stage_seconds histograms as {stage: count / mean / p50 / p99 / max in us}; quantiles are bucket upper bounds."""
+    out = {}
+    for key, h in metrics.registry.children(metrics.STAGE):
+        if not h.count:
+            continue
+        labels = dict(key)
+        name = labels["stage"] if "detector" not in labels else f"detector:{labels['detector']}"
+        out[name] = {"count": h.count, "mean_us": h.sum_ns / h.count / 1e3,
+                     "p50_us": h.quantile(0.5) * 1e6, "p99_us": h.quantile(0.99) * 1e6,
+                     "max_us": h.quantile(1.0) * 1e6}
+    return out
+
+
+class ReplayResult:
+    def __init__(self):
+        self.frames = 0
+        self.packets = 0      # verified and processed
+        self.rejected = 0     # failed verification
+        self.dropped = 0      # unparseable
+        self.alerts = 0
+        self.incidents = 0    # incidents opened
+        self.elapsed = 0.0
+        self.stages: Dict[str, Dict] = {}
+
+    def report(self) -> Dict:
+        return {
+            "frames": self.frames, "packets": self.packets, "rejected": self.rejected,
+            "dropped": self.dropped, "alerts": self.alerts,
+            "incidents": self.incidents, "elapsed_s": self.elapsed,
+            "packets_per_s": self.packets / self.elapsed if self.elapsed else 0.0,
+            "stages": self.stages,
+        }
+
+
+# ---------------------------------------------------------------------------
+# sources
+# ---------------------------------------------------------------------------
+def synthetic_packets(n: int, rate_hz: float = 4.0, inject: float = 0.0, seed: int = 0) -> Iterator[Dict]:
+    """Closed circuit at 3 m/s; ``inject`` is the fraction of packets with a GPS jump."""
+    rng = random.Random(seed)
+    r = 1024 * 0.75 / (2.0 * math.pi)
+    coslat = math.cos(math.radians(12.9718))
+    for i in range(n):
+        theta = 2.0 * math.pi * (i % 1024) / 1024.0
+        yaw = (math.degrees(theta) + 90.0) % 360.0
+        pkt = {
+            "time": 1000.0 + i / rate_hz,
+            "gps_lat": 12.9718 + r * math.cos(theta) / 111000.0,
+            "gps_lon": 77.6411 + r * math.sin(theta) / (111000.0 * coslat),
+            "alt": 40.0, "vx": 3.0 * math.sin(math.radians(yaw)), "vy": 3.0 * math.cos(math.radians(yaw)),
+            "speed": 3.0, "yaw": yaw, "roll": 0.0, "pitch": 0.0, "battery": 0.9, "source": "normal",
+        }
+        if inject and rng.random() < inject:
+            pkt["gps_lat"] += rng.uniform(-5e-4, 5e-4)
+            pkt["source"] = "injected"
+        yield pkt
+
+
+def recorded_packets(directory: str, drone_id: Optional[str] = None,
+                     start: Optional[float] = None, end: Optional[float] = None) -> Iterator[Dict]:
+    with RecorderReader(directory) as reader:
+        yield from reader.telemetry(drone_id, start, end)
+
+
+def captured_frames(path: str) -> Iterator[str]:
+    with open(path) as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if line:
+                yield line
+
+
+def signed_frames(pkts: Iterable[Dict], key, encoding: str = wire.ENCODING_JSON,
+                  drone_id: Optional[str] = None) -> Iterator[Frame]:
+    """Encode packets the way drone.py sends them (DGS1 text or DGB1 binary), preceded by a hello."""
+    from Crypto.Hash import SHA256
+    from Crypto.Signature import pkcs1_15
+
+    signer = pkcs1_15.new(key)
+    hello = {"hello": "drone_pi"}
+    if drone_id:
+        hello["drone_id"] = drone_id
+    yield json.dumps({"type": "hello", "payload": hello})
+    for pkt in pkts:
+        if encoding == wire.ENCODING_BINARY:
+            record = wire.encode_record(pkt)
+            yield wire.encode_pi_frame(pkt, signer.sign(SHA256.new(record)))
+        else:
+            body = json.dumps({"type": "telemetry", "payload": pkt})
+            sig = base64.b64encode(signer.sign(SHA256.new(body.encode()))).decode()
+            yield f"{signature_verify.RAW_FRAME_PREFIX}{sig}:{body}"
+
+
+class _NullSocket:
+    """Stands in for a dashboard websocket; accepts and discards frames."""
+
+    async def send_text(self, text: str):
+        pass
+
+    async def send_bytes(self, data: bytes):
+        pass
+
+
+# ---------------------------------------------------------------------------
+# pipeline
+# ---------------------------------------------------------------------------
+async def replay(frames: Iterable[Frame], speed: float = 0.0, drone_id: Optional[str] = None,
+                 frontends: int = 0, pool: Optional[VerifyPool] = None) -> ReplayResult:
+    """
+    Push ``frames`` through the ws_pi pipeline. Sessions are private to the
+    replay (not registered with the live registry). ``frontends`` attaches
+    that many discard-everything dashboard clients so broadcast cost is real.
+    """
+    result = ReplayResult()
+    perf = time.perf_counter
+    pool = pool or VerifyPool()
+    sessions: Dict[str, DroneSession] = {}
+
+    def session_for(name: str) -> DroneSession:
+        name = drone_id or name
+        s = sessions.get(name)
+        if s is None:
+            s = sessions[name] = DroneSession(name)
+        return s
+
+    clients = [FrontendClient(_NullSocket()) for _ in range(frontends)]
+    for c in clients:
+        c.task = asyncio.create_task(c.run())
+        ws_frontend._add(c)
+
+    metrics.registry.reset()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=PI_INGEST_QUEUE)
+    consumer = asyncio.create_task(_consume(queue, session_for("replay"), lookup=session_for))
+    start = perf()
+    first_ts = None
+    try:
+        # the receive side of ws_pi: parse, start verifying, enqueue in order
+        for frame in frames:
+            result.frames += 1
+            t0 = metrics.now_ns()
+            parsed = parse_frame(frame)
+            metrics.parse_time.since(t0)
+            if parsed is None:
+                metrics.packets_dropped.inc()
+                continue
+            pkt, item = parsed
+            if item is not None:
+                if speed > 0:
+                    ts = pkt.get("time")
+                    if isinstance(ts, (int, float)):
+                        if first_ts is None:
+                            first_ts = ts
+                        wait = start + (ts - first_ts) / speed - perf()
+                        if wait > 0:
+                            await asyncio.sleep(wait)
+                item = pool.submit(item)
+            if not await _enqueue(queue, (pkt, item), consumer):
+                break
+        await _enqueue(queue, None, consumer)
+        await consumer
+    finally:
+        result.elapsed = perf() - start
+        if not consumer.done():
+            consumer.cancel()
+        for c in clients:
+            c.task.cancel()
+            c.close()
+    result.packets = metrics.packets_verified.value
+    result.rejected = metrics.packets_rejected.value
+    result.dropped = metrics.packets_dropped.value
+    result.alerts = sum(c.value for _, c in metrics.registry.children("droneguard_alerts_total"))
+    result.incidents = metrics.incident_events["open"].value
+    result.stages = stage_summary()
+    return result
+
+
+def run(frames: Iterable[Frame], key=None, **kwargs) -> ReplayResult:
+    """Synchronous wrapper; ``key`` temporarily replaces the backend's public key."""
+    previous = signature_verify.PUBLIC_KEY
+    if key is not None:
+        signature_verify.set_public_key(key.publickey())
+    try:
+        return asyncio.run(replay(frames, **kwargs))
+    finally:
+        if key is not None and previous is not None:
+            signature_verify.set_public_key(previous)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Replay a flight through the /ws/pi pipeline")
+    src = ap.add_mutually_exclusive_group()
+    src.add_argument("--recording", help="flight-recorder directory to replay")
+    src.add_argument("--frames", help="file of captured /ws/pi text frames, one per line")
+    ap.add_argument("--packets", type=int, default=10000, help="synthetic flight length")
+    ap.add_argument("--inject", type=float, default=0.0, help="fraction of synthetic packets with a GPS jump")
+    ap.add_argument("--rate", type=float, default=4.0, help="synthetic packet rate (Hz)")
+    ap.add_argument("--speed", type=float, default=0.0, help="speed-up vs. packet timestamps; 0 = as fast as possible")
+    ap.add_argument("--drone-id", default=None)
+    ap.add_argument("--encoding", choices=[wire.ENCODING_JSON, wire.ENCODING_BINARY], default=wire.ENCODING_JSON)
+    ap.add_argument("--frontends", type=int, default=0, help="attach N discard-everything dashboard clients")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = ap.parse_args()
+
+    key = None
+    if args.frames:
+        frames = captured_frames(args.frames)
+    else:
+        from Crypto.PublicKey import RSA
+        key = RSA.generate(2048)
+        if args.recording:
+            pkts = recorded_packets(args.recording, args.drone_id)
+        else:
+            pkts = synthetic_packets(args.packets, args.rate, args.inject, args.seed)
+        # sign up front so signing cost is not part of the measurement
+        frames = list(signed_frames(pkts, key, args.encoding, args.drone_id))
+
+    setup_logging()
+    report = run(frames, key=key, speed=args.speed, drone_id=args.drone_id, frontends=args.frontends).report()
+    # write out what the recorder / history store / log queue still have before exiting
+    recorder.close()
+    history_store.close()
+    shutdown_logging()
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"frames {report['frames']}  packets {report['packets']}  rejected {report['rejected']}  "
+          f"dropped {report['dropped']}  alerts {report['alerts']}  incidents {report['incidents']}")
+    print(f"elapsed {report['elapsed_s']:.3f} s  throughput {report['packets_per_s']:.0f} packets/s")
+    print(f"{'stage':<30} {'count':>8} {'mean_us':>9} {'p50_us':>9} {'p99_us':>9} {'max_us':>10}")
+    for stage, s in report["stages"].items():
+        print(f"{stage:<30} {s['count']:>8} {s['mean_us']:>9.1f} {s['p50_us']:>9.1f} {s['p99_us']:>9.1f} {s['max_us']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,14 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from ..metrics import registry
+from ..state.drone_sessions import list_sessions
+
+metrics_router = APIRouter(tags=["Metrics"])
+
+registry.gauge("droneguard_drone_sessions", "Known drone sessions", lambda: len(list_sessions()))
+registry.gauge("droneguard_drones_connected", "Drones with an open /ws/pi connection",
+               lambda: sum(1 for s in list_sessions() if s.connections > 0))
+
+@metrics_router.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    return PlainTextResponse(registry.expose(), media_type="text/plain; version=0.0.4")
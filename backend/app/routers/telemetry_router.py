@@ -1,8 +1,48 @@
-from fastapi import APIRouter
-from ..state.telemetry_buffer import get_buffer
+import json
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import JSONResponse, StreamingResponse
+from ..state.drone_sessions import find_session, DEFAULT_DRONE_ID
+from ..state.telemetry_buffer import iter_buffer
+from ..state.telemetry_query import query
 
 telemetry_router = APIRouter(prefix="/telemetry", tags=["Telemetry"])
 
+def _export_json(packets):
+    # stream newest-first without materialising the whole buffer as JSON
+    yield "["
+    first = True
+    for pkt in packets:
+        if not first:
+            yield ","
+        first = False
+        yield json.dumps(pkt)
+    yield "]"
+
 @telemetry_router.get("/buffer")
-def fetch_buffer():
-    return get_buffer()
+async def fetch_buffer(drone_id: Optional[str] = None):
+    # snapshot on the event loop, between packets; the encoding then runs in the threadpool
+    if drone_id in (None, DEFAULT_DRONE_ID):
+        packets = iter_buffer()
+    else:
+        session = find_session(drone_id)
+        packets = session.buffer.iter_export() if session is not None else iter(())
+    return StreamingResponse(_export_json(packets), media_type="application/json")
+
+@telemetry_router.get("/query")
+def query_telemetry(drone_id: Optional[str] = None,
+                    start: Optional[float] = Query(None, description="unix seconds, inclusive"),
+                    end: Optional[float] = Query(None, description="unix seconds, inclusive"),
+                    fields: Optional[str] = Query(None, description="comma-separated, default all"),
+                    limit: int = 1000,
+                    cursor: Optional[float] = Query(None, description="next_cursor of the previous page"),
+                    points: Optional[int] = Query(None, description="downsample the range to ~this many rows"),
+                    by: Optional[str] = Query(None, description="field that drives downsampling"),
+                    resolution: str = Query("auto", description="raw | minute (rollups) | auto")):
+    names = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+    try:
+        body = query(drone_id, start, end, names, limit, cursor, points, by, resolution)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # returned directly: skips FastAPI's per-value jsonable_encoder pass on large columns
+    return JSONResponse(body)
@@ -1,4 +1,5 @@
 import json, base64
+from typing import Dict, List, Optional, Sequence, Tuple, Union
 from Crypto.Signature import pkcs1_15
 from Crypto.Hash import SHA256
 from Crypto.PublicKey import RSA
@@ -7,6 +8,16 @@ from Crypto.PublicKey import RSA
 with open("public.pem", "r") as f:
     PUBLIC_KEY = RSA.import_key(f.read())
 
+# PKCS115_SigScheme only holds the key, so one instance is reused (and is
+# safe to share between verifier threads) instead of rebuilding it per call
+_VERIFIER = pkcs1_15.new(PUBLIC_KEY)
+
+def set_public_key(key):
+    """Swap the verification key (benchmarks / replay with a throwaway key)."""
+    global PUBLIC_KEY, _VERIFIER
+    PUBLIC_KEY = key
+    _VERIFIER = pkcs1_15.new(key)
+
 def verify_signature(payload: dict) -> bool:
     """Verify telemetry payload signature."""
     try:
@@ -23,8 +34,44 @@ def verify_signature(payload: dict) -> bool:
         msg = json.dumps(unsigned, sort_keys=True).encode()
         h = SHA256.new(msg)
 
-        pkcs1_15.new(PUBLIC_KEY).verify(h, signature)
+        _VERIFIER.verify(h, signature)
         return True
 
     except Exception:
         return False
+
+# ---------------------------------------------------------------
+# Raw-bytes envelope: "DGS1:<base64 signature>:<signed JSON text>"
+# The signature covers the exact UTF-8 bytes after the second colon, so
+# the backend hashes what it received and parses the JSON only once;
+# no canonical re-dump, no float-formatting mismatches.
+# ---------------------------------------------------------------
+RAW_FRAME_PREFIX = "DGS1:"
+
+def split_raw_frame(frame: str) -> Optional[Tuple[bytes, str]]:
+    """Return (signed_bytes, signature_b64) for a raw frame, else None."""
+    if not frame.startswith(RAW_FRAME_PREFIX):
+        return None
+    sep = frame.find(":", len(RAW_FRAME_PREFIX))
+    if sep < 0:
+        return None
+    return frame[sep + 1:].encode(), frame[len(RAW_FRAME_PREFIX):sep]
+
+def verify_raw(data: bytes, signature: Union[str, bytes]) -> bool:
+    """Verify a signature (base64 text, or raw bytes from binary frames) over exactly ``data``."""
+    try:
+        if not signature:
+            return False
+        if isinstance(signature, str):
+            signature = base64.b64decode(signature)
+        _VERIFIER.verify(SHA256.new(data), signature)
+        return True
+    except Exception:
+        return False
+
+def verify_many(items: Sequence[Union[Dict, Tuple[bytes, str]]]) -> List[bool]:
+    """
+    Verify a batch in one call (one executor hop for many packets).
+    Items are legacy payload dicts or (signed_bytes, signature) pairs.
+    """
+    return [verify_signature(i) if isinstance(i, dict) else verify_raw(*i) for i in items]
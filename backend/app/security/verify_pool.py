@@ -0,0 +1,91 @@
+# app/security/verify_pool.py
+"""
+Off-loop signature verification for /ws/pi.
+
+RSA verification is pure CPU work; pycryptodome drops the GIL inside its
+modular exponentiation, so a small thread pool verifies packets in
+parallel without blocking the event loop.  Requests that arrive while all
+workers are busy are queued and handed to the next free worker in batches
+of up to ``max_batch``, so a burst costs one executor hop per batch rather
+than per packet.
+
+Per-drone ordering is the caller's job: ws_pi submits verifications as
+packets arrive and awaits the returned futures in arrival order.
+"""
+import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Deque, List, Optional, Tuple
+
+from ..config import VERIFY_WORKERS, VERIFY_MAX_BATCH
+from . import signature_verify
+from .. import metrics
+
+
+def _timed_verify(items: List[Any]) -> Tuple[List[bool], int]:
+    t0 = metrics.now_ns()
+    results = signature_verify.verify_many(items)
+    return results, metrics.now_ns() - t0
+
+
+class VerifyPool:
+    def __init__(self, workers: int = VERIFY_WORKERS, max_batch: int = VERIFY_MAX_BATCH):
+        self.workers = max(1, workers)
+        self.max_batch = max(1, max_batch)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: Deque[Tuple[Any, asyncio.Future]] = deque()
+        self._inflight = 0
+        self.batches = 0
+        self.verified = 0
+
+    def submit(self, payload: Any) -> asyncio.Future:
+        """
+        Queue a legacy payload dict or a (signed_bytes, signature_b64) pair
+        for verification; the future resolves to True/False.
+        """
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._pending.append((payload, fut))
+        self._dispatch(loop)
+        return fut
+
+    async def verify(self, payload: Any) -> bool:
+        return await self.submit(payload)
+
+    @property
+    def queued(self) -> int:
+        return len(self._pending)
+
+    def _dispatch(self, loop: asyncio.AbstractEventLoop):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="verify")
+        while self._pending and self._inflight < self.workers:
+            n = min(self.max_batch, len(self._pending))
+            batch = [self._pending.popleft() for _ in range(n)]
+            self._inflight += 1
+            self.batches += 1
+            cf = self._executor.submit(_timed_verify, [p for p, _ in batch])
+            cf.add_done_callback(
+                lambda cf, batch=batch: loop.call_soon_threadsafe(self._complete, loop, batch, cf))
+
+    def _complete(self, loop, batch: List[Tuple[Any, asyncio.Future]], cf):
+        self._inflight -= 1
+        try:
+            results, elapsed = cf.result()
+            # per-item verify time; the batch is timed once in the worker
+            metrics.verify_time.observe_ns(elapsed // len(batch), len(batch))
+        except Exception:
+            results = [False] * len(batch)
+        for (_, fut), ok in zip(batch, results):
+            if not fut.done():
+                fut.set_result(ok)
+        self.verified += len(batch)
+        self._dispatch(loop)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+verify_pool = VerifyPool()
@@ -0,0 +1,23 @@
+# app/shared/__init__.py
+from ..config import STATE_URL
+from .. import metrics
+from .base import Backend, InProcessBackend, BROADCAST_CHANNEL, STATE_CHANNEL, STATE_KEY_PREFIX
+from .resp import RespBackend
+
+
+def make_backend(url: str = None) -> Backend:
+    """No URL: everything stays in this process.  redis://host:port: Redis or resp_server.py."""
+    if not url:
+        return InProcessBackend()
+    if url.startswith("redis://"):
+        return RespBackend(url)
+    raise ValueError(f"unsupported DRONEGUARD_STATE_URL: {url!r}")
+
+
+# in-process unless DRONEGUARD_STATE_URL is set
+backend = make_backend(STATE_URL)
+
+metrics.registry.gauge("droneguard_shared_messages", "Messages exchanged with other workers",
+                       lambda: [({"direction": "published"}, backend.published),
+                                ({"direction": "received"}, backend.received),
+                                ({"direction": "dropped"}, backend.dropped)])
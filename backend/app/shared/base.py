@@ -0,0 +1,90 @@
+# app/shared/base.py
+"""
+State / pub-sub backend interface, and the in-process implementation.
+
+A backend gives every worker process two things:
+  - publish(channel, data) / subscribe(channel, handler): messages a
+    worker publishes are handed to the handlers of every *other* worker
+  - set(key, value) / get(key) / scan(prefix): a small key-value store for
+    the latest state, so a worker that starts (or reconnects) late can
+    catch up
+
+publish() and set() never block and may be called from any thread; they
+are fire-and-forget.  Handlers run on the worker's event loop.
+"""
+import os
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+Handler = Callable[[bytes], None]
+
+# channels and keys used by app.shared.sync
+BROADCAST_CHANNEL = "dg:broadcast"    # every /ws/frontend broadcast, as its JSON text
+STATE_CHANNEL = "dg:state"            # failsafe / attack state changes
+STATE_KEY_PREFIX = "dg:state:"        # + "<drone_id>:<kind>": latest of each
+
+
+class Backend(ABC):
+    # True when other processes share the state (sync.install() is a no-op otherwise)
+    shared = False
+
+    def __init__(self):
+        self.worker_id = f"{os.getpid()}-{os.urandom(3).hex()}"
+        self._handlers: Dict[str, List[Handler]] = {}
+        # awaited after every (re)connect, so subscribers can catch up on missed state
+        self.on_connect: List[Callable[[], Awaitable[None]]] = []
+        self.published = 0
+        self.received = 0
+        self.dropped = 0
+
+    def subscribe(self, channel: str, handler: Handler):
+        """Call ``handler(data)`` for every message other workers publish on ``channel``; before start()."""
+        self._handlers.setdefault(channel, []).append(handler)
+
+    @abstractmethod
+    def publish(self, channel: str, data: bytes):
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: bytes):
+        ...
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    async def scan(self, prefix: str) -> Dict[str, bytes]:
+        """Every key starting with ``prefix`` and its value."""
+
+    async def start(self):
+        pass
+
+    async def close(self):
+        pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": type(self).__name__, "worker": self.worker_id}
+
+
+class InProcessBackend(Backend):
+    """One worker: there is nobody to publish to, and the store is a dict."""
+
+    def __init__(self):
+        super().__init__()
+        self._data: Dict[str, bytes] = {}
+
+    def publish(self, channel: str, data: bytes):
+        pass
+
+    def set(self, key: str, value: bytes):
+        self._data[key] = value
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self._data.get(key)
+
+    async def scan(self, prefix: str) -> Dict[str, bytes]:
+        return {k: v for k, v in self._data.items() if k.startswith(prefix)}
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "inprocess", "worker": self.worker_id}
@@ -0,0 +1,272 @@
+# app/shared/resp.py
+"""
+Minimal RESP2 (Redis protocol) client, and RespBackend on top of it.
+
+Only what the shared backend needs: PUBLISH / SUBSCRIBE and SET / GET /
+KEYS.  Works against a real Redis or the stand-in in resp_server.py.
+
+RespBackend keeps two connections: one for commands, pipelined (writes
+never wait for replies; fire-and-forget commands just skip theirs), and
+one in subscribe mode.  publish() and set() may be called from any thread
+and never block: they hand the encoded command to the event loop.  While
+the server is unreachable these are dropped (and counted), and the
+connections are retried every RESP_RECONNECT_INTERVAL seconds; the
+on_connect callbacks then let the caller resynchronise.
+"""
+import asyncio
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+from urllib.parse import urlparse
+
+from ..config import RESP_RECONNECT_INTERVAL
+from ..log import get_logger
+from .base import Backend
+
+log = get_logger("shared")
+
+
+class RespError(Exception):
+    pass
+
+
+def encode_command(*args) -> bytes:
+    out = [b"*%d\r\n" % len(args)]
+    for a in args:
+        if isinstance(a, str):
+            a = a.encode()
+        elif not isinstance(a, (bytes, bytearray)):
+            a = str(a).encode()
+        out.append(b"$%d\r\n%s\r\n" % (len(a), a))
+    return b"".join(out)
+
+
+def encode_reply(value) -> bytes:
+    """Server side: None -> nil, int -> integer, bytes/str -> bulk, list -> array, RespError -> error."""
+    if value is None:
+        return b"$-1\r\n"
+    if isinstance(value, RespError):
+        return b"-%s\r\n" % str(value).encode()
+    if isinstance(value, bool):
+        value = int(value)
+    if isinstance(value, int):
+        return b":%d\r\n" % value
+    if isinstance(value, str):
+        value = value.encode()
+    if isinstance(value, (bytes, bytearray)):
+        return b"$%d\r\n%s\r\n" % (len(value), value)
+    return b"*%d\r\n" % len(value) + b"".join(encode_reply(v) for v in value)
+
+
+OK = b"+OK\r\n"
+
+
+async def read_reply(reader: asyncio.StreamReader) -> Any:
+    """One RESP value; errors are returned as RespError instances, not raised."""
+    line = await reader.readline()
+    if not line.endswith(b"\r\n"):
+        raise ConnectionError("connection closed")
+    kind, rest = line[:1], line[1:-2]
+    if kind == b"+":
+        return rest.decode()
+    if kind == b"-":
+        return RespError(rest.decode())
+    if kind == b":":
+        return int(rest)
+    if kind == b"$":
+        n = int(rest)
+        if n < 0:
+            return None
+        return (await reader.readexactly(n + 2))[:-2]
+    if kind == b"*":
+        n = int(rest)
+        if n < 0:
+            return None
+        return [await read_reply(reader) for _ in range(n)]
+    raise RespError(f"protocol error: {line[:40]!r}")
+
+
+class RespClient:
+    """One pipelined command connection; replies are matched to requests in order."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        # a future per request awaiting its reply; None for fire-and-forget
+        self._pending: Deque[Optional[asyncio.Future]] = deque()
+        self._task = asyncio.create_task(self._read())
+
+    @classmethod
+    async def connect(cls, host: str, port: int) -> "RespClient":
+        reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    @property
+    def closed(self) -> bool:
+        return self._task.done()
+
+    def send(self, frame: bytes):
+        """Write an encoded command and ignore its reply."""
+        self._pending.append(None)
+        self.writer.write(frame)
+
+    async def call(self, *args):
+        fut = asyncio.get_running_loop().create_future()
+        self._pending.append(fut)
+        self.writer.write(encode_command(*args))
+        reply = await fut
+        if isinstance(reply, RespError):
+            raise reply
+        return reply
+
+    async def _read(self):
+        try:
+            while True:
+                reply = await read_reply(self.reader)
+                fut = self._pending.popleft() if self._pending else None
+                if fut is not None and not fut.done():
+                    fut.set_result(reply)
+                elif isinstance(reply, RespError):
+                    log.warning("shared.command_error", error=str(reply))
+        except (ConnectionError, asyncio.IncompleteReadError, OSError) as e:
+            for fut in self._pending:
+                if fut is not None and not fut.done():
+                    fut.set_exception(ConnectionError(str(e)))
+            self._pending.clear()
+
+    async def close(self):
+        self._task.cancel()
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except Exception:
+            pass
+
+
+class RespBackend(Backend):
+    shared = True
+
+    def __init__(self, url: str):
+        super().__init__()
+        u = urlparse(url)
+        self.host = u.hostname or "127.0.0.1"
+        self.port = u.port or 6379
+        self.url = url
+        self._origin = self.worker_id.encode() + b"\0"
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._cmd: Optional[RespClient] = None
+        self._sub: Optional[asyncio.StreamWriter] = None
+        self._task: Optional[asyncio.Task] = None
+        self._connected = asyncio.Event()
+
+    # ---- any thread, never blocks ----
+    def publish(self, channel: str, data: bytes):
+        self._send(encode_command("PUBLISH", channel, self._origin + data))
+        self.published += 1
+
+    def set(self, key: str, value: bytes):
+        self._send(encode_command("SET", key, value))
+
+    def _send(self, frame: bytes):
+        if self._loop is None:
+            self.dropped += 1
+        elif threading.get_ident() == self._loop_thread:
+            self._write(frame)
+        else:
+            try:
+                self._loop.call_soon_threadsafe(self._write, frame)
+            except RuntimeError:
+                self.dropped += 1  # loop closed
+
+    def _write(self, frame: bytes):
+        if self._cmd is None or self._cmd.closed:
+            self.dropped += 1
+            return
+        self._cmd.send(frame)
+
+    # ---- event loop ----
+    async def get(self, key: str) -> Optional[bytes]:
+        if self._cmd is None or self._cmd.closed:
+            return None
+        return await self._cmd.call("GET", key)
+
+    async def scan(self, prefix: str) -> Dict[str, bytes]:
+        if self._cmd is None or self._cmd.closed:
+            return {}
+        keys = await self._cmd.call("KEYS", prefix.replace("*", r"\*") + "*")
+        out = {}
+        for key in keys:
+            value = await self._cmd.call("GET", key)
+            if value is not None:
+                out[key.decode()] = value
+        return out
+
+    async def start(self, timeout: float = 5.0):
+        if self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._task = asyncio.create_task(self._run())
+        try:
+            await asyncio.wait_for(self._connected.wait(), timeout)
+        except asyncio.TimeoutError:
+            log.error("shared.unreachable", url=self.url)
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+        self._loop = None
+
+    async def _run(self):
+        """Connect both connections, dispatch subscribed messages, reconnect on failure."""
+        while True:
+            sub_writer = None
+            try:
+                self._cmd = await RespClient.connect(self.host, self.port)
+                sub_reader, sub_writer = await asyncio.open_connection(self.host, self.port)
+                if self._handlers:
+                    sub_writer.write(encode_command("SUBSCRIBE", *self._handlers))
+                self._sub = sub_writer
+                log.info("shared.connected", url=self.url, worker=self.worker_id)
+                for fn in self.on_connect:
+                    await fn()
+                self._connected.set()
+                while True:
+                    msg = await read_reply(sub_reader)
+                    if isinstance(msg, list) and len(msg) == 3 and msg[0] == b"message":
+                        self._dispatch(msg[1].decode(), msg[2])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.warning("shared.disconnected", url=self.url, error=repr(e))
+            finally:
+                self._connected.clear()
+                self._sub = None
+                if sub_writer is not None:
+                    sub_writer.close()
+                if self._cmd is not None:
+                    await self._cmd.close()
+                    self._cmd = None
+            await asyncio.sleep(RESP_RECONNECT_INTERVAL)
+
+    def _dispatch(self, channel: str, data: bytes):
+        origin, _, body = data.partition(b"\0")
+        if origin + b"\0" == self._origin:
+            return  # our own publication
+        self.received += 1
+        for fn in self._handlers.get(channel, ()):
+            try:
+                fn(body)
+            except Exception:
+                log.exception("shared.handler_error", channel=channel)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "resp", "url": self.url, "worker": self.worker_id,
+                "connected": self._connected.is_set(), "published": self.published,
+                "received": self.received, "dropped": self.dropped}
@@ -0,0 +1,151 @@
+# app/shared/resp_server.py
+"""
+Tiny Redis-protocol server: just enough for RespBackend, for tests,
+benchmarks and single-host deployments without a Redis install.
+
+    python -m app.shared.resp_server --port 6379
+
+Keys live in a dict (no expiry, no persistence).  A subscriber whose socket
+buffers more than RESP_SERVER_MAX_PENDING bytes misses messages until it
+catches up, so one stalled worker cannot make the server grow without bound.
+"""
+import argparse
+import asyncio
+import fnmatch
+from typing import Dict, List, Optional, Set
+
+from ..config import RESP_SERVER_MAX_PENDING
+from .resp import RespError, encode_reply, read_reply, OK
+
+
+class RespServer:
+    def __init__(self, max_pending: int = RESP_SERVER_MAX_PENDING):
+        self.max_pending = max_pending
+        self.data: Dict[bytes, bytes] = {}
+        self.channels: Dict[bytes, Set[asyncio.StreamWriter]] = {}
+        self.published = 0
+        self.skipped = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 6379):
+        self._server = await asyncio.start_server(self._client, host, port)
+        return self._server
+
+    @property
+    def port(self) -> int:
+        return self._server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        subscribed: Set[bytes] = set()
+        try:
+            while True:
+                try:
+                    cmd = await read_reply(reader)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    return
+                if not isinstance(cmd, list) or not cmd:
+                    writer.write(encode_reply(RespError("ERR expected a command array")))
+                    continue
+                name = cmd[0].upper()
+                args = cmd[1:]
+                if name == b"QUIT":
+                    writer.write(OK)
+                    return
+                if name in (b"SUBSCRIBE", b"UNSUBSCRIBE"):
+                    self._subscribe(writer, subscribed, args, name == b"SUBSCRIBE")
+                else:
+                    writer.write(self.execute(name, args))
+                if writer.transport.get_write_buffer_size() > self.max_pending:
+                    await writer.drain()
+        except Exception:
+            pass
+        finally:
+            for channel in subscribed:
+                self.channels.get(channel, set()).discard(writer)
+            writer.close()
+
+    def _subscribe(self, writer, subscribed: Set[bytes], channels: List[bytes], on: bool):
+        kind = b"subscribe" if on else b"unsubscribe"
+        for channel in channels or list(subscribed):
+            if on:
+                subscribed.add(channel)
+                self.channels.setdefault(channel, set()).add(writer)
+            else:
+                subscribed.discard(channel)
+                self.channels.get(channel, set()).discard(writer)
+            writer.write(encode_reply([kind, channel, len(subscribed)]))
+
+    def execute(self, name: bytes, args: List[bytes]) -> bytes:
+        data = self.data
+        try:
+            if name == b"PUBLISH":
+                channel, message = args
+                return encode_reply(self.publish(channel, message))
+            if name == b"SET":
+                data[args[0]] = args[1]
+                return OK
+            if name == b"GET":
+                return encode_reply(data.get(args[0]))
+            if name == b"DEL":
+                return encode_reply(sum(data.pop(k, None) is not None for k in args))
+            if name == b"EXISTS":
+                return encode_reply(sum(k in data for k in args))
+            if name == b"INCR":
+                value = int(data.get(args[0], b"0")) + 1
+                data[args[0]] = str(value).encode()
+                return encode_reply(value)
+            if name == b"KEYS":
+                pattern = args[0].decode()
+                return encode_reply([k for k in data if fnmatch.fnmatchcase(k.decode(), pattern)])
+            if name == b"PING":
+                return encode_reply(args[0]) if args else b"+PONG\r\n"
+            if name == b"ECHO":
+                return encode_reply(args[0])
+            if name == b"FLUSHALL":
+                data.clear()
+                return OK
+        except (ValueError, IndexError):
+            return encode_reply(RespError(f"ERR wrong number of arguments for '{name.decode().lower()}'"))
+        return encode_reply(RespError(f"ERR unknown command '{name.decode()}'"))
+
+    def publish(self, channel: bytes, message: bytes) -> int:
+        subscribers = self.channels.get(channel)
+        if not subscribers:
+            return 0
+        frame = encode_reply([b"message", channel, message])
+        sent = 0
+        for w in subscribers:
+            if w.transport.get_write_buffer_size() > self.max_pending:
+                self.skipped += 1
+                continue
+            w.write(frame)
+            sent += 1
+        self.published += 1
+        return sent
+
+
+async def _serve(host: str, port: int):
+    server = RespServer()
+    await server.start(host, port)
+    print(f"resp_server listening on {host}:{server.port}", flush=True)
+    await asyncio.Event().wait()
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Minimal Redis-protocol server for DRONEGUARD_STATE_URL")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=6379)
+    args = ap.parse_args()
+    try:
+        asyncio.run(_serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+# app/shared/sync.py
+"""
+Keep the workers of one deployment in step through a shared backend.
+
+A drone's /ws/pi connection lands on one worker, which runs its detectors,
+incidents and failsafe engine as before.  What the other workers need:
+
+  - broadcasts: every /ws/frontend message is published (as the JSON text
+    already encoded for local clients) and delivered to the dashboards
+    connected to the other workers, without re-encoding
+  - telemetry: telemetry broadcasts also feed a replica session on the
+    other workers (buffer, history, last_seen), so /telemetry, /drones and
+    /telemetry/query answer the same everywhere; replicas show
+    connected=False
+  - failsafe and attack state: every change is published as a snapshot
+    and stored under dg:state:<drone>:<kind>; the other workers restore()
+    it, which wakes their long-polls and pushes it to a drone connected
+    there.  Last writer wins.
+
+Workers load the stored snapshots on startup and after a reconnect, so a
+late or restarted worker catches up.  With the in-process backend
+install() does nothing.
+"""
+import json
+import time
+from typing import Dict, Tuple
+
+from ..log import get_logger
+from ..state.drone_sessions import (DroneSession, get_session, list_sessions, on_session_created,
+                                    on_session_removed)
+from ..websocket_handlers.ws_frontend import deliver_remote
+from .base import Backend, BROADCAST_CHANNEL, STATE_CHANNEL, STATE_KEY_PREFIX
+
+log = get_logger("shared")
+
+FAILSAFE, ATTACKS = "failsafe", "attacks"
+
+# last snapshot published or applied per (drone, kind), so a restore() does not echo back
+_last: Dict[Tuple[str, str], str] = {}
+_backend: Backend = None
+
+
+def install(backend: Backend):
+    """Subscribe to the other workers and start publishing this one's changes; call before backend.start()."""
+    global _backend
+    if not backend.shared or _backend is not None:
+        return
+    _backend = backend
+    backend.subscribe(BROADCAST_CHANNEL, _on_broadcast)
+    backend.subscribe(STATE_CHANNEL, _on_state)
+    backend.on_connect.append(load)
+    on_session_created(_watch)
+    on_session_removed(_forget)
+    for session in list_sessions():
+        _watch(session)
+
+
+def _watch(session: DroneSession):
+    drone_id = session.drone_id
+    session.failsafe.add_listener(lambda st: _publish(drone_id, FAILSAFE, st.get_state(), st.version))
+    session.attacks.add_listener(lambda st: _publish(drone_id, ATTACKS, st.list_attacks(), st.version))
+
+
+def _forget(session: DroneSession):
+    for kind in (FAILSAFE, ATTACKS):
+        _last.pop((session.drone_id, kind), None)
+
+
+def _publish(drone_id: str, kind: str, state, version: int):
+    # may run in a threadpool handler; publish() and set() never block
+    body = json.dumps(state, sort_keys=True)
+    if _last.get((drone_id, kind)) == body:
+        return
+    _last[(drone_id, kind)] = body
+    data = json.dumps({"drone_id": drone_id, "kind": kind, "version": version, "state": state}).encode()
+    _backend.set(f"{STATE_KEY_PREFIX}{drone_id}:{kind}", data)
+    _backend.publish(STATE_CHANNEL, data)
+
+
+def _apply(msg: Dict, only_newer: bool = False):
+    session = get_session(msg["drone_id"])
+    kind = msg["kind"]
+    target = session.failsafe if kind == FAILSAFE else session.attacks if kind == ATTACKS else None
+    if target is None or (only_newer and msg["version"] <= target.version):
+        return
+    _last[(session.drone_id, kind)] = json.dumps(msg["state"], sort_keys=True)
+    target.restore(msg["state"], msg["version"])
+
+
+def _on_state(data: bytes):
+    _apply(json.loads(data))
+
+
+def _on_broadcast(data: bytes):
+    text = data.decode()
+    message = json.loads(text)
+    if message.get("type") == "telemetry" and message.get("drone_id") is not None:
+        session = get_session(message["drone_id"])
+        pkt = message.get("payload")
+        # a drone connected here is already recorded; this only feeds replicas
+        if session.connections == 0 and isinstance(pkt, dict):
+            session.buffer.add(pkt)
+            session.history.append(session.buffer.previous())
+            session.last_seen = time.time()
+    deliver_remote(message, text)
+
+
+async def load():
+    """Apply every stored snapshot newer than ours; republish ours where we are ahead."""
+    stored = await _backend.scan(STATE_KEY_PREFIX)
+    versions: Dict[Tuple[str, str], int] = {}
+    for data in stored.values():
+        try:
+            msg = json.loads(data)
+            _apply(msg, only_newer=True)
+            versions[(msg["drone_id"], msg["kind"])] = msg["version"]
+        except (ValueError, KeyError):
+            log.warning("shared.bad_snapshot")
+    # changes made while the server was unreachable were dropped: publish them now
+    for session in list_sessions():
+        for kind, st in ((FAILSAFE, session.failsafe), (ATTACKS, session.attacks)):
+            if st.version > versions.get((session.drone_id, kind), 0):
+                _last.pop((session.drone_id, kind), None)
+                state = st.get_state() if kind == FAILSAFE else st.list_attacks()
+                _publish(session.drone_id, kind, state, st.version)
+    log.info("shared.loaded", snapshots=len(stored), worker=_backend.worker_id)
@@ -1,26 +1,74 @@
 # app/state/attack_state.py
 import time
-from typing import List, Dict
+from typing import Callable, List, Dict
 
-# Very small in-memory store for demo
-_state = {
-    "attacks": []  # each attack is dict with keys mode, mag, style, dur, ts
-}
+
+class AttackState:
+    """Very small in-memory attack queue for one drone (demo)."""
+
+    def __init__(self):
+        self._state = {
+            "attacks": []  # each attack is dict with keys mode, mag, style, dur, ts
+        }
+        # bumped on every change; lets pollers ask "anything newer than N?"
+        self.version = 0
+        self._listeners: List[Callable[["AttackState"], None]] = []
+
+    def add_listener(self, fn: Callable[["AttackState"], None]):
+        """Call ``fn(self)`` after every change (from whichever thread made it)."""
+        self._listeners.append(fn)
+
+    def remove_listener(self, fn: Callable[["AttackState"], None]):
+        if fn in self._listeners:
+            self._listeners.remove(fn)
+
+    def _changed(self):
+        self.version += 1
+        for fn in list(self._listeners):
+            fn(self)
+
+    def restore(self, attacks: List[Dict], version: int):
+        """Take over a queue another worker published (no new change of our own)."""
+        self._state["attacks"][:] = [dict(a) for a in attacks]
+        self.version = max(self.version + 1, version)
+        for fn in list(self._listeners):
+            fn(self)
+
+    def list_attacks(self) -> List[Dict]:
+        return list(self._state["attacks"])
+
+    def add_attack(self, entry: Dict):
+        entry = dict(entry)
+        entry.setdefault("ts", time.time())
+        self._state["attacks"].append(entry)
+        self._changed()
+        return entry
+
+    def clear_attacks(self):
+        self._state["attacks"].clear()
+        self._changed()
+
+    def active(self) -> bool:
+        return len(self._state["attacks"]) > 0
+
+    def latest_attack(self) -> Dict | None:
+        return self._state["attacks"][-1] if self._state["attacks"] else None
+
+
+_default = AttackState()
+_state = _default._state
 
 def list_attacks() -> List[Dict]:
-    return list(_state["attacks"])
+    return _default.list_attacks()
 
 def add_attack(entry: Dict):
-    entry = dict(entry)
-    entry.setdefault("ts", time.time())
-    _state["attacks"].append(entry)
-    return entry
+    return _default.add_attack(entry)
 
 def clear_attacks():
-    _state["attacks"].clear()
+    _default.clear_attacks()
 
 def active() -> bool:
-    return len(_state["attacks"]) > 0
+    return _default.active()
 
 def latest_attack() -> Dict | None:
-    return _state["attacks"][-1] if _state["attacks"] else None
+    return _default.latest_attack()
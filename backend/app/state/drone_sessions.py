@@ -0,0 +1,138 @@
+# app/state/drone_sessions.py
+"""
+Per-drone session registry.
+
+Each drone connected to /ws/pi gets its own telemetry ring and history,
+detector state, incident tracker, failsafe state, attack queue and
+FailsafeEngine so several drones never share detector history.  Sessions
+are keyed by the drone ID announced in the handshake and looked up with a
+single dict access.
+
+The default drone ID maps onto the process-wide module state
+(telemetry_buffer / failsafe_state / attack_state), so single-drone setups
+and the un-parameterised HTTP endpoints keep working unchanged.
+
+Sessions of drones that went away are evicted after SESSION_IDLE_TTL,
+unless an operator left them a failsafe or queued attacks; modules that
+keep per-drone entries of their own drop them through on_session_removed.
+"""
+import time
+from typing import Callable, Dict, List, Optional
+
+from ..config import MAX_TELEMETRY_BUFFER
+from . import telemetry_buffer, failsafe_state, attack_state
+from .telemetry_buffer import TelemetryRing
+from .telemetry_history import TelemetryHistory
+from .incidents import IncidentTracker
+from .failsafe_state import FailsafeState
+from .attack_state import AttackState
+from ..failsafe.failsafe_engine import FailsafeEngine
+from ..detectors import make_detectors
+from ..log import get_logger
+
+log = get_logger("sessions")
+
+DEFAULT_DRONE_ID = "drone_pi"
+
+
+class DroneSession:
+    __slots__ = ("drone_id", "buffer", "history", "failsafe", "attacks", "engine",
+                 "detectors", "incidents", "created_at", "last_seen", "connections")
+
+    def __init__(self, drone_id: str, buffer: Optional[TelemetryRing] = None,
+                 failsafe: Optional[FailsafeState] = None,
+                 attacks: Optional[AttackState] = None):
+        self.drone_id = drone_id
+        self.buffer = buffer if buffer is not None else TelemetryRing(MAX_TELEMETRY_BUFFER)
+        self.history = TelemetryHistory()
+        self.failsafe = failsafe if failsafe is not None else FailsafeState()
+        self.attacks = attacks if attacks is not None else AttackState()
+        self.engine = FailsafeEngine(self.failsafe, drone_id=drone_id)
+        self.detectors = make_detectors()
+        self.incidents = IncidentTracker(drone_id)
+        self.created_at = time.time()
+        self.last_seen = self.created_at
+        self.connections = 0
+
+    def summary(self) -> Dict:
+        return {
+            "drone_id": self.drone_id,
+            "connected": self.connections > 0,
+            "samples": len(self.buffer),
+            "last_seen": self.last_seen,
+            "failsafe": self.failsafe.get_state(),
+            "failsafe_engine": self.engine.stats(),
+            "attack_active": self.attacks.active(),
+            "incidents": self.incidents.active(),
+        }
+
+
+_sessions: Dict[str, DroneSession] = {}
+_created_hooks: List[Callable[[DroneSession], None]] = []
+_removed_hooks: List[Callable[[DroneSession], None]] = []
+
+def on_session_created(fn: Callable[[DroneSession], None]):
+    """Call ``fn(session)`` for every session created from now on."""
+    _created_hooks.append(fn)
+
+def on_session_removed(fn: Callable[[DroneSession], None]):
+    """Call ``fn(session)`` for every session removed or evicted from now on."""
+    _removed_hooks.append(fn)
+
+def _make_default() -> DroneSession:
+    return DroneSession(
+        DEFAULT_DRONE_ID,
+        buffer=telemetry_buffer.telemetry_buffer,
+        failsafe=failsafe_state._default,
+        attacks=attack_state._default,
+    )
+
+def get_session(drone_id: Optional[str] = None) -> DroneSession:
+    """Return the session for ``drone_id``, creating it on first use."""
+    key = drone_id or DEFAULT_DRONE_ID
+    session = _sessions.get(key)
+    if session is None:
+        session = _make_default() if key == DEFAULT_DRONE_ID else DroneSession(key)
+        _sessions[key] = session
+        for fn in _created_hooks:
+            fn(session)
+    return session
+
+def find_session(drone_id: Optional[str] = None) -> Optional[DroneSession]:
+    return _sessions.get(drone_id or DEFAULT_DRONE_ID)
+
+def list_sessions() -> List[DroneSession]:
+    return list(_sessions.values())
+
+def _drop(key: str) -> Optional[DroneSession]:
+    session = _sessions.pop(key, None)
+    if session is not None:
+        for fn in _removed_hooks:
+            fn(session)
+    return session
+
+def remove_session(drone_id: str) -> bool:
+    return _drop(drone_id) is not None
+
+def _holds_operator_state(session: DroneSession) -> bool:
+    return bool(session.failsafe.get_state()["active"]) or session.attacks.active()
+
+def evict_idle(ttl: float, now: Optional[float] = None) -> int:
+    """
+    Drop sessions with no /ws/pi connection that have not been seen for
+    ``ttl`` seconds; the default session, and any with an active failsafe
+    or queued attacks, are kept. Returns how many went.
+    """
+    now = time.time() if now is None else now
+    cutoff = now - ttl
+    idle = [key for key, s in _sessions.items()
+            if key != DEFAULT_DRONE_ID and s.connections == 0 and s.last_seen < cutoff
+            and not _holds_operator_state(s)]
+    for key in idle:
+        session = _drop(key)
+        log.info("session.evicted", drone_id=key, idle_s=round(now - session.last_seen, 1),
+                 samples=len(session.buffer))
+    return len(idle)
+
+def clear_sessions():
+    _sessions.clear()
@@ -1,30 +1,77 @@
 # app/state/failsafe_state.py
 import time
-from typing import Optional, Dict
+from typing import Callable, List, Optional, Dict
 
-_failsafe = {
-    "active": False,
-    "activated_at": None,
-    "reason": None,
-    "auto_mode": False
-    
-}
+
+class FailsafeState:
+    """Failsafe flags for one drone. The module-level functions below wrap a default instance."""
+
+    def __init__(self):
+        self._failsafe = {
+            "active": False,
+            "activated_at": None,
+            "reason": None,
+            "auto_mode": False
+        }
+        # bumped on every change; lets pollers ask "anything newer than N?"
+        self.version = 0
+        self._listeners: List[Callable[["FailsafeState"], None]] = []
+
+    def add_listener(self, fn: Callable[["FailsafeState"], None]):
+        """Call ``fn(self)`` after every change (from whichever thread made it)."""
+        self._listeners.append(fn)
+
+    def remove_listener(self, fn: Callable[["FailsafeState"], None]):
+        if fn in self._listeners:
+            self._listeners.remove(fn)
+
+    def _changed(self):
+        self.version += 1
+        for fn in list(self._listeners):
+            fn(self)
+
+    def restore(self, snapshot: Dict, version: int):
+        """Take over a state another worker published (no new change of our own)."""
+        self._failsafe.update({k: snapshot.get(k) for k in self._failsafe})
+        self._failsafe["auto_mode"] = bool(self._failsafe["auto_mode"])
+        self.version = max(self.version + 1, version)
+        for fn in list(self._listeners):
+            fn(self)
+
+    def activate(self, reason: Optional[str] = None):
+        self._failsafe["active"] = True
+        self._failsafe["activated_at"] = time.time()
+        self._failsafe["reason"] = reason
+        self._changed()
+        return dict(self._failsafe)
+
+    def deactivate(self):
+        self._failsafe["active"] = False
+        self._failsafe["activated_at"] = None
+        self._failsafe["reason"] = None
+        self._changed()
+        return dict(self._failsafe)
+
+    def get_state(self) -> Dict:
+        return dict(self._failsafe)
+
+    def set_auto_mode(self, enabled: bool):
+        self._failsafe["auto_mode"] = enabled
+        self._changed()
+        return dict(self._failsafe)
+
+
+_default = FailsafeState()
+_failsafe = _default._failsafe
 
 def activate(reason: Optional[str] = None):
-    _failsafe["active"] = True
-    _failsafe["activated_at"] = time.time()
-    _failsafe["reason"] = reason
-    return dict(_failsafe)
+    return _default.activate(reason)
 
 def deactivate():
-    _failsafe["active"] = False
-    _failsafe["activated_at"] = None
-    _failsafe["reason"] = None
-    return dict(_failsafe)
+    return _default.deactivate()
 
 def get_state() -> Dict:
-    return dict(_failsafe)
+    return _default.get_state()
 
 def set_auto_mode(enabled: bool):
-    _failsafe["auto_mode"] = enabled
-    return dict(_failsafe)
+    return _default.set_auto_mode(enabled)
@@ -0,0 +1,303 @@
+# app/state/history_store.py
+"""
+Long-term telemetry history in SQLite (WAL mode).
+
+Keeps weeks of raw telemetry plus per-drone, per-minute rollups
+(samples, min / max / mean speed, alert counts in total and by type) for
+audits and long-range dashboard queries.
+
+Like the flight recorder, record() only appends to a deque on the event
+loop; a daemon thread wakes every HISTORY_FLUSH_INTERVAL seconds (or when a
+batch fills up) and writes everything pending in one transaction: the raw
+rows with executemany, and the rollups as one upsert per touched
+(drone, minute) after aggregating the batch in memory.  The same thread
+enforces retention every HISTORY_PRUNE_INTERVAL seconds.  A batch that
+fails to commit (database locked, disk full) is rolled back, logged and
+dropped, and the thread carries on; at most HISTORY_MAX_PENDING samples
+wait for it, beyond that new ones are dropped.  Both are counted in
+droneguard_history_dropped.
+
+WAL lets HTTP handlers read (each thread through its own read-only
+connection, all closed by close()) while the writer commits.
+"""
+import math
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..config import (HISTORY_DB, HISTORY_FLUSH_INTERVAL, HISTORY_BATCH, HISTORY_MAX_PENDING,
+                      HISTORY_RAW_RETENTION_DAYS, HISTORY_ROLLUP_RETENTION_DAYS, HISTORY_PRUNE_INTERVAL)
+from ..log import get_logger
+from .. import metrics
+from .telemetry_buffer import FIELDS, FIELD_INDEX
+
+log = get_logger("history")
+
+_SPEED = FIELD_INDEX["speed"]
+_TIME = FIELD_INDEX["time"]
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS telemetry (
+    drone_id TEXT NOT NULL,
+    {", ".join(f"{name} REAL" for name in FIELDS)},
+    source TEXT,
+    alerts INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS telemetry_drone_time ON telemetry (drone_id, time);
+CREATE TABLE IF NOT EXISTS rollup_minute (
+    drone_id TEXT NOT NULL,
+    minute INTEGER NOT NULL,            -- unix time // 60
+    samples INTEGER NOT NULL,
+    speed_min REAL,
+    speed_max REAL,
+    speed_sum REAL NOT NULL,
+    speed_n INTEGER NOT NULL,           -- samples with a speed value
+    alerts INTEGER NOT NULL,
+    PRIMARY KEY (drone_id, minute)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS rollup_alerts (
+    drone_id TEXT NOT NULL,
+    minute INTEGER NOT NULL,
+    type TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (drone_id, minute, type)
+) WITHOUT ROWID;
+"""
+
+_INSERT = f"INSERT INTO telemetry (drone_id, {', '.join(FIELDS)}, source, alerts) " \
+          f"VALUES ({', '.join('?' * (len(FIELDS) + 3))})"
+
+_UPSERT_MINUTE = """
+INSERT INTO rollup_minute VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (drone_id, minute) DO UPDATE SET
+    samples = samples + excluded.samples,
+    speed_min = min(coalesce(speed_min, excluded.speed_min), coalesce(excluded.speed_min, speed_min)),
+    speed_max = max(coalesce(speed_max, excluded.speed_max), coalesce(excluded.speed_max, speed_max)),
+    speed_sum = speed_sum + excluded.speed_sum,
+    speed_n = speed_n + excluded.speed_n,
+    alerts = alerts + excluded.alerts
+"""
+
+_UPSERT_ALERTS = """
+INSERT INTO rollup_alerts VALUES (?, ?, ?, ?)
+ON CONFLICT (drone_id, minute, type) DO UPDATE SET count = count + excluded.count
+"""
+
+ROLLUP_FIELDS = ("time", "samples", "speed_min", "speed_max", "speed_mean", "alerts")
+
+
+class HistoryStore:
+    def __init__(self, path: Optional[str], flush_interval: float = HISTORY_FLUSH_INTERVAL,
+                 raw_retention_days: float = HISTORY_RAW_RETENTION_DAYS,
+                 rollup_retention_days: float = HISTORY_ROLLUP_RETENTION_DAYS,
+                 prune_interval: float = HISTORY_PRUNE_INTERVAL):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.raw_retention = raw_retention_days * 86400.0
+        self.rollup_retention = rollup_retention_days * 86400.0
+        self.prune_interval = prune_interval
+        self._pending: Deque[Tuple[str, np.ndarray, Optional[str], Tuple[str, ...]]] = deque()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()  # guards start() and _readers
+        self._readers: Dict[int, sqlite3.Connection] = {}  # per reading thread
+        self._last_prune = 0.0
+        self.written = 0
+        self.dropped = 0     # samples lost to a full queue or a failed batch
+
+    @property
+    def enabled(self) -> bool:
+        return self.path is not None
+
+    # ---- event-loop side: O(1), no I/O ----
+    def record(self, drone_id: str, row: Sequence[float], source: Optional[str] = None,
+               alerts: Sequence[Dict] = ()):
+        """Queue one sample (a row of FIELDS values, e.g. TelemetryRing.previous()) and its alerts."""
+        if self.path is None:
+            return
+        if self._thread is None:
+            self.start()
+        if len(self._pending) >= HISTORY_MAX_PENDING:
+            self.dropped += 1
+            return
+        types = tuple(a.get("type", "UNKNOWN") for a in alerts) if alerts else ()
+        # copy now (the ring row is overwritten later); convert to Python floats on the writer thread
+        self._pending.append((drone_id, np.array(row, dtype=np.float64), source, types))
+        if len(self._pending) >= HISTORY_BATCH:
+            self._wake.set()
+
+    # ---- lifecycle ----
+    def start(self):
+        # called from the event loop and from any reading thread
+        with self._lock:
+            if self.path is None or self._thread is not None:
+                return
+            self._connect(writer=True).close()  # create the schema before anyone reads
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="history-store", daemon=True)
+            self._thread.start()
+
+    def close(self):
+        """Flush everything pending, stop the writer and close the read connections."""
+        with self._lock:
+            readers, self._readers = list(self._readers.values()), {}
+        for db in readers:
+            db.close()
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._wake.set()
+        self._thread.join()
+        self._thread = None
+
+    def _connect(self, writer: bool = False) -> sqlite3.Connection:
+        if writer:
+            db = sqlite3.connect(self.path, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.executescript(SCHEMA)
+            return db
+        # used only by the thread that opened it, but closed by close() from another
+        return sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+
+    # ---- writer thread ----
+    def _run(self):
+        db = self._connect(writer=True)
+        try:
+            while not self._stop.is_set():
+                self._wake.wait(self.flush_interval)
+                self._wake.clear()
+                self._flush(db)
+                if time.time() - self._last_prune >= self.prune_interval:
+                    try:
+                        self.prune(db=db)
+                    except sqlite3.Error as e:
+                        self._last_prune = time.time()  # try again next interval
+                        log.error("history.prune_failed", error=repr(e))
+            self._flush(db)
+        finally:
+            db.close()
+
+    def _flush(self, db: sqlite3.Connection):
+        if not self._pending:
+            return
+        rows = []
+        minutes: Dict[Tuple[str, int], List] = {}
+        alert_counts: Dict[Tuple[str, int, str], int] = {}
+        while self._pending:
+            drone_id, values, source, types = self._pending.popleft()
+            values = values.tolist()
+            rows.append((drone_id, *values, source, len(types)))
+            t = values[_TIME]
+            if t != t:
+                continue  # no timestamp: stored raw, not rolled up
+            minute = int(t // 60)
+            agg = minutes.get((drone_id, minute))
+            if agg is None:
+                agg = minutes[(drone_id, minute)] = [0, math.inf, -math.inf, 0.0, 0, 0]
+            agg[0] += 1
+            speed = values[_SPEED]
+            if speed == speed:
+                agg[1] = min(agg[1], speed)
+                agg[2] = max(agg[2], speed)
+                agg[3] += speed
+                agg[4] += 1
+            agg[5] += len(types)
+            for kind in types:
+                key = (drone_id, minute, kind)
+                alert_counts[key] = alert_counts.get(key, 0) + 1
+        try:
+            db.execute("BEGIN")
+            db.executemany(_INSERT, rows)
+            db.executemany(_UPSERT_MINUTE, [
+                (d, m, n, lo if n_speed else None, hi if n_speed else None, total, n_speed, alerts)
+                for (d, m), (n, lo, hi, total, n_speed, alerts) in minutes.items()])
+            if alert_counts:
+                db.executemany(_UPSERT_ALERTS, [(d, m, k, c) for (d, m, k), c in alert_counts.items()])
+            db.execute("COMMIT")
+        except sqlite3.Error as e:
+            # keep the writer alive; a batch that cannot be stored is dropped
+            if db.in_transaction:
+                db.execute("ROLLBACK")
+            self.dropped += len(rows)
+            log.error("history.write_failed", rows=len(rows), error=repr(e))
+            return
+        self.written += len(rows)
+
+    def prune(self, now: Optional[float] = None, db: Optional[sqlite3.Connection] = None) -> Tuple[int, int]:
+        """Drop raw rows and rollups past retention; returns (raw, rollup) rows deleted."""
+        now = time.time() if now is None else now
+        own = db is None
+        db = self._connect(writer=True) if own else db
+        try:
+            raw_cut = now - self.raw_retention
+            minute_cut = int((now - self.rollup_retention) // 60)
+            drones = [r[0] for r in db.execute("SELECT DISTINCT drone_id FROM rollup_minute")]
+            db.execute("BEGIN")
+            try:
+                raw = 0
+                for drone_id in drones:  # per drone, so the (drone_id, time) index does the work
+                    raw += db.execute("DELETE FROM telemetry WHERE drone_id = ? AND time < ?",
+                                      (drone_id, raw_cut)).rowcount
+                rolled = db.execute("DELETE FROM rollup_minute WHERE minute < ?", (minute_cut,)).rowcount
+                db.execute("DELETE FROM rollup_alerts WHERE minute < ?", (minute_cut,))
+                db.execute("COMMIT")
+            except sqlite3.Error:
+                # leave the connection usable for the next batch
+                if db.in_transaction:
+                    db.execute("ROLLBACK")
+                raise
+        finally:
+            if own:
+                db.close()
+        self._last_prune = time.time()
+        return raw, rolled
+
+    # ---- readers (any thread) ----
+    def _reader(self) -> sqlite3.Connection:
+        db = self._readers.get(threading.get_ident())
+        if db is None:
+            self.start()  # the read-only connection needs the file and schema to exist
+            db = self._connect()
+            with self._lock:
+                self._readers[threading.get_ident()] = db
+        return db
+
+    def raw(self, drone_id: str, start: Optional[float] = None, end: Optional[float] = None) -> np.ndarray:
+        """Raw samples in [start, end] as a (N, len(FIELDS)) array, oldest first (NaN for missing)."""
+        rows = self._reader().execute(
+            f"SELECT {', '.join(FIELDS)} FROM telemetry WHERE drone_id = ? AND time >= ? AND time <= ? ORDER BY time",
+            (drone_id, -math.inf if start is None else start, math.inf if end is None else end)).fetchall()
+        return np.array(rows, dtype=np.float64).reshape(len(rows), len(FIELDS))
+
+    def rollups(self, drone_id: str, start: Optional[float] = None, end: Optional[float] = None,
+                bucket_minutes: int = 1) -> Dict[str, List]:
+        """Rollup columns (ROLLUP_FIELDS) in [start, end], merged into buckets of ``bucket_minutes``."""
+        k = max(1, int(bucket_minutes))
+        lo = -2 ** 62 if start is None else int(start // 60)
+        hi = 2 ** 62 if end is None else int(end // 60)
+        rows = self._reader().execute(
+            "SELECT (minute / ?) * ? * 60, SUM(samples), MIN(speed_min), MAX(speed_max), "
+            "SUM(speed_sum) / NULLIF(SUM(speed_n), 0), SUM(alerts) "
+            "FROM rollup_minute WHERE drone_id = ? AND minute >= ? AND minute <= ? "
+            "GROUP BY minute / ? ORDER BY 1", (k, k, drone_id, lo, hi, k)).fetchall()
+        return {name: [r[i] for r in rows] for i, name in enumerate(ROLLUP_FIELDS)}
+
+    def alert_counts(self, drone_id: str, start: Optional[float] = None, end: Optional[float] = None) -> Dict[str, int]:
+        lo = -2 ** 62 if start is None else int(start // 60)
+        hi = 2 ** 62 if end is None else int(end // 60)
+        return dict(self._reader().execute(
+            "SELECT type, SUM(count) FROM rollup_alerts WHERE drone_id = ? AND minute >= ? AND minute <= ? "
+            "GROUP BY type", (drone_id, lo, hi)).fetchall())
+
+
+# disabled (record() is a no-op) unless DRONEGUARD_HISTORY_DB is set
+history_store = HistoryStore(HISTORY_DB)
+
+metrics.registry.gauge("droneguard_history_dropped", "History samples dropped (queue full or failed write)",
+                       lambda: history_store.dropped)
@@ -0,0 +1,145 @@
+# app/state/incidents.py
+"""
+Per-drone incident tracking.
+
+During an attack the detectors flag nearly every 4 Hz packet.  Instead of
+passing each of those alerts on, IncidentTracker merges consecutive
+anomalies of the same type into one incident and reports only its
+transitions:
+
+    open    after INCIDENT_OPEN_AFTER anomalies with no quiet gap between them
+    update  at most once per INCIDENT_UPDATE_INTERVAL seconds, and only if
+            new anomalies arrived since the last event
+    close   once INCIDENT_CLOSE_AFTER seconds pass without that anomaly
+
+A "quiet gap" is the close hysteresis: anomalies less than
+INCIDENT_CLOSE_AFTER seconds apart belong to the same incident.  Time is the
+packet's own timestamp, so replays and live traffic behave the same.
+"""
+import itertools
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from ..config import INCIDENT_OPEN_AFTER, INCIDENT_CLOSE_AFTER, INCIDENT_UPDATE_INTERVAL
+
+_ids = itertools.count(1)
+
+OPEN, UPDATE, CLOSE = "open", "update", "close"
+
+
+class Incident:
+    __slots__ = ("id", "drone_id", "type", "opened_at", "first_seen", "last_seen", "closed_at",
+                 "count", "severity", "detail", "_reported_count", "_reported_at")
+
+    def __init__(self, drone_id: str, kind: str, t: float):
+        self.id = next(_ids)
+        self.drone_id = drone_id
+        self.type = kind
+        self.first_seen = self.last_seen = t
+        self.opened_at: Optional[float] = None   # None while still pending
+        self.closed_at: Optional[float] = None
+        self.count = 0
+        self.severity = "low"
+        self.detail: Dict = {}
+        self._reported_count = 0
+        self._reported_at = t
+
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None and self.closed_at is None
+
+    def to_dict(self) -> Dict:
+        return {
+            "id": self.id,
+            "drone_id": self.drone_id,
+            "type": self.type,
+            "state": "closed" if self.closed_at is not None else "open",
+            "opened_at": self.opened_at,
+            "first_seen": self.first_seen,
+            "last_seen": self.last_seen,
+            "closed_at": self.closed_at,
+            "count": self.count,
+            "severity": self.severity,
+            "detail": self.detail,
+        }
+
+
+Event = Tuple[str, Incident]
+
+
+class IncidentTracker:
+    """
+    Incidents of one drone, keyed by alert type.  update() is called for
+    every packet and returns the (event, incident) transitions it caused,
+    usually none.
+    """
+
+    def __init__(self, drone_id: str, open_after: int = INCIDENT_OPEN_AFTER,
+                 close_after: float = INCIDENT_CLOSE_AFTER,
+                 update_interval: float = INCIDENT_UPDATE_INTERVAL):
+        self.drone_id = drone_id
+        self.open_after = max(1, int(open_after))
+        self.close_after = close_after
+        self.update_interval = update_interval
+        # pending and open incidents by type
+        self._active: Dict[str, Incident] = {}
+        self.opened = 0
+        self.closed = 0
+
+    def update(self, alerts: Sequence[Dict], t: float) -> List[Event]:
+        active = self._active
+        if not alerts and not active:
+            return []
+        events: List[Event] = []
+        for alert in alerts:
+            kind = alert.get("type", "UNKNOWN")
+            inc = active.get(kind)
+            if inc is not None and t - inc.last_seen > self.close_after:
+                self._end(inc, inc.last_seen + self.close_after, events)
+                inc = None
+            if inc is None:
+                inc = active[kind] = Incident(self.drone_id, kind, t)
+            inc.count += 1
+            inc.last_seen = t
+            inc.severity = alert.get("severity", inc.severity)
+            inc.detail = alert.get("detail", inc.detail)
+            if inc.opened_at is None:
+                if inc.count >= self.open_after:
+                    inc.opened_at = t
+                    inc._reported_count, inc._reported_at = inc.count, t
+                    self.opened += 1
+                    events.append((OPEN, inc))
+            elif t - inc._reported_at >= self.update_interval:
+                inc._reported_count, inc._reported_at = inc.count, t
+                events.append((UPDATE, inc))
+        # quiet types: close, or flush an update that was held back by the rate limit
+        for kind, inc in list(active.items()):
+            if inc.last_seen == t:
+                continue
+            if t - inc.last_seen > self.close_after:
+                self._end(inc, inc.last_seen + self.close_after, events)
+            elif (inc.opened_at is not None and inc.count != inc._reported_count
+                  and t - inc._reported_at >= self.update_interval):
+                inc._reported_count, inc._reported_at = inc.count, t
+                events.append((UPDATE, inc))
+        return events
+
+    def close_all(self, t: Optional[float] = None) -> List[Event]:
+        """
+        Close everything (e.g. the drone disconnected), at ``t`` or else at
+        each incident's last anomaly; pending incidents are dropped.
+        """
+        events: List[Event] = []
+        for inc in list(self._active.values()):
+            self._end(inc, inc.last_seen if t is None else t, events)
+        return events
+
+    def _end(self, inc: Incident, t: float, events: List[Event]):
+        del self._active[inc.type]
+        if inc.opened_at is None:
+            return  # never reached open_after: nothing was reported
+        inc.closed_at = t
+        self.closed += 1
+        events.append((CLOSE, inc))
+
+    def active(self) -> List[Dict]:
+        return [inc.to_dict() for inc in self._active.values() if inc.is_open]
@@ -1,20 +1,116 @@
 # app/state/telemetry_buffer.py
-from collections import deque
+"""
+Columnar telemetry ring buffer backed by NumPy.
+
+Numeric fields live in one fixed-size float64 block (one column per field,
+NaN for missing values).  Every sample is written twice, at ``i`` and
+``i + capacity``, so the newest ``n`` samples are always a contiguous slice
+and every read accessor returns a view instead of a copy.  The original
+packet dicts are kept by reference only for the lazy ``/telemetry/buffer``
+export.
+"""
+from typing import Dict, Iterator, List, Optional
+import numpy as np
 from ..config import MAX_TELEMETRY_BUFFER
 
-telemetry_buffer = deque(maxlen=MAX_TELEMETRY_BUFFER)
+FIELDS = ("time", "gps_lat", "gps_lon", "alt", "vx", "vy", "speed", "yaw", "roll", "pitch", "battery")
+FIELD_INDEX = {name: i for i, name in enumerate(FIELDS)}
+
+
+def _as_float(value) -> float:
+    if value is None:
+        return np.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+class TelemetryRing:
+    """Fixed-capacity ring of telemetry samples, oldest to newest."""
+
+    def __init__(self, capacity: int = MAX_TELEMETRY_BUFFER):
+        if capacity < 1:
+            raise ValueError("capacity must be >= 1")
+        self.capacity = capacity
+        self._data = np.full((2 * capacity, len(FIELDS)), np.nan)
+        self._packets: List[Optional[Dict]] = [None] * capacity
+        self._count = 0  # total samples ever written
+
+    def __len__(self) -> int:
+        return min(self._count, self.capacity)
+
+    def _end(self) -> int:
+        # one past the newest row inside the mirrored half
+        return (self._count - 1) % self.capacity + self.capacity + 1
+
+    def add(self, pkt: Dict):
+        slot = self._count % self.capacity
+        row = [_as_float(pkt.get(name)) for name in FIELDS]
+        self._data[slot] = row
+        self._data[slot + self.capacity] = row
+        self._packets[slot] = pkt
+        self._count += 1
+
+    # ---- zero-copy views (oldest -> newest) ----
+    def last(self, n: Optional[int] = None) -> np.ndarray:
+        """Newest ``n`` samples (all if ``n`` is None) as a (n, len(FIELDS)) view."""
+        size = len(self)
+        n = size if n is None else max(0, min(n, size))
+        end = self._end() if size else 0
+        return self._data[end - n:end]
+
+    def previous(self) -> Optional[np.ndarray]:
+        """Newest sample as a row view, or None when empty."""
+        if not self._count:
+            return None
+        return self._data[self._end() - 1]
+
+    def since(self, t: float) -> np.ndarray:
+        """Samples with ``time >= t``; assumes samples arrive in time order."""
+        window = self.last()
+        start = int(np.searchsorted(window[:, FIELD_INDEX["time"]], t, side="left"))
+        return window[start:]
+
+    def column(self, name: str, n: Optional[int] = None) -> np.ndarray:
+        return self.last(n)[:, FIELD_INDEX[name]]
+
+    # ---- packet access ----
+    def latest(self) -> Optional[Dict]:
+        if not self._count:
+            return None
+        return self._packets[(self._count - 1) % self.capacity]
+
+    def iter_export(self) -> Iterator[Dict]:
+        """
+        Stored packets newest-first.  The ring is snapshotted when this is
+        called (packet references only, no copies of the dicts), so the
+        iterator can be consumed on another thread while add() carries on.
+        """
+        count, size = self._count, len(self)
+        packets = self._packets[:]
+        return (packets[(count - 1 - i) % self.capacity] for i in range(size))
+
+    def clear(self):
+        self._data.fill(np.nan)
+        self._packets = [None] * self.capacity
+        self._count = 0
+
+
+telemetry_buffer = TelemetryRing(MAX_TELEMETRY_BUFFER)
 
 def add(pkt: dict):
-    telemetry_buffer.append(pkt)
+    telemetry_buffer.add(pkt)
 
 def get_buffer():
     # return newest-first to be consistent with frontend expectations
-    return list(reversed(telemetry_buffer))
+    return list(telemetry_buffer.iter_export())
+
+def iter_buffer():
+    return telemetry_buffer.iter_export()
 
 def latest():
-    if telemetry_buffer:
-        return telemetry_buffer[-1]
-    return None
+    return telemetry_buffer.latest()
 
 def clear():
     telemetry_buffer.clear()
@@ -0,0 +1,85 @@
+# app/state/telemetry_history.py
+"""
+Bounded per-drone telemetry history for range queries.
+
+Same columns as TelemetryRing (telemetry_buffer.FIELDS) but sized for
+hours rather than the detectors' short window, and allocated in chunks of
+``chunk`` rows as data arrives, so idle or short-lived sessions cost
+almost nothing.  Once ``capacity`` is exceeded the oldest chunk is dropped.
+
+Rows are assumed to arrive in time order (as per-drone telemetry does), so
+each chunk's time column is sorted and a range lookup is a binary search
+per chunk boundary.
+
+append() runs on the event loop while /telemetry/query reads from the
+threadpool, and a full history reuses its oldest block in place, so both
+sides hold a lock: readers copy their range out before releasing it.
+"""
+import threading
+from collections import deque
+from typing import Deque, Optional
+
+import numpy as np
+
+from ..config import TELEMETRY_HISTORY_SAMPLES, TELEMETRY_HISTORY_CHUNK
+from .telemetry_buffer import FIELDS, FIELD_INDEX
+
+_TIME = FIELD_INDEX["time"]
+
+
+class TelemetryHistory:
+    def __init__(self, capacity: int = TELEMETRY_HISTORY_SAMPLES, chunk: int = TELEMETRY_HISTORY_CHUNK):
+        self.chunk = max(1, chunk)
+        self.max_chunks = max(2, -(-capacity // self.chunk) + 1)
+        self._chunks: Deque[np.ndarray] = deque()
+        self._fill = self.chunk  # rows used in the newest chunk
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        if not self._chunks:
+            return 0
+        return (len(self._chunks) - 1) * self.chunk + self._fill
+
+    def append(self, row):
+        """Add one sample (a row of len(FIELDS) floats, e.g. TelemetryRing.previous())."""
+        with self._lock:
+            if self._fill == self.chunk:
+                if len(self._chunks) == self.max_chunks:
+                    block = self._chunks.popleft()  # reuse the oldest block
+                else:
+                    block = np.empty((self.chunk, len(FIELDS)))
+                self._chunks.append(block)
+                self._fill = 0
+            self._chunks[-1][self._fill] = row
+            self._fill += 1
+
+    def _views(self):
+        last = len(self._chunks) - 1
+        for i, block in enumerate(self._chunks):
+            yield block[:self._fill] if i == last else block
+
+    @property
+    def first_time(self) -> Optional[float]:
+        with self._lock:
+            return float(self._chunks[0][0, _TIME]) if self._chunks else None
+
+    def range(self, start: Optional[float] = None, end: Optional[float] = None) -> np.ndarray:
+        """Copy of the samples with start <= time <= end, oldest first."""
+        parts = []
+        with self._lock:
+            for view in self._views():
+                t = view[:, _TIME]
+                if not len(t) or (start is not None and t[-1] < start) or (end is not None and t[0] > end):
+                    continue
+                lo = int(np.searchsorted(t, start, side="left")) if start is not None else 0
+                hi = int(np.searchsorted(t, end, side="right")) if end is not None else len(t)
+                if hi > lo:
+                    parts.append(view[lo:hi])
+            if not parts:
+                return np.empty((0, len(FIELDS)))
+            return np.concatenate(parts)  # copies, so the blocks can be reused once we let go
+
+    def clear(self):
+        with self._lock:
+            self._chunks.clear()
+            self._fill = self.chunk
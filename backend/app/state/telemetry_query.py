@@ -0,0 +1,181 @@
+# app/state/telemetry_query.py
+"""
+Range queries over a drone's telemetry for GET /telemetry/query.
+
+Rows come from the session's TelemetryHistory (recent hours, in memory)
+and, for anything older, from the SQLite history store or else the flight
+recorder, whichever is enabled.  All are time-ordered/indexed, so
+selecting a range is a binary search, not a scan.  Results are columnar
+({field: [values]}), either paged raw rows (limit + cursor) or downsampled
+to about ``points`` rows with Largest-Triangle-Three-Buckets, which keeps
+the peaks and troughs a chart or map would draw.
+
+Ranges longer than HISTORY_ROLLUP_AFTER (or resolution="minute") are
+answered from the history store's per-minute rollups instead of raw rows.
+"""
+import math
+import time
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from ..config import QUERY_MAX_ROWS, HISTORY_ROLLUP_AFTER
+from ..recorder import recorder, RecorderReader
+from .history_store import history_store, ROLLUP_FIELDS
+from .drone_sessions import find_session, DEFAULT_DRONE_ID
+from .telemetry_buffer import FIELDS, FIELD_INDEX
+
+_TIME = FIELD_INDEX["time"]
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n: int) -> np.ndarray:
+    """
+    Row indices chosen by Largest-Triangle-Three-Buckets: the first and last
+    rows, plus one row per bucket maximising the triangle it forms with the
+    previous pick and the next bucket's mean.  NaN values are never picked
+    unless a whole bucket is NaN.
+    """
+    size = len(x)
+    if n >= size or size <= 2:
+        return np.arange(size)
+    if n < 3:
+        return np.array([0, size - 1][:max(n, 1)])
+    valid = ~np.isnan(y)
+    yf = np.where(valid, y, 0.0)
+    # bucket b covers rows [edges[b], edges[b + 1]); the first and last rows are their own buckets
+    edges = (np.floor(np.arange(n - 1) * (size - 2) / (n - 2)).astype(np.int64) + 1)
+    edges[-1] = size - 1
+    counts = np.maximum(np.add.reduceat(valid[:-1].astype(np.int64), edges[:-1]), 1)
+    mean_x = np.add.reduceat(x[:-1], edges[:-1]) / np.diff(edges)
+    mean_y = np.add.reduceat(yf[:-1], edges[:-1]) / counts
+    # the "next bucket" of the last bucket is the final row
+    next_x = np.append(mean_x[1:], x[-1])
+    next_y = np.append(mean_y[1:], yf[-1])
+
+    out = np.empty(n, dtype=np.int64)
+    out[0], out[-1] = 0, size - 1
+    a = 0
+    for b in range(n - 2):
+        lo, hi = edges[b], edges[b + 1]
+        ax, ay = x[a], yf[a]
+        area = np.abs((ax - next_x[b]) * (yf[lo:hi] - ay) - (ax - x[lo:hi]) * (next_y[b] - ay))
+        area[~valid[lo:hi]] = -1.0
+        a = lo + int(np.argmax(area))
+        out[b + 1] = a
+    return out
+
+
+def _recorded(drone_id: str, start: Optional[float], end: Optional[float]) -> np.ndarray:
+    with RecorderReader(recorder.directory) as reader:
+        rec = reader.telemetry_columns(drone_id, start, end)
+        rows = np.empty((len(rec), len(FIELDS)))
+        for i, name in enumerate(FIELDS):
+            rows[:, i] = rec[name]
+    return rows
+
+
+def select(drone_id: str, start: Optional[float] = None, end: Optional[float] = None) -> np.ndarray:
+    """All rows with start <= time <= end, oldest first."""
+    session = find_session(drone_id)
+    memory = session.history.range(start, end) if session is not None else np.empty((0, len(FIELDS)))
+    if not (history_store.enabled or recorder.enabled):
+        return memory
+    # the history store (or recorder) covers whatever is older than the in-memory history
+    first = session.history.first_time if session is not None else None
+    if first is not None and start is not None and start >= first:
+        return memory
+    older_end = end if first is None else (first if end is None else min(end, first))
+    if history_store.enabled:
+        older = history_store.raw(drone_id, start, older_end)
+    else:
+        older = _recorded(drone_id, start, older_end)
+    if first is not None:
+        older = older[older[:, _TIME] < first]
+    return np.concatenate([older, memory]) if len(older) else memory
+
+
+def _column(values: np.ndarray) -> List:
+    return [None if v != v else v for v in values.tolist()]
+
+
+def rollup_query(drone_id: str, start: Optional[float], end: Optional[float], points: Optional[int]) -> Dict:
+    """Per-minute rollups, merged into wider buckets so that about ``points`` rows come back."""
+    bucket = 1
+    if points and start is not None:
+        minutes = ((end if end is not None else time.time()) - start) / 60.0
+        bucket = max(1, math.ceil(minutes / max(1, min(points, QUERY_MAX_ROWS))))
+    columns = history_store.rollups(drone_id, start, end, bucket)
+    n = len(columns["time"])
+    return {
+        "drone_id": drone_id,
+        "resolution": "minute",
+        "bucket_s": bucket * 60,
+        "fields": list(ROLLUP_FIELDS),
+        "count": n,
+        "total": n,
+        "downsampled": bucket > 1,
+        "next_cursor": None,
+        "columns": columns,
+    }
+
+
+def query(drone_id: Optional[str] = None, start: Optional[float] = None, end: Optional[float] = None,
+          fields: Optional[Sequence[str]] = None, limit: int = 1000, cursor: Optional[float] = None,
+          points: Optional[int] = None, by: Optional[str] = None, resolution: str = "auto") -> Dict:
+    """
+    Columnar telemetry for one drone.  With ``points`` the whole range is
+    downsampled (LTTB on ``by``, default the first requested field) and
+    limit/cursor are ignored; otherwise up to ``limit`` raw rows newer than
+    ``cursor`` are returned with ``next_cursor`` set when more remain.
+
+    resolution: "raw", "minute" (history-store rollups, fields/limit/cursor
+    ignored) or "auto" (minute for ranges longer than HISTORY_ROLLUP_AFTER
+    when the history store is enabled).  Raises ValueError for unknown
+    field names or resolutions.
+    """
+    drone_id = drone_id or DEFAULT_DRONE_ID
+    if resolution not in ("auto", "raw", "minute"):
+        raise ValueError(f"unknown resolution {resolution!r}")
+    if resolution == "auto" and history_store.enabled and start is not None:
+        span = (end if end is not None else time.time()) - start
+        resolution = "minute" if span > HISTORY_ROLLUP_AFTER else "raw"
+    if resolution == "minute":
+        if not history_store.enabled:
+            raise ValueError("minute resolution needs the history store (DRONEGUARD_HISTORY_DB)")
+        return rollup_query(drone_id, start, end, points)
+    fields = [f for f in (fields or FIELDS) if f != "time"]
+    unknown = [f for f in fields + ([by] if by else []) if f not in FIELD_INDEX]
+    if unknown:
+        raise ValueError(f"unknown field(s): {', '.join(unknown)}")
+
+    rows = select(drone_id, start, end)
+    total = len(rows)
+    next_cursor = None
+    downsampled = False
+    if points is not None:
+        points = max(1, min(points, QUERY_MAX_ROWS))
+        if total > points:
+            key = by or (fields[0] if fields else "time")
+            rows = rows[lttb_indices(rows[:, _TIME], rows[:, FIELD_INDEX[key]], points)]
+            downsampled = True
+    else:
+        limit = max(1, min(limit, QUERY_MAX_ROWS))
+        if cursor is not None:
+            rows = rows[int(np.searchsorted(rows[:, _TIME], cursor, side="right")):]
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = float(rows[-1, _TIME])
+
+    columns = {"time": rows[:, _TIME].tolist()}
+    for name in fields:
+        columns[name] = _column(rows[:, FIELD_INDEX[name]])
+    return {
+        "drone_id": drone_id,
+        "resolution": "raw",
+        "fields": ["time"] + fields,
+        "count": len(rows),
+        "total": total,
+        "downsampled": downsampled,
+        "next_cursor": next_cursor,
+        "columns": columns,
+    }
@@ -0,0 +1,87 @@
+# app/websocket_handlers/pi_push.py
+"""
+Push attack / failsafe state down /ws/pi.
+
+A drone that says {"push": true} in its hello gets
+    {"type": "state", "drone_id": ..., "attack": {"active", "count", "latest"},
+     "failsafe": {...}}
+once right after the handshake and again whenever its session's attack
+queue or failsafe state changes, so it no longer has to poll the HTTP
+endpoints.  Changes are coalesced: the pusher wakes up, sends the current
+state, and skips it if nothing visible changed since the last send.
+
+State changes can come from HTTP handlers running in the threadpool, so
+listeners only schedule a wake-up on the connection's event loop.
+"""
+import asyncio
+import json
+from typing import Dict, Optional
+
+from ..state.drone_sessions import DroneSession
+
+
+def state_message(session: DroneSession) -> Dict:
+    attacks = session.attacks
+    return {
+        "type": "state",
+        "drone_id": session.drone_id,
+        "attack": {"active": attacks.active(), "count": len(attacks.list_attacks()),
+                   "latest": attacks.latest_attack()},
+        "failsafe": session.failsafe.get_state(),
+    }
+
+
+class StatePusher:
+    def __init__(self, websocket):
+        self.websocket = websocket
+        self.session: Optional[DroneSession] = None
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._last: Optional[str] = None
+        self.sent = 0
+        self.task = asyncio.create_task(self._run())
+
+    def bind(self, session: DroneSession):
+        """Follow ``session`` (called on every handshake) and send its state now."""
+        self._unbind()
+        self.session = session
+        session.failsafe.add_listener(self._changed)
+        session.attacks.add_listener(self._changed)
+        self._last = None
+        self._wake.set()
+
+    def _unbind(self):
+        if self.session is not None:
+            self.session.failsafe.remove_listener(self._changed)
+            self.session.attacks.remove_listener(self._changed)
+            self.session = None
+
+    def _changed(self, _state):
+        try:
+            self._loop.call_soon_threadsafe(self._wake.set)
+        except RuntimeError:
+            pass  # loop already closed
+
+    async def _run(self):
+        try:
+            while True:
+                await self._wake.wait()
+                self._wake.clear()
+                if self.session is None:
+                    continue
+                text = json.dumps(state_message(self.session))
+                if text == self._last:
+                    continue
+                self._last = text
+                await self.websocket.send_text(text)
+                self.sent += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            pass  # socket gone; the receive loop will notice
+        finally:
+            self._unbind()
+
+    def close(self):
+        self._unbind()
+        self.task.cancel()
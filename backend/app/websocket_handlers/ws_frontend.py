@@ -1,52 +1,366 @@
 # app/websocket_handlers/ws_frontend.py
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 import asyncio
-from typing import Set, Dict, Any
+import itertools
+from collections import deque
+from typing import Deque, Dict, Any, Hashable, List, Optional, Tuple, Union
 import json
+import time
+
+from ..config import FRONTEND_QUEUE_SIZE
+from .. import wire
+from .. import metrics
+from ..log import get_logger
+from ..shared import backend, BROADCAST_CHANNEL
+from ..state.drone_sessions import on_session_removed
 
 router = APIRouter()
+log = get_logger("ws_frontend")
+
+_ids = itertools.count(1)
+
+MESSAGE_TYPES = ("telemetry", "alerts", "failsafe")
+
+# which subscription type each broadcast message belongs to; unknown types
+# are always delivered
+_CATEGORY = {"telemetry": "telemetry", "signature_fail": "alerts", "alert": "alerts", "incident": "alerts",
+             "failsafe": "failsafe"}
+
+
+class Subscription:
+    """
+    What a client asked for with
+        {"type": "subscribe", "drones": ["d1", ...] | null, "types": [...],
+         "max_rate_hz": 1.0, "mode": "latest" | "decimate",
+         "encoding": "json" | "binary"}
+    max_rate_hz limits telemetry frames per drone. In "latest" mode the
+    newest frame held back by the limit is sent when the interval elapses;
+    "decimate" simply drops it.
+    """
+
+    def __init__(self, msg: Dict[str, Any]):
+        drones = msg.get("drones")
+        self.drones = set(map(str, drones)) if drones else None
+        types = msg.get("types") or MESSAGE_TYPES
+        self.types = {t for t in types if t in MESSAGE_TYPES}
+        rate = msg.get("max_rate_hz")
+        try:
+            rate = float(rate) if rate is not None else None
+        except (TypeError, ValueError):
+            rate = None
+        self.min_interval = 1.0 / rate if rate and rate > 0 else 0.0
+        self.latest = msg.get("mode", "latest") != "decimate"
+        # binary clients get telemetry as wire.DGF1 frames, everything else as JSON
+        self.binary = msg.get("encoding") == wire.ENCODING_BINARY
+
+    def describe(self) -> Dict[str, Any]:
+        return {"drones": sorted(self.drones) if self.drones is not None else None,
+                "types": sorted(self.types),
+                "max_rate_hz": 1.0 / self.min_interval if self.min_interval else None,
+                "mode": "latest" if self.latest else "decimate",
+                "encoding": wire.ENCODING_BINARY if self.binary else wire.ENCODING_JSON}
+
+
+class _Outgoing:
+    """One broadcast; each wire variant is JSON-encoded at most once, on demand."""
+
+    __slots__ = ("message", "category", "drone_id", "failsafe_changed", "_text", "_failsafe_text", "_binary")
+
+    def __init__(self, message: Dict[str, Any]):
+        self.message = message
+        mtype = message.get("type")
+        self.category = _CATEGORY.get(mtype)
+        self.drone_id = message.get("drone_id")
+        self.failsafe_changed = mtype == "telemetry" and _note_failsafe(self.drone_id, message.get("failsafe"))
+        self._text = self._failsafe_text = self._binary = None
+
+    @property
+    def key(self) -> Optional[Hashable]:
+        # only telemetry is latest-value; incident/failsafe/signature events are kept
+        return ("telemetry", self.drone_id) if self.message.get("type") == "telemetry" else None
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = _dumps(self.message)
+        return self._text
+
+    @property
+    def binary(self) -> bytes:
+        if self._binary is None:
+            m = self.message
+            fs = m.get("failsafe") or {}
+            self._binary = wire.encode_frontend_telemetry(
+                self.drone_id, m.get("payload") or {}, bool(m.get("verified")),
+                bool(fs.get("active")), len(m.get("alerts") or ()))
+        return self._binary
+
+    @property
+    def failsafe_text(self) -> str:
+        if self._failsafe_text is None:
+            self._failsafe_text = _dumps({"type": "failsafe", "drone_id": self.drone_id,
+                                          "payload": self.message.get("failsafe")})
+        return self._failsafe_text
+
+
+def _dumps(message) -> str:
+    try:
+        return json.dumps(message)
+    except Exception:
+        return str(message)
+
+
+# last failsafe state seen per drone, so failsafe-only subscribers get transitions
+_last_failsafe: Dict[Any, Tuple] = {}
+
+def _note_failsafe(drone_id, fs) -> bool:
+    if not isinstance(fs, dict):
+        return False
+    sig = (fs.get("active"), fs.get("reason"), fs.get("auto_mode"))
+    if _last_failsafe.get(drone_id) == sig:
+        return False
+    _last_failsafe[drone_id] = sig
+    return True
+
+on_session_removed(lambda session: _last_failsafe.pop(session.drone_id, None))
+
+
+class FrontendClient:
+    """
+    One dashboard connection: a bounded outbound queue drained by its own
+    writer task, so a slow client only ever delays itself.
 
-_frontend_clients: Set[WebSocket] = set()
+    Telemetry frames are coalesced per drone: if an older frame for the
+    same drone is still queued, it is replaced by the newer one (latest
+    value wins) instead of queueing both.
+    """
+
+    def __init__(self, ws: WebSocket, maxlen: int = FRONTEND_QUEUE_SIZE):
+        self.id = next(_ids)
+        self.ws = ws
+        self.maxlen = maxlen
+        # entries are (coalesce_key, data); data is None for coalesced
+        # entries, whose current value lives in self._latest[key].
+        # data is str (text frame) or bytes (binary frame)
+        self._queue: Deque[Tuple[Optional[Hashable], Optional[Union[str, bytes]]]] = deque()
+        self._latest: Dict[Hashable, Union[str, bytes]] = {}
+        self._wakeup = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+        self.sent = 0
+        self.dropped = 0     # discarded because the queue was full
+        self.coalesced = 0   # stale telemetry replaced by a newer frame
+        self.filtered = 0    # skipped by subscription / rate limit
+        self.closed = False
+        self.subscription: Optional[Subscription] = None
+        self._last_sent: Dict[Hashable, float] = {}
+        self._held: Dict[Hashable, "_Outgoing"] = {}
+        self._timers: Dict[Hashable, asyncio.TimerHandle] = {}
+
+    def subscribe(self, msg: Dict[str, Any]) -> Subscription:
+        self.subscription = Subscription(msg)
+        self._held.clear()
+        for h in self._timers.values():
+            h.cancel()
+        self._timers.clear()
+        return self.subscription
+
+    def deliver(self, out: "_Outgoing"):
+        """Apply this client's subscription to one broadcast and enqueue what it wants."""
+        sub = self.subscription
+        if sub is None:
+            self.offer(out.text, out.key)
+            return
+        if sub.drones is not None and out.drone_id is not None and str(out.drone_id) not in sub.drones:
+            self.filtered += 1
+            return
+        if out.category == "telemetry":
+            if "telemetry" in sub.types:
+                self._offer_limited(out, sub)
+                if sub.binary and out.failsafe_changed:
+                    # the binary frame only carries a failsafe flag
+                    self.offer(out.failsafe_text)
+                return
+            # telemetry not wanted: pass on only failsafe transitions (alerts
+            # reach these clients as incident messages)
+            if "failsafe" in sub.types and out.failsafe_changed:
+                self.offer(out.failsafe_text)
+            self.filtered += 1
+        elif out.category is None or out.category in sub.types:
+            self.offer(out.text)
+        else:
+            self.filtered += 1
+
+    def _encode(self, out: "_Outgoing") -> Union[str, bytes]:
+        return out.binary if self.subscription and self.subscription.binary else out.text
+
+    def _offer_limited(self, out: "_Outgoing", sub: Subscription):
+        key = out.key
+        if not sub.min_interval:
+            self.offer(self._encode(out), key)
+            return
+        now = time.monotonic()
+        wait = self._last_sent.get(key, 0.0) + sub.min_interval - now
+        if wait <= 0:
+            self._last_sent[key] = now
+            self.offer(self._encode(out), key)
+            return
+        # held frames are only encoded if they are eventually sent
+        if not sub.latest or key in self._held:
+            self.filtered += 1
+        if not sub.latest:
+            return
+        self._held[key] = out
+        if key not in self._timers:
+            self._timers[key] = asyncio.get_running_loop().call_later(wait, self._release, key)
+
+    def _release(self, key: Hashable):
+        self._timers.pop(key, None)
+        out = self._held.pop(key, None)
+        if out is not None and not self.closed:
+            self._last_sent[key] = time.monotonic()
+            self.offer(self._encode(out), key)
+
+    def offer(self, text: Union[str, bytes], key: Optional[Hashable] = None):
+        if self.closed:
+            return
+        if key is not None:
+            if key in self._latest:
+                self._latest[key] = text
+                self.coalesced += 1
+                return
+            self._latest[key] = text
+            text = None
+        if len(self._queue) >= self.maxlen:
+            old_key, _ = self._queue.popleft()
+            if old_key is not None:
+                self._latest.pop(old_key, None)
+            self.dropped += 1
+        self._queue.append((key, text))
+        self._wakeup.set()
+
+    async def run(self):
+        try:
+            while True:
+                while not self._queue:
+                    self._wakeup.clear()
+                    await self._wakeup.wait()
+                key, text = self._queue.popleft()
+                if key is not None:
+                    text = self._latest.pop(key)
+                if isinstance(text, bytes):
+                    await self.ws.send_bytes(text)
+                else:
+                    await self.ws.send_text(text)
+                self.sent += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            log.debug("frontend.send_error", client=self.id, error=repr(e))
+        finally:
+            self.close()
+
+    def close(self):
+        self.closed = True
+        for h in self._timers.values():
+            h.cancel()
+        self._timers.clear()
+        _remove(self)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"id": self.id, "queue_depth": len(self._queue), "sent": self.sent,
+                "dropped": self.dropped, "coalesced": self.coalesced, "filtered": self.filtered,
+                "subscription": self.subscription.describe() if self.subscription else None}
+
+
+# Copy-on-write snapshot: broadcasts iterate the current tuple without a
+# lock; connect/disconnect replace it. Everything runs on the event loop.
+_frontend_clients: Tuple[FrontendClient, ...] = ()
 _lock = asyncio.Lock()
 
+def _add(client: FrontendClient):
+    global _frontend_clients
+    _frontend_clients = _frontend_clients + (client,)
+
+def _remove(client: FrontendClient):
+    global _frontend_clients
+    if client in _frontend_clients:
+        _frontend_clients = tuple(c for c in _frontend_clients if c is not client)
+
+def client_count() -> int:
+    return len(_frontend_clients)
+
+def frontend_stats() -> List[Dict[str, Any]]:
+    return [c.stats() for c in _frontend_clients]
+
+def _queue_depths() -> List[Tuple[Dict[str, str], int]]:
+    depths = [len(c._queue) for c in _frontend_clients]
+    return [({"agg": "sum"}, sum(depths)), ({"agg": "max"}, max(depths, default=0))]
+
+metrics.registry.gauge("droneguard_frontend_clients", "Connected /ws/frontend clients", client_count)
+metrics.registry.gauge("droneguard_frontend_queue_depth", "Frames queued for /ws/frontend clients", _queue_depths)
+metrics.registry.gauge("droneguard_frontend_dropped", "Frames dropped on full queues (connected clients)",
+                       lambda: sum(c.dropped for c in _frontend_clients))
+
+@router.get("/frontend/stats")
+def get_frontend_stats():
+    return {"status": "ok", "clients": frontend_stats()}
+
 @router.websocket("/ws/frontend")
 async def websocket_frontend_endpoint(ws: WebSocket):
     await ws.accept()
+    client = FrontendClient(ws)
+    client.task = asyncio.create_task(client.run())
     async with _lock:
-        _frontend_clients.add(ws)
+        _add(client)
+    log.info("frontend.connect", client=client.id)
     try:
-        # keep connection open; frontend doesn't have to send messages
+        # keep connection open; frontend doesn't have to send messages,
+        # but may send {"type": "subscribe", ...} at any time
         while True:
-            # simply await receive_text to detect disconnects or ping messages
             try:
-                await ws.receive_text()
+                text = await ws.receive_text()
             except Exception:
                 break
+            try:
+                msg = json.loads(text)
+            except Exception:
+                continue  # ping / free text
+            if isinstance(msg, dict) and msg.get("type") == "subscribe":
+                sub = client.subscribe(msg)
+                log.debug("frontend.subscribe", client=client.id, **sub.describe())
+                client.offer(json.dumps({"type": "subscribed", "subscription": sub.describe()}))
     except WebSocketDisconnect:
         pass
     finally:
+        client.task.cancel()
         async with _lock:
-            _frontend_clients.discard(ws)
+            client.close()
+        log.info("frontend.disconnect", client=client.id, sent=client.sent, dropped=client.dropped)
 
 async def broadcast_to_frontend(message: Dict[str, Any]):
     """
-    Broadcast a JSON-able object to all connected frontends.
-    Will ignore send errors and cleanup dead sockets.
+    Broadcast a JSON-able object to all connected frontends, and with a
+    shared backend to the frontends of every other worker.
+    Filters per client subscription, encodes each variant at most once and
+    enqueues; never waits on a socket.
     """
-    text = None
-    try:
-        text = json.dumps(message)
-    except Exception:
-        text = str(message)
-    dead = []
-    async with _lock:
-        clients = list(_frontend_clients)
+    clients = _frontend_clients
+    if not clients and not backend.shared:
+        return
+    if not isinstance(message, dict):
+        message = {"type": None, "payload": str(message)}
+    out = _Outgoing(message)
+    if backend.shared:
+        backend.publish(BROADCAST_CHANNEL, out.text.encode())
     for client in clients:
-        try:
-            await client.send_text(text)
-        except Exception:
-            dead.append(client)
-    if dead:
-        async with _lock:
-            for d in dead:
-                _frontend_clients.discard(d)
+        client.deliver(out)
+
+def deliver_remote(message: Dict[str, Any], text: str):
+    """A broadcast from another worker: deliver to our clients, reusing its JSON text."""
+    clients = _frontend_clients
+    if not clients:
+        return
+    out = _Outgoing(message)
+    out._text = text
+    for client in clients:
+        client.deliver(out)
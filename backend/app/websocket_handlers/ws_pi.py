@@ -1,107 +1,371 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+import asyncio
 import json
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
-from ..state.telemetry_buffer import add as add_telemetry, get_buffer
-from ..detectors.physics_check import detect_physics
-from ..detectors.gps_spoof import detect_gps_spoof
-from ..detectors.imu_consistency import detect_imu
-from ..detectors.heading_mismatch import detect_heading
-
-from app.failsafe.failsafe_engine import FailsafeEngine
-from ..state.failsafe_state import get_state as get_failsafe_state
+from ..state.drone_sessions import DroneSession, DEFAULT_DRONE_ID, get_session, on_session_removed
+from ..state.incidents import Event, Incident, UPDATE, CLOSE
 
 from .ws_frontend import broadcast_to_frontend
-from app.security.signature_verify import verify_signature
+from .pi_push import StatePusher
+from ..config import PI_INGEST_QUEUE
+from .. import wire
+from ..recorder import recorder
+from ..state.history_store import history_store
+from .. import metrics
+from ..metrics import now_ns
+from ..log import get_logger
+from app.security.verify_pool import verify_pool
+from app.security.signature_verify import split_raw_frame
 
 router = APIRouter()
+log = get_logger("ws_pi")
 
-DETECTORS = [detect_physics, detect_gps_spoof, detect_imu, detect_heading]
+# per-connection ingest queues, for the queue-depth gauge
+_ingest_queues = set()
 
-# ------------------------------
-# Initialize new failsafe engine
-# ------------------------------
-failsafe_engine = FailsafeEngine()
+# histogram / counter per detector and alert type, created on first use
+_detector_timers: Dict[str, metrics.Histogram] = {}
+_alert_counters: Dict[str, metrics.Counter] = {}
 
+def _detector_timer(det) -> metrics.Histogram:
+    timer = _detector_timers.get(det.type)
+    if timer is None:
+        timer = _detector_timers[det.type] = metrics.detector_time(det.type)
+    return timer
 
-@router.websocket("/ws/pi")
-async def ws_pi(websocket: WebSocket):
-    await websocket.accept()
+def _count_alerts(alerts: List[Dict]):
+    for a in alerts:
+        kind = a.get("type", "UNKNOWN")
+        counter = _alert_counters.get(kind)
+        if counter is None:
+            counter = _alert_counters[kind] = metrics.alerts_counter(kind)
+        counter.inc()
+
+metrics.registry.gauge("droneguard_pi_ingest_queue_depth", "Packets waiting in /ws/pi ingest queues",
+                       lambda: sum(q.qsize() for q in _ingest_queues))
+metrics.registry.gauge("droneguard_verify_queue_depth", "Verifications waiting for a worker",
+                       lambda: verify_pool.queued)
+
+
+def drone_id_from_hello(pkt: Dict) -> str:
+    """Handshake is {"hello": "drone_pi", "drone_id": "..."}; drone_id is optional."""
+    drone_id = pkt.get("drone_id") or pkt.get("hello")
+    return str(drone_id) if drone_id else DEFAULT_DRONE_ID
+
+
+def run_detectors(session: DroneSession, pkt: Dict) -> List[Dict]:
+    """Feed one packet to the session's detectors; return the anomalies."""
+    alerts = []
+    for det in session.detectors:
+        t0 = now_ns()
+        try:
+            res = det.update(pkt)
+            if res and res.get("anomaly"):
+                alerts.append(res)
+        except Exception as e:
+            log.warning("detector.error", drone_id=session.drone_id, detector=det.type, error=repr(e))
+            continue  # Do not break other detectors
+        finally:
+            _detector_timer(det).since(t0)
+    if alerts:
+        _count_alerts(alerts)
+    return alerts
+
+
+def track_incidents(session: DroneSession, pkt: Dict, alerts: List[Dict]) -> List[Event]:
+    """Fold this packet's alerts into the session's incidents; return the transitions."""
+    t = pkt.get("time")
+    if not isinstance(t, (int, float)):
+        t = session.last_seen
+    t0 = now_ns()
+    events = session.incidents.update(alerts, t)
+    metrics.incidents_time.since(t0)
+    for event, incident in events:
+        metrics.incident_events[event].inc()
+        if event != UPDATE:
+            log.info(f"incident.{event}", drone_id=session.drone_id, incident=incident.id,
+                     attack_type=incident.type, count=incident.count)
+    return events
+
+
+def apply_failsafe(session: DroneSession, events: List[Event]) -> Dict:
+    """
+    Hand the session's failsafe engine every incident that opened or is
+    still going (its debounce counts from the incident's first anomaly);
+    return the failsafe state.  Packets without incident transitions never
+    reach the engine.
+    """
+    detections = [{
+        "attack_detected": True,
+        "attack_type": incident.type,
+        "severity": incident.severity,
+        "since": incident.first_seen,
+        "time": incident.last_seen,
+    } for event, incident in events if event != CLOSE]
+    if detections:
+        t0 = now_ns()
+        session.engine.process_detections(detections)
+        metrics.failsafe_time.since(t0)
+
+    # Get failsafe state for frontend
+    return session.failsafe.get_state()
+
+
+def process_packet(session: DroneSession, pkt: Dict) -> Tuple[List[Dict], List[Event], Dict]:
+    """
+    Store a verified packet in the drone's session, run detectors, update
+    incidents and run the session's failsafe engine on incident transitions.
+    Returns (alerts, incident_events, failsafe_state).
+    """
+    # Store telemetry (for export/queries only; detectors keep their own state)
+    t0 = now_ns()
+    session.buffer.add(pkt)
+    session.history.append(session.buffer.previous())
+    metrics.buffer_add_time.since(t0)
+    alerts = run_detectors(session, pkt)
+    events = track_incidents(session, pkt, alerts)
+    return alerts, events, apply_failsafe(session, events)
 
+
+def telemetry_message(session: DroneSession, pkt: Dict, alerts: List[Dict], failsafe_state: Dict) -> Dict:
+    return {
+        "type": "telemetry",
+        "drone_id": session.drone_id,
+        "payload": pkt,
+        "verified": True,
+        "alerts": alerts,
+        "failsafe": failsafe_state
+    }
+
+
+def incident_message(event: str, incident: Incident) -> Dict:
+    return {
+        "type": "incident",
+        "drone_id": incident.drone_id,
+        "event": event,
+        "payload": incident.to_dict()
+    }
+
+
+def signature_fail_message(session: DroneSession, pkt: Dict) -> Dict:
+    return {
+        "type": "signature_fail",
+        "drone_id": session.drone_id,
+        "reason": "Invalid signature — telemetry rejected",
+        "raw": pkt
+    }
+
+
+def parse_frame(data: Union[str, bytes]) -> Optional[Tuple[Dict, Any]]:
+    """
+    Decode one /ws/pi frame. Returns (pkt, verify_item) for telemetry, where
+    verify_item is what VerifyPool.submit takes; (pkt, None) for a hello;
+    None for anything we drop.
+    """
+    # Binary telemetry frame (negotiated in the handshake)
+    if isinstance(data, (bytes, bytearray)):
+        decoded = wire.decode_pi_frame(bytes(data))
+        if decoded is None:
+            return None
+        pkt, record, signature = decoded
+        return pkt, (record, signature)
+
+    # Signed raw envelope: verify the received bytes, parse once
+    signed = split_raw_frame(data)
+    body = signed[0] if signed else data
+
+    # Parse incoming JSON
     try:
-        while True:
-            raw = await websocket.receive_text()
+        message = json.loads(body)
+    except Exception:
+        return None
+
+    pkt = message.get("payload") if isinstance(message, dict) else None
+    if not pkt or not isinstance(pkt, dict):
+        return None
+    if "hello" in pkt:
+        return pkt, None
+    # Legacy packets carry "signature" inside the payload and are
+    # re-canonicalised by verify_signature.
+    return pkt, signed if signed else pkt
 
-            # Parse incoming JSON
-            try:
-                message = json.loads(raw)
-            except Exception:
-                continue
 
-            pkt = message.get("payload") if isinstance(message, dict) else None
-            if not pkt or not isinstance(pkt, dict):
+# last failsafe state written to the flight recorder, per drone
+_recorded_failsafe: Dict[str, Tuple] = {}
+on_session_removed(lambda session: _recorded_failsafe.pop(session.drone_id, None))
+
+def _record(session: DroneSession, pkt: Dict, alerts: List[Dict], failsafe_state: Dict):
+    """
+    Queue a verified packet, its alerts and any failsafe transition for the
+    flight recorder, and the sample for the history store (whichever is enabled).
+    """
+    if history_store.enabled:
+        history_store.record(session.drone_id, session.buffer.previous(), pkt.get("source"), alerts)
+    if not recorder.enabled:
+        return
+    now = session.last_seen
+    recorder.record_telemetry(session.drone_id, pkt, now)
+    if alerts:
+        recorder.record_alerts(session.drone_id, alerts, now)
+    sig = (failsafe_state.get("active"), failsafe_state.get("reason"), failsafe_state.get("auto_mode"))
+    if _recorded_failsafe.get(session.drone_id) != sig:
+        _recorded_failsafe[session.drone_id] = sig
+        recorder.record_failsafe(session.drone_id, failsafe_state, now)
+
+
+async def _consume(queue: asyncio.Queue, session: DroneSession,
+                   on_hello: Optional[Callable[[DroneSession, Dict], None]] = None,
+                   lookup: Callable[[str], DroneSession] = get_session):
+    """
+    Handle queued packets strictly in arrival order. Verifications for later
+    packets may already be running in the pool; we only await them in turn.
+    ``lookup`` maps a hello's drone ID to its session (replay keeps its own).
+    """
+    session.connections += 1
+    try:
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            pkt, verified = item
+
+            # Handshake: bind this connection to the drone's own session
+            if verified is None:
+                session.connections -= 1
+                session = lookup(drone_id_from_hello(pkt))
+                session.connections += 1
+                log.info("pi.hello", drone_id=session.drone_id, push=bool(pkt.get("push")),
+                         encoding=pkt.get("encoding", wire.ENCODING_JSON))
+                if on_hello is not None:
+                    on_hello(session, pkt)
                 continue
 
             # ----------------------------------------
             # SIGNATURE VERIFICATION (security feature)
             # ----------------------------------------
-            if not verify_signature(pkt):
-                await broadcast_to_frontend({
-                    "type": "signature_fail",
-                    "reason": "Invalid signature — telemetry rejected",
-                    "raw": pkt
-                })
+            t0 = now_ns()
+            ok = await verified
+            metrics.verify_wait_time.since(t0)
+            if not ok:
+                metrics.packets_rejected.inc()
+                log.warning("pi.signature_rejected", drone_id=session.drone_id)
+                await broadcast_to_frontend(signature_fail_message(session, pkt))
+                continue
+
+            metrics.packets_verified.inc()
+            session.last_seen = time.time()
+            try:
+                alerts, events, failsafe_state = process_packet(session, pkt)
+                if recorder.enabled or history_store.enabled:
+                    t0 = now_ns()
+                    _record(session, pkt, alerts, failsafe_state)
+                    metrics.record_time.since(t0)
+
+                # ---------------------------------------------------------
+                # SEND TELEMETRY + INCIDENTS + FAILSAFE STATE TO FRONTEND
+                # ---------------------------------------------------------
+                t0 = now_ns()
+                await broadcast_to_frontend(telemetry_message(session, pkt, alerts, failsafe_state))
+                for event, incident in events:
+                    await broadcast_to_frontend(incident_message(event, incident))
+                metrics.broadcast_time.since(t0)
+            except Exception:
+                # one bad packet must not end the consumer (and stall the connection)
+                log.exception("pi.packet_error", drone_id=session.drone_id)
+    finally:
+        session.connections -= 1
+        # last connection gone: nothing will close its incidents any more
+        if session.connections == 0:
+            log.info("pi.disconnect", drone_id=session.drone_id)
+            for event, incident in session.incidents.close_all():
+                metrics.incident_events[event].inc()
+                log.info("incident.close", drone_id=session.drone_id, incident=incident.id,
+                         attack_type=incident.type, count=incident.count)
+                await broadcast_to_frontend(incident_message(event, incident))
+
+
+async def _enqueue(queue: asyncio.Queue, item, consumer: asyncio.Task) -> bool:
+    """
+    queue.put() that gives up if the consumer has ended: a full queue would
+    otherwise block forever and the socket would never be read again.
+    """
+    if not queue.full():
+        queue.put_nowait(item)
+        return True
+    put = asyncio.ensure_future(queue.put(item))
+    await asyncio.wait((put, consumer), return_when=asyncio.FIRST_COMPLETED)
+    if put.done():
+        return True
+    put.cancel()
+    return False
+
+
+@router.websocket("/ws/pi")
+async def ws_pi(websocket: WebSocket):
+    await websocket.accept()
+
+    # until a handshake names the drone, packets go to the default session
+    queue: asyncio.Queue = asyncio.Queue(maxsize=PI_INGEST_QUEUE)
+    pusher: Optional[StatePusher] = None
+
+    def on_hello(session: DroneSession, pkt: Dict):
+        # drones that ask for it get attack/failsafe state pushed on change
+        nonlocal pusher
+        if pkt.get("push"):
+            if pusher is None:
+                pusher = StatePusher(websocket)
+            pusher.bind(session)
+
+    consumer = asyncio.create_task(_consume(queue, get_session(DEFAULT_DRONE_ID), on_hello))
+    _ingest_queues.add(queue)
+
+    try:
+        while not consumer.done():
+            frame = await websocket.receive()
+            if frame["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(frame.get("code", 1000))
+
+            data = frame.get("bytes")
+            if data is None:
+                data = frame.get("text")
+                if data is None:
+                    continue
+
+            t0 = now_ns()
+            parsed = parse_frame(data)
+            metrics.parse_time.since(t0)
+            if parsed is None:
+                metrics.packets_dropped.inc()
                 continue
+            pkt, item = parsed
 
-            # Store telemetry
-            add_telemetry(pkt)
-            buf = get_buffer()
-
-            # ---------------------------------------------------------
-            # RUN DETECTORS → produce list of alerts (same as before)
-            # ---------------------------------------------------------
-            alerts = []
-            for det in DETECTORS:
-                try:
-                    res = det(pkt, buf)
-                    if res and res.get("anomaly"):
-                        alerts.append(res)
-                except Exception:
-                    continue  # Do not break other detectors
-
-            # ---------------------------------------------------------
-            # CONVERT alerts[] → single detection object for failsafe
-            # ---------------------------------------------------------
-            if alerts:
-                # Just use the FIRST anomaly (you can combine if needed)
-                primary = alerts[0]
-                detection = {
-                    "attack_detected": True,
-                    "attack_type": primary.get("type", "UNKNOWN"),
-                    "severity": primary.get("severity", "low"),
-                }
-            else:
-                detection = {"attack_detected": False}
-
-            # --------------------------------------------
-            # 💥 NEW FAILSAFE ENGINE LOGIC (AUTO/OFF mode)
-            # --------------------------------------------
-            failsafe_engine.process_detection(detection)
-
-            # Get failsafe state for frontend
-            failsafe_state = get_failsafe_state()
-
-            # ---------------------------------------------------------
-            # SEND TELEMETRY + ALERTS + FAILSAFE STATE TO FRONTEND
-            # ---------------------------------------------------------
-            await broadcast_to_frontend({
-                "type": "telemetry",
-                "payload": pkt,
-                "verified": True,
-                "alerts": alerts,
-                "failsafe": failsafe_state
-            })
+            if item is None:
+                # drones that ask for an encoding get an answer; binary is
+                # the only alternative to JSON we speak
+                if "encoding" in pkt:
+                    encoding = wire.ENCODING_BINARY if pkt["encoding"] == wire.ENCODING_BINARY else wire.ENCODING_JSON
+                    await websocket.send_text(json.dumps({"type": "hello_ack", "encoding": encoding}))
+                if not await _enqueue(queue, (pkt, None), consumer):
+                    break
+                continue
+
+            # start verifying now (off-loop); a full queue applies backpressure
+            if not await _enqueue(queue, (pkt, verify_pool.submit(item)), consumer):
+                break
 
     except WebSocketDisconnect:
-        return
+        pass
     except Exception:
-        return
+        log.exception("pi.connection_error")
+    finally:
+        _ingest_queues.discard(queue)
+        # let already-received packets finish in order
+        await _enqueue(queue, None, consumer)
+        try:
+            await consumer
+        except Exception:
+            log.exception("pi.consumer_error")
+        if pusher is not None:
+            pusher.close()
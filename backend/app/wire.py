@@ -0,0 +1,104 @@
+# app/wire.py
+"""
+Binary telemetry encoding for /ws/pi and /ws/frontend (JSON stays the default).
+
+Telemetry record, little-endian, 57 bytes:
+    time f64, gps_lat f64, gps_lon f64,
+    alt, vx, vy, speed, yaw, roll, pitch, battery  f32 each,
+    source u8 (index into SOURCES, 255 = other)
+Missing values are sent as NaN and decoded back to None.
+
+Drone -> backend (binary websocket frame):
+    b"DGB1" | sig_len u16 | signature | record
+The signature (PKCS#1 v1.5 / SHA-256) covers the record bytes exactly.
+
+Backend -> frontend (binary websocket frame, only for clients that
+subscribed with "encoding": "binary"):
+    b"DGF1" | flags u8 | alert_count u8 | id_len u8 | drone_id utf-8 | record
+flags: bit0 verified, bit1 failsafe active. Alerts and failsafe changes
+are still sent as JSON text messages.
+
+Keep in sync with DronePi/drone.py and dashboard-frontend/src/utils/wire.js.
+"""
+import math
+import struct
+from typing import Dict, Optional, Tuple
+
+RECORD = struct.Struct("<dddffffffffB")
+RECORD_FIELDS = ("time", "gps_lat", "gps_lon", "alt", "vx", "vy", "speed", "yaw", "roll", "pitch", "battery")
+SOURCES = ("normal", "injected", "failsafe")
+_SOURCE_CODE = {name: i for i, name in enumerate(SOURCES)}
+SOURCE_OTHER = 255
+
+PI_MAGIC = b"DGB1"
+FRONTEND_MAGIC = b"DGF1"
+_U16 = struct.Struct("<H")
+_FRONTEND_HEAD = struct.Struct("<4sBBB")
+
+ENCODING_JSON = "json"
+ENCODING_BINARY = "binary"
+
+NAN = float("nan")
+
+
+def _num(value) -> float:
+    if value is None:
+        return NAN
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return NAN
+
+
+def encode_record(pkt: Dict) -> bytes:
+    return RECORD.pack(*[_num(pkt.get(name)) for name in RECORD_FIELDS],
+                       _SOURCE_CODE.get(pkt.get("source"), SOURCE_OTHER))
+
+
+def decode_record(data, offset: int = 0) -> Dict:
+    values = RECORD.unpack_from(data, offset)
+    pkt = {name: (None if math.isnan(v) else v) for name, v in zip(RECORD_FIELDS, values)}
+    code = values[-1]
+    pkt["source"] = SOURCES[code] if code < len(SOURCES) else "other"
+    return pkt
+
+
+# ---- /ws/pi ----
+def encode_pi_frame(pkt: Dict, signature: bytes = b"") -> bytes:
+    return PI_MAGIC + _U16.pack(len(signature)) + signature + encode_record(pkt)
+
+
+def decode_pi_frame(data: bytes) -> Optional[Tuple[Dict, bytes, bytes]]:
+    """Return (pkt, signed_record_bytes, signature) or None if malformed."""
+    if len(data) < 6 or data[:4] != PI_MAGIC:
+        return None
+    (sig_len,) = _U16.unpack_from(data, 4)
+    start = 6 + sig_len
+    if len(data) != start + RECORD.size:
+        return None
+    record = data[start:]
+    return decode_record(record), record, data[6:start]
+
+
+# ---- /ws/frontend ----
+def encode_frontend_telemetry(drone_id, pkt: Dict, verified: bool = True,
+                              failsafe_active: bool = False, alert_count: int = 0) -> bytes:
+    ident = str(drone_id or "").encode()[:255]
+    flags = (1 if verified else 0) | (2 if failsafe_active else 0)
+    return (_FRONTEND_HEAD.pack(FRONTEND_MAGIC, flags, min(alert_count, 255), len(ident))
+            + ident + encode_record(pkt))
+
+
+def decode_frontend_telemetry(data: bytes) -> Optional[Dict]:
+    if len(data) < _FRONTEND_HEAD.size or data[:4] != FRONTEND_MAGIC:
+        return None
+    _, flags, alert_count, id_len = _FRONTEND_HEAD.unpack_from(data)
+    start = _FRONTEND_HEAD.size
+    return {
+        "type": "telemetry",
+        "drone_id": data[start:start + id_len].decode(),
+        "verified": bool(flags & 1),
+        "failsafe_active": bool(flags & 2),
+        "alert_count": alert_count,
+        "payload": decode_record(data, start + id_len),
+    }
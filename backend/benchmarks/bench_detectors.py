@@ -0,0 +1,120 @@
+# benchmarks/bench_detectors.py
+"""
+Scalar vs. batch detector throughput, with an exactness check.
+
+Builds a synthetic flight (smooth circuit plus injected GPS jumps, speed
+spikes, yaw jumps, heading offsets and missing fields), runs the four
+scalar detectors packet by packet and detectors.batch.detect_batch over the
+whole array, asserts both flag the same rows with the same alert types
+(detail values agree to ~1e-12 relative; NumPy's vectorized atan2/cos may
+differ from libm in the last ulp), and reports samples/s.
+
+Run from backend/:
+    python -m benchmarks.bench_detectors --samples 200000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from app.detectors.batch import detect_batch, columns_from_packets, alerts_at
+from app.detectors.physics_check import detect_physics
+from app.detectors.gps_spoof import detect_gps_spoof
+from app.detectors.imu_consistency import detect_imu
+from app.detectors.heading_mismatch import detect_heading
+from app.state.telemetry_buffer import FIELDS
+
+SCALAR = [detect_physics, detect_gps_spoof, detect_imu, detect_heading]
+
+
+def synthetic_flight(n: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    t = 1000.0 + 0.25 * np.arange(n)
+    theta = 2.0 * np.pi * np.arange(n) / 1024.0
+    r = 1024 * 0.75 / (2.0 * np.pi)
+    yaw = np.mod(np.degrees(theta) + 90.0, 360.0)
+    data = np.empty((n, len(FIELDS)))
+    cols = dict(
+        time=t,
+        gps_lat=12.9718 + r * np.cos(theta) / 111000.0,
+        gps_lon=77.6411 + r * np.sin(theta) / (111000.0 * np.cos(np.radians(12.9718))),
+        alt=np.full(n, 40.0), vx=3.0 * np.sin(np.radians(yaw)), vy=3.0 * np.cos(np.radians(yaw)),
+        speed=np.full(n, 3.0), yaw=yaw, roll=np.zeros(n), pitch=np.zeros(n), battery=np.ones(n),
+    )
+    for i, name in enumerate(FIELDS):
+        data[:, i] = cols[name]
+
+    def pick(frac):
+        return rng.random(n) < frac
+
+    j = pick(0.01)
+    data[j, 1] += rng.uniform(-5e-4, 5e-4, j.sum())
+    s = pick(0.01)
+    data[s, 4:7] *= rng.uniform(5, 30, (s.sum(), 1))
+    h = pick(0.01)
+    data[h, 7] = np.mod(data[h, 7] + rng.uniform(30, 180, h.sum()), 360.0)
+    m = pick(0.005)
+    data[m, rng.integers(0, len(FIELDS), m.sum())] = np.nan
+    return data
+
+
+def to_packets(data: np.ndarray):
+    return [{name: (None if np.isnan(v) else float(v)) for name, v in zip(FIELDS, row)} for row in data]
+
+
+def run_scalar(pkts):
+    out = []
+    prev = None
+    for pkt in pkts:
+        buf = [prev] if prev is not None else []
+        out.append([a for a in (det(pkt, buf) for det in SCALAR) if a.get("anomaly")])
+        prev = pkt
+    return out
+
+
+def same_alerts(a, b, rtol=1e-12) -> bool:
+    if [x["type"] for x in a] != [x["type"] for x in b]:
+        return False
+    for x, y in zip(a, b):
+        if x["detail"].keys() != y["detail"].keys():
+            return False
+        for k, v in x["detail"].items():
+            if not np.isclose(v, y["detail"][k], rtol=rtol, atol=0.0):
+                return False
+    return True
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--samples", type=int, default=200000)
+    ap.add_argument("--check", type=int, default=50000, help="rows compared against the scalar path")
+    args = ap.parse_args()
+
+    data = synthetic_flight(args.samples)
+    pkts = to_packets(data[:args.check])
+
+    t0 = time.perf_counter()
+    scalar_alerts = run_scalar(pkts)
+    scalar_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    packed = columns_from_packets(pkts)
+    pack_s = time.perf_counter() - t0
+    assert np.array_equal(packed, data[:args.check], equal_nan=True)
+
+    t0 = time.perf_counter()
+    result = detect_batch(data)
+    batch_s = time.perf_counter() - t0
+
+    mismatches = sum(1 for i in range(len(pkts)) if not same_alerts(alerts_at(result, i), scalar_alerts[i]))
+    flagged = int(result["anomaly"][:args.check].sum())
+    print(f"exactness: {mismatches} mismatching rows out of {len(pkts)} ({flagged} flagged)")
+    print(f"scalar : {len(pkts) / scalar_s:>14,.0f} samples/s")
+    print(f"batch  : {len(data) / batch_s:>14,.0f} samples/s  ({len(data)} samples)")
+    print(f"pack   : {len(pkts) / pack_s:>14,.0f} packets/s  (dict -> columns)")
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
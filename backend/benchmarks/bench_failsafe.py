@@ -0,0 +1,75 @@
+# benchmarks/bench_failsafe.py
+"""
+FailsafeEngine decisions per second.
+
+Cases:
+  - lookup     rule-table lookup only (alias + severity)
+  - manual     one detection, auto mode off (report only)
+  - held       one detection, auto mode on, failsafe already active for it:
+               the steady state during an attack
+  - held x4    all four detector types in one decision
+  - activate   one detection that activates the failsafe each time
+               (state reset in between; includes FailsafeState.activate)
+
+Run from backend/:
+    python -m benchmarks.bench_failsafe --decisions 200000
+"""
+import argparse
+import time
+
+from app import log
+from app.failsafe.failsafe_engine import FailsafeEngine
+from app.state.failsafe_state import FailsafeState
+
+DETECTOR_TYPES = ("IMPOSSIBLE_MOVEMENT", "GPS_SPOOF", "IMU_HEADING_MISMATCH", "YAW_JUMP")
+
+
+def detection(kind: str, t: float) -> dict:
+    return {"attack_detected": True, "attack_type": kind, "severity": "low", "since": t - 1.0, "time": t}
+
+
+def rate(fn, n: int) -> float:
+    t0 = time.perf_counter()
+    for i in range(n):
+        fn(i)
+    return n / (time.perf_counter() - t0)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--decisions", type=int, default=200000)
+    args = ap.parse_args()
+    n = args.decisions
+    log.set_level(log.ERROR)  # decisions only, not log output
+
+    manual = FailsafeEngine(FailsafeState())
+    held = FailsafeEngine(FailsafeState())
+    held.state.set_auto_mode(True)
+    one = [detection("IMPOSSIBLE_MOVEMENT", 1000.0)]
+    four = [detection(kind, 1000.0) for kind in DETECTOR_TYPES]
+    held.process_detections(four)  # activates IMU_EMERGENCY_LAND, the highest priority
+
+    fresh = FailsafeEngine(FailsafeState())
+    fresh.state.set_auto_mode(True)
+    fs = fresh.state._failsafe
+
+    def activate(i):
+        fs["active"] = False
+        fresh.process_detections(one)
+
+    rows = [
+        ("lookup", rate(lambda i: held.lookup("YAW_JUMP", "low"), n)),
+        ("manual", rate(lambda i: manual.process_detections(one), n)),
+        ("held", rate(lambda i: held.process_detections(one), n)),
+        ("held x4", rate(lambda i: held.process_detections(four), n)),
+        ("activate", rate(activate, n)),
+    ]
+    assert held.activations == 1 and fresh.activations == n
+
+    print(f"{'case':<10} {'decisions/s':>12} {'us/decision':>12}")
+    for name, r in rows:
+        print(f"{name:<10} {r:>12,.0f} {1e6 / r:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
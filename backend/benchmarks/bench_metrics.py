@@ -0,0 +1,98 @@
+# benchmarks/bench_metrics.py
+"""
+Cost of the /ws/pi stage instrumentation.
+
+  - record   : Histogram.observe_ns / since() per call
+  - packet   : ws_pi.process_packet (store + 4 detectors + incidents +
+               failsafe, i.e. 7 timers and the alert counters) with metrics on vs. with
+               the timers swapped for no-ops; the difference is the
+               per-packet overhead
+  - accuracy : HDR quantiles vs. exact quantiles on a lognormal sample
+
+Run from backend/:
+    python -m benchmarks.bench_metrics --packets 50000
+"""
+import argparse
+import random
+import time
+
+from app import metrics
+from app.metrics import Histogram
+from app.state.drone_sessions import get_session, clear_sessions
+from app.websocket_handlers import ws_pi
+from benchmarks.bench_sessions import make_packet
+
+
+class _NoTimer:
+    def since(self, t0):
+        pass
+
+    def observe_ns(self, v, n=1):
+        pass
+
+
+def bench_record(n: int) -> float:
+    """ns per Histogram.since() call, including its clock read."""
+    h = Histogram({})
+    now = metrics.now_ns
+    t0 = time.perf_counter()
+    for _ in range(n):
+        h.since(now())
+    return (time.perf_counter() - t0) / n * 1e9
+
+
+def bench_packets(n: int, drone_id: str) -> float:
+    clear_sessions()
+    session = get_session(drone_id)
+    pkts = [make_packet(i, 1000.0 + i * 0.25) for i in range(n)]
+    t0 = time.perf_counter()
+    for pkt in pkts:
+        ws_pi.process_packet(session, pkt)
+    return (time.perf_counter() - t0) / n * 1e6
+
+
+def run_without_metrics(n: int) -> float:
+    saved = (metrics.buffer_add_time, metrics.incidents_time, metrics.failsafe_time, ws_pi._detector_timer)
+    noop = _NoTimer()
+    metrics.buffer_add_time = metrics.incidents_time = metrics.failsafe_time = noop
+    ws_pi._detector_timer = lambda det: noop
+    try:
+        return bench_packets(n, "off")
+    finally:
+        metrics.buffer_add_time, metrics.incidents_time, metrics.failsafe_time, ws_pi._detector_timer = saved
+
+
+def accuracy(n: int):
+    h = Histogram({})
+    xs = sorted(int(random.lognormvariate(10, 1.5)) for _ in range(n))
+    for x in xs:
+        h.observe_ns(x)
+    for q in (0.5, 0.9, 0.99, 0.999):
+        exact = xs[min(n - 1, int(q * n))] / 1e9
+        approx = h.quantile(q)
+        print(f"  p{q * 100:g}: exact {exact * 1e6:10.2f} us  hdr {approx * 1e6:10.2f} us  "
+              f"err {abs(approx - exact) / exact * 100:5.1f}%")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--packets", type=int, default=50000)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+    random.seed(1)
+
+    print(f"histogram record: {bench_record(1_000_000):.0f} ns/call")
+    # alternate on/off runs so machine noise hits both alike; keep the best of each
+    on, off = float("inf"), float("inf")
+    for _ in range(args.repeat):
+        on = min(on, bench_packets(args.packets, "on"))
+        off = min(off, run_without_metrics(args.packets))
+    print(f"process_packet: {off:.2f} us without timers, {on:.2f} us with timers, "
+          f"overhead {on - off:.2f} us/packet")
+    print("quantile accuracy (lognormal, 100k samples):")
+    accuracy(100_000)
+    clear_sessions()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# benchmarks/bench_sessions.py
+"""
+Per-packet latency vs. number of concurrent drone sessions.
+
+Drives ws_pi.process_packet (store + detectors + incidents + failsafe, i.e.
+everything after signature verification) with packets interleaved
+round-robin across N drones, the way a fleet would arrive on /ws/pi.
+
+Run from backend/:
+    python -m benchmarks.bench_sessions
+    python -m benchmarks.bench_sessions --drones 1 10 100 500 --packets 50000
+"""
+import argparse
+import math
+import random
+import time
+
+from app.state.drone_sessions import get_session, clear_sessions
+from app.websocket_handlers.ws_pi import process_packet
+
+
+def make_packet(i: int, t: float) -> dict:
+    # closed circular track, 1024 steps of 0.75 m (3 m/s at 4 Hz)
+    theta = 2.0 * math.pi * (i % 1024) / 1024.0
+    r = 1024 * 0.75 / (2.0 * math.pi)
+    yaw = (math.degrees(theta) + 90.0) % 360.0
+    return {
+        "time": t,
+        "gps_lat": 12.9718 + r * math.cos(theta) / 111000.0,
+        "gps_lon": 77.6411 + r * math.sin(theta) / (111000.0 * math.cos(math.radians(12.9718))),
+        "alt": 40.0,
+        "vx": 3.0 * math.sin(math.radians(yaw)),
+        "vy": 3.0 * math.cos(math.radians(yaw)),
+        "speed": 3.0,
+        "yaw": yaw,
+        "roll": 0.0,
+        "pitch": 0.0,
+        "battery": 0.9,
+        "source": "normal",
+    }
+
+
+def run(n_drones: int, n_packets: int) -> dict:
+    clear_sessions()
+    ids = [f"drone-{i:04d}" for i in range(n_drones)]
+    for d in ids:
+        get_session(d)
+    seq = {d: 0 for d in ids}
+    order = [random.choice(ids) for _ in range(n_packets)]
+
+    samples = []
+    perf = time.perf_counter_ns
+    for drone_id in order:
+        k = seq[drone_id]
+        seq[drone_id] = k + 1
+        pkt = make_packet(k, 1000.0 + k * 0.25)
+        t0 = perf()
+        process_packet(get_session(drone_id), pkt)
+        samples.append(perf() - t0)
+    samples.sort()
+
+    def pct(p):
+        return samples[min(len(samples) - 1, int(p / 100.0 * len(samples)))] / 1000.0
+
+    return {"drones": n_drones, "mean_us": sum(samples) / len(samples) / 1000.0,
+            "p50_us": pct(50), "p99_us": pct(99)}
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--drones", type=int, nargs="+", default=[1, 10, 50, 100, 250, 500])
+    ap.add_argument("--packets", type=int, default=20000)
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args()
+    random.seed(args.seed)
+
+    print(f"{'drones':>7} {'mean_us':>9} {'p50_us':>9} {'p99_us':>9}")
+    for n in args.drones:
+        r = run(n, args.packets)
+        print(f"{r['drones']:>7} {r['mean_us']:>9.2f} {r['p50_us']:>9.2f} {r['p99_us']:>9.2f}")
+    clear_sessions()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# benchmarks/bench_verify.py
+"""
+RSA signature verification throughput.
+
+Signs packets with a throwaway 2048-bit key (same scheme as the drone:
+PKCS#1 v1.5 over SHA-256 of the sorted-keys JSON), then measures:
+  - inline   : verify_signature() called directly (what ws_pi used to do)
+  - raw      : DGS1 frame: verify_raw() over the received bytes + one json.loads
+  - pool     : VerifyPool with 1..N worker threads, all packets submitted at once
+
+Run from backend/:
+    python -m benchmarks.bench_verify --packets 5000 --workers 1 2 4
+"""
+import argparse
+import asyncio
+import base64
+import json
+import os
+import time
+
+from Crypto.Hash import SHA256
+from Crypto.PublicKey import RSA
+from Crypto.Signature import pkcs1_15
+
+from app.security import signature_verify
+from app.security.verify_pool import VerifyPool
+
+
+def raw_frames(key, pkts):
+    signer = pkcs1_15.new(key)
+    frames = []
+    for p in pkts:
+        body = json.dumps({"type": "telemetry", "payload": {k: v for k, v in p.items() if k != "signature"}})
+        sig = base64.b64encode(signer.sign(SHA256.new(body.encode()))).decode()
+        frames.append(f"{signature_verify.RAW_FRAME_PREFIX}{sig}:{body}")
+    return frames
+
+
+def signed_packets(key, n: int):
+    signer = pkcs1_15.new(key)
+    out = []
+    for i in range(n):
+        pkt = {"time": 1000.0 + i * 0.25, "gps_lat": 12.9718 + i * 1e-6, "gps_lon": 77.6411,
+               "alt": 40.0, "vx": 1.0, "vy": 2.0, "speed": 2.236, "yaw": 26.5,
+               "roll": 0.1, "pitch": -0.2, "battery": 0.9, "source": "normal"}
+        digest = SHA256.new(json.dumps(pkt, sort_keys=True).encode())
+        pkt["signature"] = base64.b64encode(signer.sign(digest)).decode()
+        out.append(pkt)
+    return out
+
+
+async def run_pool(pkts, workers: int, max_batch: int) -> float:
+    pool = VerifyPool(workers=workers, max_batch=max_batch)
+    t0 = time.perf_counter()
+    results = await asyncio.gather(*(pool.submit(p) for p in pkts))
+    elapsed = time.perf_counter() - t0
+    pool.shutdown()
+    assert all(results)
+    return elapsed
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--packets", type=int, default=5000)
+    ap.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    ap.add_argument("--max-batch", type=int, default=32)
+    args = ap.parse_args()
+
+    key = RSA.generate(2048)
+    signature_verify.set_public_key(key.publickey())
+    pkts = signed_packets(key, args.packets)
+    cores = os.cpu_count() or 1
+
+    t0 = time.perf_counter()
+    assert all(signature_verify.verify_signature(p) for p in pkts)
+    inline = args.packets / (time.perf_counter() - t0)
+    print(f"cores={cores}")
+    print(f"{'mode':<12} {'verifies/s':>12} {'per core':>10}")
+    print(f"{'inline':<12} {inline:>12,.0f} {inline:>10,.0f}")
+
+    frames = raw_frames(key, pkts)
+    t0 = time.perf_counter()
+    for f in frames:
+        data, sig = signature_verify.split_raw_frame(f)
+        assert signature_verify.verify_raw(data, sig)
+        json.loads(data)
+    raw = args.packets / (time.perf_counter() - t0)
+    print(f"{'raw':<12} {raw:>12,.0f} {raw:>10,.0f}")
+    for w in args.workers:
+        rate = args.packets / asyncio.run(run_pool(pkts, w, args.max_batch))
+        print(f"{'pool x' + str(w):<12} {rate:>12,.0f} {rate / min(w, cores):>10,.0f}")
+
+
+if __name__ == "__main__":
+    main()
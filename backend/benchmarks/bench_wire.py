@@ -0,0 +1,102 @@
+# benchmarks/bench_wire.py
+"""
+JSON vs. binary (app/wire.py) telemetry encoding.
+
+Measures serialize / parse cost per packet and bytes on the wire for the
+/ws/pi envelope and the /ws/frontend telemetry message (signatures
+excluded; both encodings carry the same 256-byte RSA-2048 signature,
+base64 in JSON, raw in binary).
+
+DronePi/drone.py is standalone and keeps its own copy of the record
+layout, so before timing anything this checks that drone.encode_binary()
+frames are byte-identical to app.wire's and decode back to the packet.
+
+Run from backend/:
+    python -m benchmarks.bench_wire --packets 100000
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import time
+
+from app import wire
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                                "DronePi"))
+import drone  # noqa: E402
+
+
+def sample_packets(n: int):
+    return [{"time": 1700000000.0 + i * 0.25, "gps_lat": 12.9718915 + i * 1e-7, "gps_lon": 77.6411545 - i * 1e-7,
+             "alt": 40.0, "vx": 1.2345678, "vy": -2.3456789, "speed": 2.6503, "yaw": 152.25,
+             "roll": 3.21, "pitch": -1.07, "battery": 0.987654, "source": "normal"} for i in range(n)]
+
+
+class _FixedSigner:
+    def sign_bytes(self, data: bytes) -> bytes:
+        return b"\x5a" * 256
+
+
+def check_drone_encoder(pkts):
+    """Raise AssertionError if drone.py's binary frames drift from app.wire."""
+    assert drone.BINARY_MAGIC == wire.PI_MAGIC
+    assert drone.BINARY_RECORD.format == wire.RECORD.format
+    assert drone.BINARY_FIELDS == wire.RECORD_FIELDS
+    assert drone.BINARY_SOURCES == {name: i for i, name in enumerate(wire.SOURCES)}
+    variants = [dict(p, source=s) for p in pkts[:4] for s in wire.SOURCES + ("other",)]
+    variants.append(dict(pkts[0], battery=None, yaw=None))
+    for pkt in variants:
+        assert drone.encode_binary(pkt, None) == wire.encode_pi_frame(pkt), pkt
+        decoded, record, sig = wire.decode_pi_frame(drone.encode_binary(pkt, _FixedSigner()))
+        assert sig == _FixedSigner().sign_bytes(record)
+        assert decoded["source"] == pkt["source"]
+        for name in wire.RECORD_FIELDS:
+            want, got = pkt.get(name), decoded[name]
+            assert (got is None) if want is None else math.isclose(got, want, rel_tol=1e-6), (name, want, got)
+
+
+def timed(fn, items) -> float:
+    t0 = time.perf_counter()
+    for it in items:
+        fn(it)
+    return (time.perf_counter() - t0) / len(items) * 1e6
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--packets", type=int, default=100000)
+    args = ap.parse_args()
+    pkts = sample_packets(args.packets)
+    check_drone_encoder(pkts)
+
+    # /ws/pi
+    json_frames = [json.dumps({"type": "telemetry", "payload": p, "injection_detail": None}) for p in pkts]
+    bin_frames = [wire.encode_pi_frame(p) for p in pkts]
+    rows = [
+        ("pi json", timed(lambda p: json.dumps({"type": "telemetry", "payload": p, "injection_detail": None}), pkts),
+         timed(json.loads, json_frames), sum(len(f.encode()) for f in json_frames) / len(pkts)),
+        ("pi binary", timed(wire.encode_pi_frame, pkts),
+         timed(wire.decode_pi_frame, bin_frames), sum(map(len, bin_frames)) / len(pkts)),
+    ]
+
+    # /ws/frontend
+    msgs = [{"type": "telemetry", "drone_id": "drone_pi", "payload": p, "verified": True, "alerts": [],
+             "failsafe": {"active": False, "activated_at": None, "reason": None, "auto_mode": False}} for p in pkts]
+    fe_json = [json.dumps(m) for m in msgs]
+    fe_bin = [wire.encode_frontend_telemetry("drone_pi", p) for p in pkts]
+    rows += [
+        ("frontend json", timed(json.dumps, msgs), timed(json.loads, fe_json),
+         sum(len(f.encode()) for f in fe_json) / len(pkts)),
+        ("frontend binary", timed(lambda p: wire.encode_frontend_telemetry("drone_pi", p), pkts),
+         timed(wire.decode_frontend_telemetry, fe_bin), sum(map(len, fe_bin)) / len(pkts)),
+    ]
+
+    print(f"{'encoding':<16} {'encode_us':>10} {'decode_us':>10} {'bytes':>7}")
+    for name, enc, dec, size in rows:
+        print(f"{name:<16} {enc:>10.2f} {dec:>10.2f} {size:>7.0f}")
+
+
+if __name__ == "__main__":
+    main()
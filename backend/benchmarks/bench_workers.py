@@ -0,0 +1,161 @@
+# benchmarks/bench_workers.py
+"""
+End-to-end throughput with 1..N uvicorn workers sharing state.
+
+For each worker count this starts
+    uvicorn app.main:app --workers N
+with DRONEGUARD_STATE_URL pointing at a resp_server started for the run,
+then drives it with the fleet simulator (DronePi/drone.py --fleet), whose
+/ws/frontend observers land on arbitrary workers.  Reported per run:
+  - packets/s   telemetry the fleet got through
+  - echoed      share of sent packets that came back on an observer's
+                /ws/frontend; ~100% only if every worker's broadcasts reach
+                every other worker's dashboards (--no-shared shows ~1/N)
+  - p50 / p99   end-to-end latency of the echoed packets
+
+A throwaway RSA key pair is generated in a temp dir, which is also the
+server's working directory (public.pem is read from there).  Scaling is
+bounded by the cores on the machine: the fleet processes, resp_server and
+the workers all compete for them.
+
+Run from backend/:
+    python -m benchmarks.bench_workers --workers 1 2 4 --fleet 200 --procs 2 --duration 15
+"""
+import argparse
+import os
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+from Crypto.PublicKey import RSA
+
+from app.shared.resp import encode_command
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DRONE = os.path.join(os.path.dirname(BACKEND), "DronePi", "drone.py")
+
+SENT_RE = re.compile(r"sent (\d+) packets in ([\d.]+) s -> (\d+) packets/s")
+LAT_RE = re.compile(r"latency over (\d+) echoed packets \(ms\): p50 ([\d.]+)\s+p90 ([\d.]+)\s+p99 ([\d.]+)")
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_ready(url: str, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1.0):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"server not ready: {url}")
+
+
+def flush(state_url: str):
+    """Forget the previous run's drones."""
+    host, port = state_url[len("redis://"):].split(":")
+    with socket.create_connection((host, int(port)), timeout=5.0) as s:
+        s.sendall(encode_command("FLUSHALL"))
+        s.recv(16)
+
+
+def wait_port(port: int, timeout: float = 10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1.0).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"nothing listening on port {port}")
+
+
+def stop(proc: subprocess.Popen):
+    proc.terminate()
+    try:
+        proc.wait(10)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+
+
+def run(workers: int, state_url, args, workdir: str, env: dict) -> dict:
+    port = free_port()
+    server_env = dict(env, DRONEGUARD_LOG_LEVEL="WARNING")
+    if state_url:
+        server_env["DRONEGUARD_STATE_URL"] = state_url
+        flush(state_url)
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=workdir, env=server_env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_ready(f"http://127.0.0.1:{port}/drones")
+        time.sleep(1.0)  # every worker started and connected, not just the first
+        out = subprocess.run(
+            [sys.executable, DRONE, "--host", f"http://127.0.0.1:{port}", "--ws", f"ws://127.0.0.1:{port}/ws/pi",
+             "--key", os.path.join(workdir, "private.pem"), "--fleet", str(args.fleet), "--procs", str(args.procs),
+             "--duration", str(args.duration), "--rate", str(args.rate), "--log-level", "WARNING"],
+            cwd=workdir, env=env, capture_output=True, text=True, timeout=args.duration + 120).stdout
+    finally:
+        stop(server)
+    sent = SENT_RE.search(out)
+    lat = LAT_RE.search(out)
+    if sent is None:
+        raise RuntimeError(f"unexpected fleet output:\n{out}")
+    n = int(sent.group(1))
+    return {"workers": workers, "rate": int(sent.group(3)),
+            "echoed": int(lat.group(1)) / n if lat and n else 0.0,
+            "p50": float(lat.group(2)) if lat else float("nan"),
+            "p99": float(lat.group(4)) if lat else float("nan")}
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    ap.add_argument("--fleet", type=int, default=200, help="simulated drones")
+    ap.add_argument("--procs", type=int, default=2, help="fleet simulator processes")
+    ap.add_argument("--rate", type=float, default=4.0, help="Hz per drone")
+    ap.add_argument("--duration", type=float, default=15.0)
+    ap.add_argument("--no-shared", action="store_true", help="no DRONEGUARD_STATE_URL: workers stay isolated")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        key = RSA.generate(2048)
+        with open(os.path.join(workdir, "private.pem"), "wb") as f:
+            f.write(key.export_key())
+        with open(os.path.join(workdir, "public.pem"), "wb") as f:
+            f.write(key.publickey().export_key())
+        env = dict(os.environ, PYTHONPATH=BACKEND)
+
+        resp = None
+        state_url = None
+        if not args.no_shared:
+            resp_port = free_port()
+            resp = subprocess.Popen([sys.executable, "-m", "app.shared.resp_server", "--port", str(resp_port)],
+                                    cwd=workdir, env=env, stdout=subprocess.DEVNULL)
+            state_url = f"redis://127.0.0.1:{resp_port}"
+            wait_port(resp_port)
+        try:
+            rows = [run(n, state_url, args, workdir, env) for n in args.workers]
+        finally:
+            if resp is not None:
+                stop(resp)
+
+    print(f"{args.fleet} drones at {args.rate:g} Hz, {args.duration:g} s, "
+          f"state {'in-process (isolated workers)' if args.no_shared else 'shared (resp_server)'}, "
+          f"{os.cpu_count()} CPUs")
+    print(f"{'workers':>7} {'packets/s':>10} {'echoed':>7} {'p50 ms':>8} {'p99 ms':>8}")
+    for r in rows:
+        print(f"{r['workers']:>7} {r['rate']:>10,} {r['echoed']:>7.0%} {r['p50']:>8.1f} {r['p99']:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
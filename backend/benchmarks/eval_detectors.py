@@ -0,0 +1,310 @@
+# benchmarks/eval_detectors.py
+"""
+Detector accuracy and speed on labeled flights.
+
+Reads a dataset written by DronePi/make_dataset.py (npz shards + manifest),
+runs detectors.batch.detect_batch over every drone's track and reports, for
+each of the four detectors and for their union ("any"):
+
+  - packet precision / recall: a packet is positive while an injection is
+    active; alerts up to --grace seconds after an attack ends are charged
+    to that attack, not counted as false positives
+  - per injection mode: recall, precision against the clean flight
+    (mode packets vs. false positives), event recall (attacks with at least
+    one alert) and detection delay (first alert - attack start, seconds)
+  - false alarms per hour of clean flight
+
+It also sweeps each detector's threshold over a grid using the batch score
+arrays (implied/reported speed, jump distance, heading differences), so
+the whole grid costs one detect_batch run plus some sorting; and it
+measures throughput of the batch path and of the per-packet stateful
+detectors.  The report is JSON (--out / --json) so runs can be diffed.
+
+Run from backend/:
+    python ../DronePi/make_dataset.py --out /tmp/ds --drones 50 --duration 3600
+    python -m benchmarks.eval_detectors --dataset /tmp/ds --out report.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.detectors import make_detectors
+from app.detectors.batch import detect_batch
+from app.detectors.physics_check import MAX_REASONABLE_SPEED
+from app.detectors.gps_spoof import GPS_JUMP_THRESHOLD_M
+from app.detectors.imu_consistency import HEADING_MISMATCH_THRESHOLD_DEG
+from app.detectors.heading_mismatch import YAW_JUMP_THRESHOLD
+from app.state.telemetry_buffer import FIELDS
+
+# detector -> (alert type, detect_batch keyword, current threshold, strict '>' comparison, default grid)
+DETECTORS = {
+    "physics": ("IMPOSSIBLE_MOVEMENT", "max_speed", MAX_REASONABLE_SPEED, True, (5.0, 80.0)),
+    "gps_spoof": ("GPS_SPOOF", "gps_jump_m", GPS_JUMP_THRESHOLD_M, False, (1.0, 60.0)),
+    "imu": ("IMU_HEADING_MISMATCH", "heading_mismatch_deg", HEADING_MISMATCH_THRESHOLD_DEG, False, (5.0, 150.0)),
+    "heading": ("YAW_JUMP", "yaw_jump_deg", YAW_JUMP_THRESHOLD, False, (5.0, 150.0)),
+}
+
+
+def load_dataset(directory: str):
+    with open(os.path.join(directory, "manifest.json")) as f:
+        manifest = json.load(f)
+    shards = [np.load(os.path.join(directory, s["path"])) for s in manifest["shards"]]
+    cols = {k: np.concatenate([s[k] for s in shards]) for k in manifest["columns"]}
+    # one contiguous, time-ordered track per drone
+    order = np.lexsort((cols["time"], cols["drone"]))
+    cols = {k: v[order] for k, v in cols.items()}
+    data = np.empty((len(order), len(FIELDS)))
+    for i, name in enumerate(FIELDS):
+        data[:, i] = cols[name]
+    return manifest, cols, data
+
+
+def scores(result: Dict, first: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Per-row score for each detector: the detector fires iff score >= threshold
+    (score > threshold for physics).  NaN where the check does not apply,
+    including each drone's first row.
+    """
+    phys = result["physics"]
+    out = {
+        "physics": np.where(np.isnan(phys["speed"]) & np.isnan(phys["implied_speed"]), np.nan,
+                            np.fmax(phys["implied_speed"], phys["speed"])),
+        "gps_spoof": result["gps_spoof"]["jump_m"].copy(),
+        "imu": result["imu"]["diff"].copy(),
+        "heading": result["heading"]["diff"].copy(),
+    }
+    for s in out.values():
+        s[first] = np.nan
+    return out
+
+
+def _ratio(a, b):
+    return float(a / b) if b else None
+
+
+def _delays(hit_time: np.ndarray, start: np.ndarray) -> Dict:
+    detected = np.isfinite(hit_time)
+    d = hit_time[detected] - start[detected]
+    if not len(d):
+        return {"p50": None, "p90": None, "mean": None}
+    return {"p50": float(np.percentile(d, 50)), "p90": float(np.percentile(d, 90)), "mean": float(d.mean())}
+
+
+class Labels:
+    """Row labels plus the attack-window bookkeeping shared by every evaluation."""
+
+    def __init__(self, cols: Dict[str, np.ndarray], modes: List[str], grace: float):
+        self.modes = modes
+        self.label = cols["label"]
+        self.time = cols["time"]
+        self.positive = self.label > 0
+        drone = cols["drone"]
+        self.first = np.ones(len(drone), dtype=bool)
+        self.first[1:] = drone[1:] != drone[:-1]
+
+        # attack windows: contiguous runs of one attack id, in row order
+        attack = cols["attack"]
+        rows = np.flatnonzero(attack >= 0)
+        starts = rows[np.r_[True, attack[rows[1:]] != attack[rows[:-1]]]] if len(rows) else rows
+        self.attack_rows = rows
+        self.attack_starts = np.searchsorted(rows, starts)  # offsets into attack_rows (reduceat segments)
+        self.attack_start_time = self.time[starts]
+        self.attack_mode = self.label[starts]
+
+        # clean rows just after an attack (same drone, within grace) are neither positive nor negative
+        ends = np.r_[rows[np.r_[attack[rows[1:]] != attack[rows[:-1]], True]]] if len(rows) else rows
+        self.ignore = np.zeros(len(attack), dtype=bool)
+        if grace > 0 and len(ends):
+            end_time = self.time[ends]
+            last_end = np.full(len(attack), -np.inf)
+            last_end[ends] = end_time
+            # carry each attack's end time forward over the following rows of the same drone
+            idx = np.where(np.isfinite(last_end), np.arange(len(attack)), 0)
+            np.maximum.accumulate(idx, out=idx)
+            carried = last_end[idx]
+            same_drone = np.cumsum(self.first)[idx] == np.cumsum(self.first)
+            self.ignore = (~self.positive & same_drone & (self.time - carried <= grace)
+                           & np.isfinite(carried))
+        self.negative = ~self.positive & ~self.ignore
+        self.clean_hours = self._clean_seconds() / 3600.0
+
+    def _clean_seconds(self) -> float:
+        dt = np.diff(self.time)
+        ok = ~self.first[1:] & self.negative[1:]
+        return float(dt[ok].sum())
+
+    def evaluate(self, mask: np.ndarray) -> Dict:
+        """Packet and event metrics for one boolean alert mask."""
+        tp = int((mask & self.positive).sum())
+        fp = int((mask & self.negative).sum())
+        pos = int(self.positive.sum())
+        hit_time = np.full(len(self.attack_starts), np.inf)
+        if len(self.attack_rows):
+            t = np.where(mask[self.attack_rows], self.time[self.attack_rows], np.inf)
+            hit_time = np.minimum.reduceat(t, self.attack_starts)
+        report = {
+            "precision": _ratio(tp, tp + fp), "recall": _ratio(tp, pos), "tp": tp, "fp": fp,
+            "false_alarms_per_hour": _ratio(fp, self.clean_hours),
+            "event_recall": _ratio(np.isfinite(hit_time).sum(), len(hit_time)),
+            "delay_s": _delays(hit_time, self.attack_start_time),
+            "modes": {},
+        }
+        for code, mode in enumerate(self.modes, start=1):
+            rows = self.label == code
+            mtp = int((mask & rows).sum())
+            sel = self.attack_mode == code
+            report["modes"][mode] = {
+                "precision": _ratio(mtp, mtp + fp), "recall": _ratio(mtp, int(rows.sum())),
+                "event_recall": _ratio(np.isfinite(hit_time[sel]).sum(), int(sel.sum())),
+                "delay_s": _delays(hit_time[sel], self.attack_start_time[sel]),
+            }
+        return report
+
+    def sweep(self, score: np.ndarray, grid: np.ndarray, strict: bool) -> List[Dict]:
+        """Metrics for every threshold in ``grid`` at once (score >= t, or > t when strict)."""
+        side = "right" if strict else "left"
+
+        def count_at_least(values):
+            v = np.sort(values[~np.isnan(values)])
+            return len(v) - np.searchsorted(v, grid, side=side)
+
+        tp = count_at_least(score[self.positive])
+        fp = count_at_least(score[self.negative])
+        mode_tp = {m: count_at_least(score[self.label == c]) for c, m in enumerate(self.modes, start=1)}
+        mode_n = {m: int((self.label == c).sum()) for c, m in enumerate(self.modes, start=1)}
+        pos = int(self.positive.sum())
+
+        # first alert per attack for every threshold: (attack rows x grid) -> reduceat over attacks
+        hit_time = np.full((len(self.attack_starts), len(grid)), np.inf)
+        if len(self.attack_rows):
+            s = score[self.attack_rows][:, None]
+            with np.errstate(invalid="ignore"):
+                hits = s > grid if strict else s >= grid
+            t = np.where(hits, self.time[self.attack_rows][:, None], np.inf)
+            hit_time = np.minimum.reduceat(t, self.attack_starts, axis=0)
+
+        out = []
+        for j, thr in enumerate(grid):
+            entry = {
+                "threshold": float(thr), "precision": _ratio(tp[j], tp[j] + fp[j]), "recall": _ratio(tp[j], pos),
+                "fp": int(fp[j]), "false_alarms_per_hour": _ratio(fp[j], self.clean_hours),
+                "event_recall": _ratio(np.isfinite(hit_time[:, j]).sum(), len(hit_time)),
+                "delay_s": _delays(hit_time[:, j], self.attack_start_time),
+                "modes": {},
+            }
+            for code, mode in enumerate(self.modes, start=1):
+                sel = self.attack_mode == code
+                entry["modes"][mode] = {
+                    "recall": _ratio(mode_tp[mode][j], mode_n[mode]),
+                    "event_recall": _ratio(np.isfinite(hit_time[sel, j]).sum(), int(sel.sum())),
+                }
+            p, r = entry["precision"] or 0.0, entry["recall"] or 0.0
+            entry["f1"] = 2 * p * r / (p + r) if p + r else 0.0
+            out.append(entry)
+        return out
+
+
+def throughput(data: np.ndarray, scalar_rows: int) -> Dict:
+    t0 = time.perf_counter()
+    detect_batch(data)
+    batch_s = time.perf_counter() - t0
+
+    pkts = [dict(zip(FIELDS, map(float, row))) for row in data[:scalar_rows]]
+    dets = make_detectors()
+    t0 = time.perf_counter()
+    for pkt in pkts:
+        for det in dets:
+            det.update(pkt)
+    scalar_s = time.perf_counter() - t0
+    return {"batch_samples_per_s": len(data) / batch_s, "batch_rows": len(data),
+            "scalar_samples_per_s": len(pkts) / scalar_s if scalar_s else None, "scalar_rows": len(pkts)}
+
+
+def evaluate(directory: str, grid_points: int = 24, grace: float = 1.0, scalar_rows: int = 50000,
+             grids: Optional[Dict[str, np.ndarray]] = None) -> Dict:
+    manifest, cols, data = load_dataset(directory)
+    labels = Labels(cols, manifest["modes"], grace)
+
+    t0 = time.perf_counter()
+    result = detect_batch(data)
+    detect_s = time.perf_counter() - t0
+    sc = scores(result, labels.first)
+
+    report = {
+        "dataset": {"path": os.path.abspath(directory), "rows": len(data), "drones": manifest["drones"],
+                    "seed": manifest["seed"], "attacks": len(labels.attack_starts),
+                    "clean_hours": labels.clean_hours, "grace_s": grace},
+        "thresholds": {name: spec[2] for name, spec in DETECTORS.items()},
+        "detectors": {},
+        "sweep": {},
+    }
+    any_mask = np.zeros(len(data), dtype=bool)
+    for name, (_, _, current, strict, (lo, hi)) in DETECTORS.items():
+        s = sc[name]
+        with np.errstate(invalid="ignore"):
+            mask = s > current if strict else s >= current
+        any_mask |= mask
+        report["detectors"][name] = labels.evaluate(mask)
+        grid = grids[name] if grids and name in grids else np.linspace(lo, hi, grid_points)
+        report["sweep"][name] = labels.sweep(s, np.asarray(grid, dtype=float), strict)
+    report["detectors"]["any"] = labels.evaluate(any_mask)
+
+    report["throughput"] = throughput(data, scalar_rows)
+    report["throughput"]["eval_detect_batch_s"] = detect_s
+    return report
+
+
+def _fmt(v, spec=".3f"):
+    return "   -  " if v is None else format(v, spec)
+
+
+def summary(report: Dict) -> str:
+    lines = [f"{report['dataset']['rows']} rows, {report['dataset']['attacks']} attacks, "
+             f"{report['dataset']['clean_hours']:.1f} clean flight hours"]
+    modes = list(report["detectors"]["any"]["modes"])
+    lines.append(f"{'detector':<10} {'prec':>6} {'recall':>6} {'FA/h':>7}  " +
+                 " ".join(f"{m[:12]:>12}" for m in modes) + "   (event recall / p50 delay s)")
+    for name, r in report["detectors"].items():
+        per_mode = " ".join(f"{_fmt(r['modes'][m]['event_recall'], '.2f'):>5}/{_fmt(r['modes'][m]['delay_s']['p50'], '.2f'):<6}"
+                            for m in modes)
+        lines.append(f"{name:<10} {_fmt(r['precision']):>6} {_fmt(r['recall']):>6} "
+                     f"{_fmt(r['false_alarms_per_hour'], '.1f'):>7}  {per_mode}")
+    for name, entries in report["sweep"].items():
+        best = max(entries, key=lambda e: e["f1"])
+        lines.append(f"sweep {name:<9} current {report['thresholds'][name]:g}; best F1 {best['f1']:.3f} at "
+                     f"{best['threshold']:.1f} (precision {_fmt(best['precision'])}, recall {_fmt(best['recall'])})")
+    tp = report["throughput"]
+    lines.append(f"throughput: batch {tp['batch_samples_per_s']:,.0f} samples/s, "
+                 f"scalar {tp['scalar_samples_per_s']:,.0f} samples/s")
+    return "\n".join(lines)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Evaluate detectors on a labeled dataset")
+    ap.add_argument("--dataset", required=True, help="directory written by DronePi/make_dataset.py")
+    ap.add_argument("--grid-points", type=int, default=24, help="thresholds per detector in the sweep")
+    ap.add_argument("--grace", type=float, default=1.0, help="seconds after an attack whose alerts are not false positives")
+    ap.add_argument("--scalar-rows", type=int, default=50000, help="rows timed through the per-packet detectors")
+    ap.add_argument("--out", help="write the JSON report here")
+    ap.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = ap.parse_args()
+
+    report = evaluate(args.dataset, args.grid_points, args.grace, args.scalar_rows)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(summary(report))
+        if args.out:
+            print(f"report written to {args.out}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
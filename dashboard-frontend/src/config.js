@@ -1,2 +1,4 @@
 export const WS_URL = import.meta.env.VITE_WS_URL || "ws://127.0.0.1:8000/ws/frontend";
 export const API_BASE = import.meta.env.VITE_API_BASE || "http://127.0.0.1:8000";
+// "binary" asks the backend for compact DGF1 telemetry frames (see utils/wire.js)
+export const WS_ENCODING = import.meta.env.VITE_WS_ENCODING || "json";
@@ -2,7 +2,8 @@
 import React, { createContext, useContext, useEffect, useState } from "react";
 import { createWsClient } from "../services/wsClient";
 import toast from "react-hot-toast";
-import { WS_URL } from "../config";
+import { WS_URL, WS_ENCODING } from "../config";
+import { decodeTelemetryFrame } from "../utils/wire";
 
 export const TelemetryContext = createContext(null);
 
@@ -14,8 +15,12 @@ export function TelemetryProvider({ children }) {
 
   useEffect(() => {
     const ws = createWsClient(WS_URL);
+    ws.binaryType = "arraybuffer";
 
     ws.addEventListener("open", () => {
+      if (WS_ENCODING === "binary") {
+        ws.send(JSON.stringify({ type: "subscribe", encoding: "binary" }));
+      }
       setConnected(true);
       toast.success("Connected to backend");
     });
@@ -27,7 +32,9 @@ export function TelemetryProvider({ children }) {
 
     ws.addEventListener("message", (ev) => {
       try {
-        const msg = JSON.parse(ev.data);
+        const msg =
+          ev.data instanceof ArrayBuffer ? decodeTelemetryFrame(ev.data) : JSON.parse(ev.data);
+        if (!msg) return;
 
         // TELEMETRY -------------------------------------
         if (msg.type === "telemetry" && msg.payload) {
@@ -55,6 +62,19 @@ export function TelemetryProvider({ children }) {
           setAlerts((old) => [...arr, ...old].slice(0, 500));
         }
 
+        // INCIDENTS (open / update / close) -------------
+        // one entry per incident, replaced in place as it updates
+        else if (msg.type === "incident" && msg.payload) {
+          const inc = msg.payload;
+          setAlerts((old) => {
+            const i = old.findIndex((a) => a.id === inc.id && a.drone_id === inc.drone_id);
+            if (i === -1) return [inc, ...old].slice(0, 500);
+            const next = old.slice();
+            next[i] = inc;
+            return next;
+          });
+        }
+
         // FAILSAFE -------------------------------------
         else if (msg.type === "failsafe" && msg.payload) {
           setFailsafe(msg.payload);
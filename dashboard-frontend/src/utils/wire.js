@@ -0,0 +1,46 @@
+// src/utils/wire.js
+// Decoder for binary telemetry frames from /ws/frontend (backend app/wire.py):
+//   "DGF1" | flags u8 | alert_count u8 | id_len u8 | drone_id utf-8 | record
+//   record = time, gps_lat, gps_lon f64; alt, vx, vy, speed, yaw, roll, pitch, battery f32; source u8
+// All little-endian. NaN means "missing" and is decoded as null.
+
+const MAGIC = [0x44, 0x47, 0x46, 0x31]; // "DGF1"
+const F32_FIELDS = ["alt", "vx", "vy", "speed", "yaw", "roll", "pitch", "battery"];
+const SOURCES = ["normal", "injected", "failsafe"];
+const decoder = new TextDecoder();
+
+const num = (v) => (Number.isNaN(v) ? null : v);
+
+export function decodeTelemetryFrame(buffer) {
+  const view = new DataView(buffer);
+  for (let i = 0; i < 4; i++) {
+    if (view.getUint8(i) !== MAGIC[i]) return null;
+  }
+  const flags = view.getUint8(4);
+  const alertCount = view.getUint8(5);
+  const idLen = view.getUint8(6);
+  const droneId = decoder.decode(new Uint8Array(buffer, 7, idLen));
+
+  let o = 7 + idLen;
+  const payload = {
+    time: num(view.getFloat64(o, true)),
+    gps_lat: num(view.getFloat64(o + 8, true)),
+    gps_lon: num(view.getFloat64(o + 16, true)),
+  };
+  o += 24;
+  for (const f of F32_FIELDS) {
+    payload[f] = num(view.getFloat32(o, true));
+    o += 4;
+  }
+  const src = view.getUint8(o);
+  payload.source = SOURCES[src] || "other";
+
+  return {
+    type: "telemetry",
+    drone_id: droneId,
+    verified: (flags & 1) !== 0,
+    failsafe_active: (flags & 2) !== 0,
+    alert_count: alertCount,
+    payload,
+  };
+}